@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import uuid
+from dataclasses import asdict, dataclass, field, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".arrow"
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the xfin sources, so cached frames die with the code that built them."""
+    pkg = Path(__file__).resolve().parent
+    h = hashlib.sha256()
+    for p in sorted(pkg.rglob("*.py")):
+        h.update(p.relative_to(pkg).as_posix().encode("utf-8"))
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def stat_fingerprint(paths: Iterable[str | Path]) -> list[tuple[str, int, int]]:
+    """
+    (path, size, mtime_ns) of the given files; directories are walked.
+
+    Subdirectories starting with "_" or "." are skipped, like dataset scans
+    skip them (e.g. the lazy feature cache of a processed dataset).
+    """
+    out: list[tuple[str, int, int]] = []
+    for path in paths:
+        path = Path(path)
+        if not path.is_dir():
+            st = path.stat()
+            out.append((str(path.resolve()), st.st_size, st.st_mtime_ns))
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(("_", ".")))
+            for name in sorted(filenames):
+                p = Path(dirpath) / name
+                st = p.stat()
+                out.append((str(p.resolve()), st.st_size, st.st_mtime_ns))
+    return sorted(out)
+
+
+def _jsonable(obj: Any) -> Any:
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    return str(obj)
+
+
+def cache_key(*parts: Any) -> str:
+    """Content address of a frame: hash of its inputs, config and the code version."""
+    payload = json.dumps([code_version(), *parts], sort_keys=True, default=_jsonable)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FrameCache:
+    """
+    Size-bounded on-disk cache of DataFrames stored as Arrow IPC (Feather v2)
+    files named by their cache_key().
+
+    Reads refresh a blob's mtime; when the cache grows past max_bytes the
+    least recently used blobs are evicted.
+    """
+
+    root: Path
+    max_bytes: int = 2 << 30
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        path = self._path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except pa.ArrowInvalid:
+            logger.warning("Discarding unreadable cache blob %s", path)
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        os.utime(path)  # LRU: mark as recently used
+        self.hits += 1
+        logger.info("Cache hit %s (rows=%d)", key[:12], table.num_rows)
+        return table.to_pandas()
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        feather.write_feather(pa.Table.from_pandas(df), tmp)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        df = self.get(key)
+        if df is None:
+            df = compute()
+            self.put(key, df)
+        return df
+
+    def evict(self) -> None:
+        """Delete least recently used blobs until the cache fits max_bytes."""
+        blobs = []
+        for p in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # evicted concurrently
+                continue
+            blobs.append((st.st_mtime_ns, st.st_size, p))
+
+        total = sum(size for _, size, _ in blobs)
+        for _, size, p in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            logger.debug("Evicting cache blob %s (%d bytes)", p.name, size)
+            p.unlink(missing_ok=True)
+            total -= size
@@ -30,6 +30,21 @@ class DataEngineConfig:
 
     # runtime
     max_concurrency: int = 50
+    # parse whole files into Arrow columns instead of per-row OHLCVBar objects
+    columnar: bool = False
+    # >0: read+parse files in a process pool with this many workers
+    parse_workers: int = 0
+    # locators handed to a worker per task (amortises IPC per file)
+    parse_chunk_size: int = 4
+    # files loading or parsed-but-unconsumed at once (None -> max_concurrency)
+    max_in_flight: int | None = None
+    # yield files in sorted path order instead of completion order
+    ordered: bool = False
+    # keep one bar per (ticker, dt): the one from the highest-priority file
+    dedupe: bool = True
+    # glob patterns in ascending priority (later patterns win); file mtime
+    # decides between files of equal priority (last write wins)
+    priority: tuple[str, ...] = ()
 
     def __post_init__(self) -> None:
         root = self.project_root
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+from xfin.data_engine.bench.runner import run_benchmark
+from xfin.data_engine.bench.synthetic import SyntheticMstSpec, write_synthetic_mst
+from xfin.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(
+        description="Benchmark the MST ingest stages (parse, fan-out, dataframe, Parquet write)"
+    )
+    p.add_argument(
+        "--folder",
+        type=str,
+        default=None,
+        help="Benchmark existing .mst files instead of a synthetic universe",
+    )
+    p.add_argument("--pattern", type=str, default="*.mst")
+    p.add_argument("--tickers", type=int, default=50, help="Synthetic tickers (one file each)")
+    p.add_argument("--years", type=int, default=10, help="Synthetic years of daily bars per ticker")
+    p.add_argument(
+        "--malformed-rate",
+        type=float,
+        default=0.001,
+        help="Share of synthetic lines that are empty/bad-column/bad-value",
+    )
+    p.add_argument("--openint", action="store_true", help="Write the optional OPENINT column")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--mode", choices=["columnar", "rows"], default="columnar")
+    p.add_argument("--workers", type=int, default=0, help="Process pool size for fan-out")
+    p.add_argument("--chunk-size", type=int, default=4)
+    p.add_argument(
+        "--workdir",
+        type=str,
+        default=None,
+        help=(
+            "Keep synthetic files and the Parquet output in a new xfin-bench-* "
+            "directory created here (default: a temp dir removed afterwards)"
+        ),
+    )
+    p.add_argument("--json", type=str, default=None, help="Also write the report as JSON here")
+    p.add_argument("--log-level", default="WARNING")
+
+    args = p.parse_args(argv)
+
+    try:
+        setup_logging(level=args.log_level)
+    except ValueError as e:
+        print(f"Invalid log level: {e}", file=sys.stderr)
+        return 2
+
+    with ExitStack() as stack:
+        if args.workdir:
+            # never the directory itself: the benchmark replaces <workdir>/bars
+            Path(args.workdir).mkdir(parents=True, exist_ok=True)
+            workdir = Path(tempfile.mkdtemp(prefix="xfin-bench-", dir=args.workdir))
+            print(f"Benchmark files kept in {workdir}", file=sys.stderr)
+        else:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="xfin-bench-")))
+
+        if args.folder:
+            paths = sorted(Path(args.folder).glob(args.pattern))
+            if not paths:
+                logger.error("No files matched pattern=%r in %s", args.pattern, args.folder)
+                return 2
+        else:
+            spec = SyntheticMstSpec(
+                tickers=args.tickers,
+                years=args.years,
+                malformed_rate=args.malformed_rate,
+                openint=args.openint,
+                seed=args.seed,
+            )
+            paths = write_synthetic_mst(workdir / "raw", spec)
+
+        report = run_benchmark(
+            paths,
+            workdir / "bars",
+            mode=args.mode,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+
+    print(report.format_table())
+    if args.json:
+        Path(args.json).write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+import pyarrow as pa
+
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.models import BAR_SCHEMA
+from xfin.data_engine.features.builder import BarDatasetBuilder
+from xfin.data_engine.io.parsers import MstBarParser
+from xfin.data_engine.io.repository import MstRepository
+from xfin.data_engine.io.sources import LocalFileSource
+from xfin.data_engine.io.writer import PartitionedParquetWriter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb(children: bool = False) -> float | None:
+    """
+    High-water RSS in MiB over the process lifetime (None where getrusage
+    is unavailable). children=True: the largest waited-for child process,
+    e.g. a parse worker of a pool that has been shut down.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+@dataclass
+class StageResult:
+    """Timing of one ingest stage."""
+
+    name: str
+    seconds: float
+    rows: int
+    bytes: int = 0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_s": self.rows_per_s}
+
+
+def _mb(value: float | None) -> str:
+    return f"{value:.1f}" if value is not None else "n/a"
+
+
+@dataclass
+class BenchmarkReport:
+    """
+    Stage timings plus memory high-water marks of the whole run: they only
+    ever grow, so they are not attributed to stages. Parsing with a pool
+    happens in the workers, whose peak is reported separately.
+    """
+
+    files: int
+    mode: str
+    workers: int
+    stages: list[StageResult] = field(default_factory=list)
+    peak_rss_mb: float | None = None  # this process
+    workers_peak_rss_mb: float | None = None  # largest parse worker (workers > 0)
+    arrow_peak_mb: float = 0.0  # Arrow default memory pool
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "mode": self.mode,
+            "workers": self.workers,
+            "stages": [s.to_dict() for s in self.stages],
+            "peak_rss_mb": self.peak_rss_mb,
+            "workers_peak_rss_mb": self.workers_peak_rss_mb,
+            "arrow_peak_mb": self.arrow_peak_mb,
+        }
+
+    def format_table(self) -> str:
+        lines = [
+            f"files={self.files} mode={self.mode} workers={self.workers}",
+            f"{'stage':<14}{'seconds':>10}{'rows':>12}{'rows/s':>14}",
+        ]
+        for s in self.stages:
+            lines.append(f"{s.name:<14}{s.seconds:>10.3f}{s.rows:>12,}{s.rows_per_s:>14,.0f}")
+        memory = f"peak RSS MiB: process {_mb(self.peak_rss_mb)}"
+        if self.workers > 0:
+            memory += f", parse workers {_mb(self.workers_peak_rss_mb)}"
+        lines.append(f"{memory}, Arrow pool {self.arrow_peak_mb:.1f}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def _stage(report: BenchmarkReport, name: str) -> Iterator[StageResult]:
+    result = StageResult(name=name, seconds=0.0, rows=0)
+    t0 = time.perf_counter()
+    yield result
+    result.seconds = time.perf_counter() - t0
+    report.stages.append(result)
+    logger.info(
+        "%s: %.3fs rows=%d (%.0f rows/s)", name, result.seconds, result.rows, result.rows_per_s
+    )
+
+
+def run_benchmark(
+    paths: list[Path],
+    out: Path,
+    *,
+    mode: str = "columnar",
+    workers: int = 0,
+    chunk_size: int = 4,
+    max_concurrency: int = 50,
+) -> BenchmarkReport:
+    """
+    Time the ingest stages separately over `paths`:
+
+    parse:      parser only, on text already in memory
+    fan_out:    MstRepository read + parse over all files (optionally a process pool)
+    dataframe:  BarDatasetBuilder frame build incl. features
+    write:      ticker-partitioned Parquet write into `out` (removed first)
+
+    mode is "columnar" (BarBatch path) or "rows" (OHLCVBar path).
+    """
+    if mode not in ("columnar", "rows"):
+        raise ValueError(f"Unknown benchmark mode {mode!r} (expected 'columnar' or 'rows')")
+
+    locators = sorted(str(p) for p in paths)
+    parser = MstBarParser(delimiter=",", has_header=True)
+    report = BenchmarkReport(files=len(locators), mode=mode, workers=workers)
+
+    texts = {loc: Path(loc).read_bytes() for loc in locators}
+    with _stage(report, "parse") as st:
+        for loc, data in texts.items():
+            if mode == "columnar":
+                st.rows += len(parser.parse_columnar(data, filename=loc))
+            else:
+                lines = data.decode("utf-8").splitlines()
+                st.rows += sum(1 for _ in parser.parse_lines(lines, filename=loc))
+            st.bytes += len(data)
+    del texts
+
+    with _pool(workers) as pool:
+        repo = MstRepository(
+            locators=locators,
+            source=LocalFileSource(),
+            parser=parser,
+            max_concurrency=max_concurrency,
+            executor=pool,
+            chunk_size=chunk_size,
+        )
+        with _stage(report, "fan_out") as st:
+            if mode == "columnar":
+                loaded = asyncio.run(_collect(repo.iter_columnar()))
+                st.rows = sum(len(b) for b in loaded)
+            else:
+                loaded = asyncio.run(_collect(repo.iter_bars()))
+                st.rows = len(loaded)
+            st.bytes = sum(Path(loc).stat().st_size for loc in locators)
+
+    builder = BarDatasetBuilder(add_basic_features=True)
+    with _stage(report, "dataframe") as st:
+        if mode == "columnar":
+            df = builder.columnar_to_dataframe(loaded)
+        else:
+            df = builder.to_dataframe(loaded)
+        st.rows = len(df)
+    del df
+
+    out = Path(out)
+    if out.exists():
+        shutil.rmtree(out)
+    with _stage(report, "write") as st:
+        batches = loaded if mode == "columnar" else [BarBatch.from_bars(loaded)]
+        st.rows = sum(len(b) for b in batches)
+
+        async def record_batches() -> AsyncIterator[pa.RecordBatch]:
+            for b in batches:
+                if len(b):
+                    yield b.sort_by_ticker_date().to_arrow()
+
+        asyncio.run(PartitionedParquetWriter(out=out, schema=BAR_SCHEMA).write(record_batches()))
+        st.bytes = sum(p.stat().st_size for p in out.rglob("*.parquet"))
+
+    report.peak_rss_mb = peak_rss_mb()
+    if workers > 0:
+        # the pool has been shut down, so its workers count as waited-for children
+        report.workers_peak_rss_mb = peak_rss_mb(children=True)
+    report.arrow_peak_mb = pa.default_memory_pool().max_memory() / (1 << 20)
+    return report
+
+
+async def _collect(it: AsyncIterator) -> list:
+    return [x async for x in it]
+
+
+@contextmanager
+def _pool(workers: int) -> Iterator[ProcessPoolExecutor | None]:
+    if workers <= 0:
+        yield None
+        return
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        yield pool
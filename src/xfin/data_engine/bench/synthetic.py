@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_HEADER = "<TICKER>,<DTYYYYMMDD>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>"
+_MALFORMED = ("", "{t},{d},1,2", "{t},{d},1,2,0.5,abc,10")
+
+
+@dataclass(frozen=True)
+class SyntheticMstSpec:
+    """Shape of a generated raw universe (one .mst file per ticker)."""
+
+    tickers: int = 10
+    years: int = 5
+    malformed_rate: float = 0.0  # share of lines replaced by empty/bad-column/bad-value rows
+    openint: bool = False  # write the optional 8th column
+    header: bool = True
+    start: str = "2000-01-03"
+    seed: int = 0
+
+
+def write_synthetic_mst(folder: Path, spec: SyntheticMstSpec) -> list[Path]:
+    """
+    Write random-walk daily bars in MST format, one file per ticker.
+
+    Returns the written paths. Malformed lines are injected at
+    `malformed_rate` so parser skip paths are exercised too.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(spec.seed)
+
+    dates = pd.bdate_range(spec.start, periods=max(1, spec.years * 252))
+    date_str = dates.strftime("%Y%m%d").to_numpy()
+    n = len(dates)
+
+    paths = []
+    for i in range(spec.tickers):
+        ticker = f"SYN{i:05d}"
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n)))
+        open_ = close * (1 + rng.normal(0.0, 0.005, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.0, 0.01, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.0, 0.01, n)))
+        vol = rng.integers(100, 1_000_000, n)
+        bad = rng.random(n) < spec.malformed_rate
+        kind = rng.integers(0, len(_MALFORMED), n)
+
+        lines = [_HEADER + (",<OPENINT>" if spec.openint else "")] if spec.header else []
+        for j in range(n):
+            if bad[j]:
+                lines.append(_MALFORMED[kind[j]].format(t=ticker, d=date_str[j]))
+                continue
+            line = (
+                f"{ticker},{date_str[j]},{open_[j]:.4f},{high[j]:.4f},"
+                f"{low[j]:.4f},{close[j]:.4f},{vol[j]}"
+            )
+            if spec.openint:
+                line += f",{j}"
+            lines.append(line)
+
+        path = folder / f"{ticker}.mst"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        paths.append(path)
+
+    return paths
@@ -2,18 +2,195 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import json
 import logging  # NEW
 import sys
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 
+from xfin.cache import FrameCache
+from xfin.config import AppConfig, DataEngineConfig
+from xfin.data_engine.core.compaction import DatasetCompactor
 from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.features.builder import BarDatasetBuilder
+from xfin.data_engine.io.index import update_index
+from xfin.data_engine.io.publish import rollback, staged_version
+from xfin.data_engine.io.writer import COMPRESSIONS, ParquetOptions, write_partitioned_frame
 from xfin.logging_config import setup_logging
 
 logger = logging.getLogger(__name__)  # NEW
 
 
-def main() -> int:
-    p = argparse.ArgumentParser()
+def _add_parquet_args(p: argparse.ArgumentParser, *, sort_flag: bool = True) -> None:
+    p.add_argument("--compression", choices=COMPRESSIONS, default="snappy")
+    p.add_argument(
+        "--compression-level",
+        type=int,
+        default=None,
+        help="Codec level (zstd, gzip, brotli)",
+    )
+    p.add_argument(
+        "--row-group-size",
+        type=int,
+        default=None,
+        help="Rows per Parquet row group; smaller groups let date-range reads skip more",
+    )
+    if sort_flag:  # compaction always sorts by dt
+        p.add_argument(
+            "--no-sort",
+            action="store_true",
+            help="pandas engine: keep frame order instead of sorting rows by (ticker, dt)",
+        )
+    p.add_argument(
+        "--no-dictionary",
+        action="store_true",
+        help="Disable dictionary encoding",
+    )
+    p.add_argument(
+        "--float32",
+        type=str,
+        default="",
+        help="Comma-separated columns to store as float32, e.g. vol,openint",
+    )
+
+
+def _add_publish_args(p: argparse.ArgumentParser, *, in_place: bool = True) -> None:
+    p.add_argument(
+        "--keep-versions",
+        type=int,
+        default=2,
+        help="Published dataset versions kept for rollback (including the current one)",
+    )
+    if in_place:
+        p.add_argument(
+            "--in-place",
+            action="store_true",
+            help="Write directly into --out instead of staging and publishing a new version "
+            "(readers may see a half-written dataset)",
+        )
+
+
+def _target(out: Path, args: argparse.Namespace, *, base: bool) -> AbstractContextManager[Path]:
+    """
+    Directory to write into: a staged version of `out`, published atomically
+    (symlink swap) when the block succeeds, or `out` itself with --in-place.
+    """
+    if getattr(args, "in_place", False):
+        out.mkdir(parents=True, exist_ok=True)
+        return nullcontext(out)
+    return staged_version(out, base=base, keep=args.keep_versions)
+
+
+def _parquet_options(args: argparse.Namespace) -> ParquetOptions:
+    return ParquetOptions(
+        compression=args.compression,
+        compression_level=args.compression_level,
+        row_group_size=args.row_group_size,
+        sort_by_date=not getattr(args, "no_sort", False),
+        use_dictionary=not args.no_dictionary,
+        float32_columns=tuple(c.strip() for c in args.float32.split(",") if c.strip()),
+    )
+
+
+def compact_main(argv: list[str] | None = None) -> int:
+    """xfin-data compact: merge small fragments of each ticker partition."""
+    p = argparse.ArgumentParser(prog="xfin-data compact")
+    p.add_argument(
+        "--out",
+        type=str,
+        default="data/processed/bars",
+        help="Partitioned Parquet dataset to compact (published as a new version)",
+    )
+    p.add_argument(
+        "--target-rows",
+        type=int,
+        default=1_000_000,
+        help="Max rows per compacted file",
+    )
+    p.add_argument(
+        "--min-files",
+        type=int,
+        default=2,
+        help="Only rewrite partitions with at least this many fragments (or duplicates)",
+    )
+    p.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Keep duplicate (ticker, dt) bars instead of the most recently written one",
+    )
+    _add_parquet_args(p, sort_flag=False)
+    # no --in-place: swapping partitions under a live dataset is not reader-safe
+    _add_publish_args(p, in_place=False)
+    p.add_argument("--json", type=str, default=None, help="Write the report to this JSON file")
+    p.add_argument("--log-level", default="INFO", help="DEBUG, INFO, WARNING, ERROR")
+    p.add_argument("--log-file", default=None, help="Optional log file path")
+    args = p.parse_args(argv)
+
+    try:
+        setup_logging(level=args.log_level, log_file=args.log_file)
+    except ValueError as e:
+        print(f"Invalid log level: {e}", file=sys.stderr)
+        return 2
+
+    out = Path(args.out)
+    try:
+        if not out.is_dir():
+            raise FileNotFoundError(f"Path not found: {out}")
+        options = _parquet_options(args)  # reject bad options before staging
+        with _target(out, args, base=True) as target:
+            report = DatasetCompactor(
+                root=target,
+                options=options,
+                target_rows=args.target_rows,
+                min_files=args.min_files,
+                dedupe=not args.no_dedupe,
+            ).run()
+    except FileNotFoundError as e:
+        logger.error("File/folder not found: %s", e)
+        return 2
+    except ValueError as e:
+        logger.error("Invalid arguments/data: %s", e)
+        return 2
+
+    print(report.format_table())
+    if args.json:
+        Path(args.json).write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+    return 0
+
+
+def rollback_main(argv: list[str] | None = None) -> int:
+    """xfin-data rollback: republish the version before the current one."""
+    p = argparse.ArgumentParser(prog="xfin-data rollback")
+    p.add_argument("--out", type=str, default="data/processed/bars")
+    p.add_argument("--log-level", default="INFO", help="DEBUG, INFO, WARNING, ERROR")
+    args = p.parse_args(argv)
+
+    try:
+        setup_logging(level=args.log_level)
+    except ValueError as e:
+        print(f"Invalid log level: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        version = rollback(Path(args.out))
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+    print(f"{args.out} -> {version.name}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compact"]:
+        return compact_main(argv[1:])
+    if argv[:1] == ["rollback"]:
+        return rollback_main(argv[1:])
+
+    p = argparse.ArgumentParser(
+        epilog="Subcommands: 'xfin-data compact' merges fragmented partitions, "
+        "'xfin-data rollback' republishes the previous dataset version."
+    )
     p.add_argument(
         "--folder",
         type=str,
@@ -28,6 +205,84 @@ def main() -> int:
         help="Output directory for partitioned Parquet dataset (partitioned by ticker)",
     )
 
+    p.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Parse files into Arrow columns (no per-bar Python objects)",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Parse files in a process pool with N workers (0 = in-process)",
+    )
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=4,
+        help="Files handed to a pool worker per task (with --workers)",
+    )
+    p.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="Max files being read or waiting to be consumed (bounds memory; "
+        "default: same as max concurrency)",
+    )
+    p.add_argument(
+        "--ordered",
+        action="store_true",
+        help="Process files in sorted path order (deterministic output)",
+    )
+    p.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Keep duplicate (ticker, dt) bars from overlapping raw files",
+    )
+    p.add_argument(
+        "--priority",
+        type=str,
+        default="",
+        help="Comma-separated file globs in ascending priority for duplicate bars "
+        "(e.g. '*.mst,corrections/*.mst'); ties go to the newest file",
+    )
+    p.add_argument(
+        "--engine",
+        choices=["pandas", "arrow"],
+        default="pandas",
+        help="pandas: build one DataFrame then write; "
+        "arrow: stream per-file record batches straight to Parquet",
+    )
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip raw files unchanged since the last build and ingest only the "
+        "appended tail of grown files (uses <out>/_manifest.json; implies --engine arrow)",
+    )
+
+    p.add_argument(
+        "--lazy-features",
+        action="store_true",
+        help="Store only the core bar columns and declare features in <out>/_features.json; "
+        "readers compute (and cache) them on demand",
+    )
+    _add_parquet_args(p)
+    _add_publish_args(p)
+    p.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse the built DataFrame (pandas engine) when raw files, builder "
+        "config and code are unchanged; blobs are stored here",
+    )
+    p.add_argument("--cache-max-mb", type=int, default=2048)
+    p.add_argument(
+        "--metrics-json",
+        type=str,
+        default=None,
+        help="Write per-file and per-stage ingest metrics to this JSON file",
+    )
+
     # NEW: logging args
     p.add_argument(
         "--log-level",
@@ -40,7 +295,7 @@ def main() -> int:
         help="Optional log file path, e.g. logs/run.log",
     )
 
-    args = p.parse_args()
+    args = p.parse_args(argv)
 
     # NEW: configure logging once, early
     try:
@@ -50,7 +305,25 @@ def main() -> int:
         return 2
 
     try:
-        pipeline = BuildDatasetPipeline()
+        parquet = _parquet_options(args)
+        pipeline = BuildDatasetPipeline(
+            cfg=AppConfig(
+                data_engine=DataEngineConfig(
+                    columnar=args.columnar,
+                    parse_workers=args.workers,
+                    parse_chunk_size=args.chunk_size,
+                    max_in_flight=args.max_in_flight,
+                    ordered=args.ordered,
+                    dedupe=not args.no_dedupe,
+                    priority=tuple(g.strip() for g in args.priority.split(",") if g.strip()),
+                )
+            ),
+            builder=BarDatasetBuilder(lazy=args.lazy_features),
+            cache=FrameCache(Path(args.cache_dir), max_bytes=args.cache_max_mb << 20)
+            if args.cache_dir
+            else None,
+            parquet=parquet,
+        )
 
         folder = Path(args.folder) if args.folder else None
         out_path = Path(args.out)
@@ -62,8 +335,6 @@ def main() -> int:
                 "Example: --out data/processed/bars"
             )
 
-        out_path.mkdir(parents=True, exist_ok=True)
-
         logger.info(
             "Starting dataset build (folder=%s, pattern=%s, out=%s)",
             folder if folder else "data/raw (default in pipeline?)",
@@ -71,16 +342,39 @@ def main() -> int:
             out_path,
         )
 
+        if args.engine == "arrow" or args.incremental:
+            with _target(out_path, args, base=args.incremental) as target:
+                summary = asyncio.run(
+                    pipeline.write(
+                        target,
+                        folder=folder,
+                        pattern=args.pattern,
+                        incremental=args.incremental,
+                    )
+                )
+            logger.info(
+                "Saved partitioned dataset to %s "
+                "(rows=%s, tickers=%s, skipped files=%d, appended files=%d)",
+                out_path,
+                f"{summary.rows:,}",
+                len(summary.tickers),
+                summary.skipped_files,
+                summary.appended_files,
+            )
+            if args.metrics_json:
+                summary.metrics.dump_json(args.metrics_json)
+            return 0
+
         df = asyncio.run(pipeline.run(folder=folder, pattern=args.pattern))
 
         logger.info("Built dataframe: rows=%s, cols=%s", f"{len(df):,}", df.shape[1])
 
         # Write partitioned dataset
-        df.to_parquet(
-            out_path,
-            index=False,
-            partition_cols=["ticker"],
-        )
+        with _target(out_path, args, base=False) as target:
+            with pipeline.metrics.stage("write"):
+                write_partitioned_frame(df, target, parquet)
+            pipeline.sync_feature_sidecar(target)
+            update_index(target)
 
         logger.info(
             "Saved partitioned dataset to %s (rows=%s, tickers=%s)",
@@ -88,6 +382,8 @@ def main() -> int:
             f"{len(df):,}",
             df["ticker"].nunique() if "ticker" in df.columns else "N/A",
         )
+        if args.metrics_json:
+            pipeline.metrics.dump_json(args.metrics_json)
         return 0
 
     except KeyboardInterrupt:
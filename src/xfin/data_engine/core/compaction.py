@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from xfin.data_engine.domain.models import BarField
+from xfin.data_engine.io.index import update_index
+from xfin.data_engine.io.writer import ParquetOptions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompactionReport:
+    """Before/after shape of a compacted dataset."""
+
+    partitions: int = 0
+    compacted: int = 0
+    files_before: int = 0
+    files_after: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    rows_before: int = 0
+    rows_after: int = 0
+    scan_s_before: float = 0.0
+    scan_s_after: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.rows_before - self.rows_after
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "duplicates": self.duplicates}
+
+    def format_table(self) -> str:
+        def rate(rows: int, s: float) -> str:
+            return f"{rows / s:,.0f} rows/s" if s > 0 else "n/a"
+
+        return "\n".join(
+            [
+                f"partitions: {self.partitions} (compacted {self.compacted})",
+                f"{'':<8}{'files':>10}{'MB':>10}{'rows':>12}  scan",
+                f"{'before':<8}{self.files_before:>10}{self.bytes_before / 1e6:>10.2f}"
+                f"{self.rows_before:>12,}  {self.scan_s_before:.3f}s "
+                f"({rate(self.rows_before, self.scan_s_before)})",
+                f"{'after':<8}{self.files_after:>10}{self.bytes_after / 1e6:>10.2f}"
+                f"{self.rows_after:>12,}  {self.scan_s_after:.3f}s "
+                f"({rate(self.rows_after, self.scan_s_after)})",
+                f"duplicates removed: {self.duplicates:,}",
+            ]
+        )
+
+
+def _fragments(partition: Path) -> list[Path]:
+    """Fragments in write order (oldest first), so later rows win on dedup."""
+    files = [
+        p
+        for p in partition.glob("*.parquet")
+        if p.is_file() and not p.name.startswith(("_", "."))
+    ]
+    return sorted(files, key=lambda p: (p.stat().st_mtime_ns, p.name))
+
+
+def _scan_seconds(root: Path) -> float:
+    t0 = time.perf_counter()
+    ds.dataset(str(root), format="parquet", partitioning="hive").to_table()
+    return time.perf_counter() - t0
+
+
+def dedupe_last(table: pa.Table, key: str = BarField.DATE.value) -> pa.Table:
+    """
+    Sort `table` by `key` and keep the last row of every key value
+    (later rows were written later and win).
+    """
+    values = table.column(key).to_numpy()
+    order = np.lexsort((np.arange(len(values)), values))
+    ordered = values[order]
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = ordered[1:] != ordered[:-1]
+    return table.take(pa.array(order[last]))
+
+
+@dataclass
+class DatasetCompactor:
+    """
+    Rewrite fragmented ticker partitions of a processed dataset into
+    dt-sorted files of at most `target_rows` rows, dropping duplicate
+    (ticker, dt) bars.
+
+    Each partition is written to a hidden staging directory first and then
+    swapped in by two renames, so a scan never sees a mix of old and new
+    files. Between the renames the partition is absent, so this is not
+    safe under concurrent readers: run it on an unpublished copy (what
+    xfin-data compact does via staged_version). Stored feature columns are
+    kept as they are.
+    """
+
+    root: Path
+    options: ParquetOptions = field(default_factory=ParquetOptions)
+    target_rows: int = 1_000_000
+    # partitions with fewer fragments are left alone unless they hold duplicates
+    min_files: int = 2
+    dedupe: bool = True
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+        if self.target_rows <= 0:
+            raise ValueError(f"target_rows must be positive, got {self.target_rows}")
+
+    def run(self, *, measure_scan: bool = True) -> CompactionReport:
+        t0 = time.perf_counter()
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"Path not found: {self.root}")
+
+        report = CompactionReport()
+        if measure_scan:
+            report.scan_s_before = _scan_seconds(self.root)
+
+        partitions = sorted(
+            p for p in self.root.glob(f"{BarField.TICKER.value}=*") if p.is_dir()
+        )
+        staging = self.root / f".compact-{uuid.uuid4().hex}"
+        try:
+            for partition in partitions:
+                report.partitions += 1
+                self._compact(partition, staging, report)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        if report.compacted:
+            update_index(self.root)
+        if measure_scan:
+            report.scan_s_after = _scan_seconds(self.root)
+        report.seconds = time.perf_counter() - t0
+        logger.info(
+            "Compacted %d of %d partitions: files %d -> %d, duplicates removed %d (%.2fs)",
+            report.compacted,
+            report.partitions,
+            report.files_before,
+            report.files_after,
+            report.duplicates,
+            report.seconds,
+        )
+        return report
+
+    def _compact(self, partition: Path, staging: Path, report: CompactionReport) -> None:
+        files = _fragments(partition)
+        size = sum(f.stat().st_size for f in files)
+        report.files_before += len(files)
+        report.bytes_before += size
+
+        # partitioning=None: the ticker stays a partition key, not a file column
+        tables = [pq.read_table(f, partitioning=None) for f in files]
+        table = pa.concat_tables(tables, promote_options="permissive") if tables else None
+        rows = table.num_rows if table is not None else 0
+        report.rows_before += rows
+
+        if table is not None and self.dedupe:
+            table = dedupe_last(table)
+        if table is None or (len(files) < self.min_files and table.num_rows == rows):
+            report.files_after += len(files)
+            report.bytes_after += size
+            report.rows_after += rows
+            return
+
+        if not self.dedupe:
+            dates = table.column(BarField.DATE.value).to_numpy()
+            table = table.take(pa.array(np.argsort(dates, kind="stable")))
+        table = table.cast(self.options.apply_schema(table.schema))
+
+        new = staging / partition.name
+        new.mkdir(parents=True)
+        written = self._write(table, new)
+
+        # swap: the partition is briefly absent (never half-written)
+        old = staging / f"{partition.name}.old"
+        os.rename(partition, old)
+        os.rename(new, partition)
+        shutil.rmtree(old)
+
+        report.compacted += 1
+        report.files_after += len(written)
+        report.bytes_after += sum((partition / f.name).stat().st_size for f in written)
+        report.rows_after += table.num_rows
+        logger.debug("Compacted %s: %d -> %d files", partition.name, len(files), len(written))
+
+    def _write(self, table: pa.Table, folder: Path) -> list[Path]:
+        written = []
+        for i, start in enumerate(range(0, max(table.num_rows, 1), self.target_rows)):
+            path = folder / f"part-{i}.parquet"
+            pq.write_table(
+                table.slice(start, self.target_rows),
+                path,
+                row_group_size=self.options.row_group_size,
+                **self.options.parquet_kwargs(),
+            )
+            written.append(path)
+        return written
@@ -1,30 +1,110 @@
 from __future__ import annotations
 
 import logging
+import multiprocessing
 import time
-from dataclasses import dataclass
+import uuid
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import AsyncIterator, Iterator
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from xfin.cache import FrameCache, cache_key, stat_fingerprint
 from xfin.config import AppConfig
+from xfin.data_engine.core.incremental import (
+    IngestPlan,
+    drop_partitions,
+    manifest_key,
+    plan_ingest,
+)
+from xfin.data_engine.core.reconcile import file_ranks, reconcile
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.metrics import PipelineMetrics
+from xfin.data_engine.domain.models import BarField
 from xfin.data_engine.features.builder import BarDatasetBuilder
+from xfin.data_engine.features.engine import FeatureEngine
+from xfin.data_engine.features.lazy import remove_feature_sidecar, write_feature_sidecar
+from xfin.data_engine.features.state import FeatureState
+from xfin.data_engine.io.index import INDEX_NAME, update_index
 from xfin.data_engine.io.parsers import MstBarParser
+from xfin.data_engine.io.manifest import DatasetManifest
 from xfin.data_engine.io.repository import MstRepository
 from xfin.data_engine.io.sources import LocalFileSource
+from xfin.data_engine.io.writer import (
+    ParquetOptions,
+    PartitionedParquetWriter,
+    partition_tickers,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _last_date(batch: BarBatch) -> str | None:
+    last = batch.last_date()
+    return last.isoformat() if last is not None else None
+
+
+def _stored_layout_matches(out: Path, schema: pa.Schema) -> bool:
+    """Whether fragments already in `out` were written with `schema` (minus the partition key)."""
+    partitions = sorted(out.glob(f"{BarField.TICKER.value}=*"))
+    fragment = next((f for d in partitions for f in sorted(d.glob("*.parquet"))), None)
+    if fragment is None:
+        return True
+    stored = pq.read_schema(fragment)
+    want = [(f.name, f.type) for f in schema if f.name != BarField.TICKER.value]
+    return [(f.name, f.type) for f in stored] == want
+
+
+@dataclass
+class WriteSummary:
+    """Outcome of an Arrow-native dataset build (BuildDatasetPipeline.write)."""
+
+    files: int = 0
+    rows: int = 0
+    tickers: set[str] = field(default_factory=set)
+    skipped_files: int = 0
+    appended_files: int = 0
+    metrics: PipelineMetrics = field(default_factory=PipelineMetrics)
+
+
 @dataclass
 class BuildDatasetPipeline:
     cfg: AppConfig = AppConfig()
+    builder: BarDatasetBuilder = field(default_factory=BarDatasetBuilder)
+    # Reuse frames built by run() from identical raw files, builder config and code
+    cache: FrameCache | None = None
+    # Compression, row groups and dtypes of the written Parquet files
+    parquet: ParquetOptions = field(default_factory=ParquetOptions)
+    # Instrumentation of the most recent run()/write() (reset at the start of each)
+    metrics: PipelineMetrics = field(default_factory=PipelineMetrics, init=False)
+    _executor: Executor | None = field(default=None, init=False, repr=False)
 
-    async def run(
-        self, folder: Path | None = None, pattern: str = "*.mst"
-    ) -> pd.DataFrame:
-        t0 = time.perf_counter()
+    @contextmanager
+    def _parse_executor(self) -> Iterator[None]:
+        """Own a process pool for the duration of one run when parse_workers > 0."""
+        workers = self.cfg.data_engine.parse_workers
+        if workers <= 0:
+            yield
+            return
+
+        # spawn: the event loop already runs worker threads, fork is unsafe then
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            logger.info("Parsing with a process pool (workers=%d)", workers)
+            self._executor = pool
+            try:
+                yield
+            finally:
+                self._executor = None
 
+    def _find_files(self, folder: Path | None, pattern: str) -> list[str]:
         folder = folder or self.cfg.data_engine.raw_dir
         logger.info("Building dataset from folder=%s pattern=%s", folder, pattern)
 
@@ -35,28 +115,125 @@ class BuildDatasetPipeline:
             raise FileNotFoundError(
                 f"No files matched pattern={pattern!r} in folder={str(folder)!r}"
             )
+        return paths
 
-        repo = MstRepository(
+    def _repository(
+        self,
+        paths: list[str],
+        offsets: dict[str, int] | None = None,
+        ends: dict[str, int] | None = None,
+    ) -> MstRepository:
+        return MstRepository(
             locators=paths,
             source=LocalFileSource(),
             parser=MstBarParser(delimiter=",", has_header=True),
             max_concurrency=self.cfg.data_engine.max_concurrency,
+            offsets=offsets or {},
+            ends=ends or {},
+            executor=self._executor,
+            chunk_size=self.cfg.data_engine.parse_chunk_size,
+            max_in_flight=self.cfg.data_engine.max_in_flight,
+            ordered=self.cfg.data_engine.ordered,
+            metrics=self.metrics,
         )
 
-        bars = []
-        count = 0
+    def _log_metrics(self) -> None:
+        m = self.metrics
+        skipped = m.skipped()
+        logger.info(
+            "Ingest metrics: files=%d bytes=%d skipped(empty=%d badcols=%d other=%d) "
+            "replaced=%d queue depth max=%d mean=%.1f stages=%s",
+            len(m.files),
+            m.bytes,
+            skipped.skipped_empty,
+            skipped.skipped_badcols,
+            skipped.skipped_other,
+            m.replaced_rows,
+            m.queue_depth_max,
+            m.queue_depth_mean,
+            {k: round(v, 3) for k, v in m.stages.items()},
+        )
+        for f in m.slowest_files(3):
+            logger.debug(
+                "Slow file %s: read=%.3fs parse=%.3fs rows=%d (%.0f rows/s)",
+                f.locator,
+                f.read_s,
+                f.parse_s,
+                f.rows,
+                f.rows_per_s,
+            )
+
+    async def run(
+        self, folder: Path | None = None, pattern: str = "*.mst"
+    ) -> pd.DataFrame:
+        """Build the feature DataFrame; timings and counters end up in self.metrics."""
+        self.metrics = PipelineMetrics()
+        with self.metrics.stage("discover"):
+            paths = self._find_files(folder, pattern)
+
+        if self.cache is None:
+            df = await self._build_frame(paths)
+        else:
+            de = self.cfg.data_engine
+            key = cache_key(
+                "bars-frame", stat_fingerprint(paths), self.builder, de.dedupe, de.priority
+            )
+            with self.metrics.stage("cache"):
+                df = self.cache.get(key)
+            if df is None:
+                df = await self._build_frame(paths)
+                with self.metrics.stage("cache"):
+                    self.cache.put(key, df)
 
-        async for bar in repo.iter_bars():
-            bars.append(bar)
-            count += 1
+        self._log_metrics()
+        return df
+
+    async def _build_frame(self, paths: list[str]) -> pd.DataFrame:
+        with self._parse_executor():
+            return await self._run(paths)
+
+    async def _run(self, paths: list[str]) -> pd.DataFrame:
+        t0 = time.perf_counter()
 
-            if count % 100_000 == 0:
-                logger.debug("Parsed %d bars so far", count)
+        repo = self._repository(paths)
 
-        logger.info("Parsed %d bars in %.2fs", count, time.perf_counter() - t0)
+        builder = self.builder
+
+        de = self.cfg.data_engine
+        if de.columnar:
+            with self.metrics.stage("load"):
+                files = [item async for item in repo.iter_columnar_by_file()]
+            count = sum(len(b) for _, b in files)
+            logger.info("Parsed %d bars (columnar) in %.2fs", count, time.perf_counter() - t0)
+        else:
+            files = []
+            count = 0
+
+            with self.metrics.stage("load"):
+                async for loc, file_bars in repo.iter_bars_by_file():
+                    files.append((loc, file_bars))
+                    count += len(file_bars)
+                    logger.debug("Parsed %d bars so far", count)
+
+            logger.info("Parsed %d bars in %.2fs", count, time.perf_counter() - t0)
 
         t1 = time.perf_counter()
-        df = BarDatasetBuilder(add_basic_features=True).to_dataframe(bars)
+        if de.dedupe:
+            # one bar per (ticker, dt), sorted on the column arrays
+            with self.metrics.stage("reconcile"):
+                if not de.columnar:
+                    files = [(loc, BarBatch.from_bars(b)) for loc, b in files]
+                batch, self.metrics.replaced_rows = reconcile(
+                    files, file_ranks([loc for loc, _ in files], de.priority)
+                )
+            with self.metrics.stage("dataframe"):
+                df = builder.columnar_to_dataframe([batch], presorted=True)
+        elif de.columnar:
+            with self.metrics.stage("dataframe"):
+                df = builder.columnar_to_dataframe([b for _, b in files])
+        else:
+            with self.metrics.stage("dataframe"):
+                df = builder.to_dataframe([bar for _, bars in files for bar in bars])
 
         logger.info(
             "Built dataframe in %.2fs (rows=%d cols=%d)",
@@ -66,3 +243,265 @@ class BuildDatasetPipeline:
         )
 
         return df
+
+    async def write(
+        self,
+        out: Path,
+        folder: Path | None = None,
+        pattern: str = "*.mst",
+        *,
+        incremental: bool = False,
+    ) -> WriteSummary:
+        """
+        Arrow-native build: parse each file into a record batch and stream it
+        straight into the ticker-partitioned Parquet dataset at `out`.
+
+        The full pandas frame is never materialised; batches hold the core
+        bar columns (BAR_SCHEMA) plus the builder's features, sorted by
+        (ticker, dt) within each file. Tickers that several raw files feed
+        are then rebuilt from all those files at once, reconciled across
+        files like run() (so their rows are held in memory together).
+
+        A manifest of ingested files is saved to `out`. With incremental=True
+        it is consulted first: unchanged files are skipped and only the
+        ticker partitions fed by new/changed/removed files are rewritten.
+        Files that were only appended to are parsed from their stored byte
+        offset and the new bars land in a new fragment of their partition;
+        their features continue from the per-ticker window tails persisted
+        in <out>/_feature_state.parquet instead of re-reading history.
+
+        The returned summary carries the run's PipelineMetrics; parsing and
+        writing overlap, so the "write" stage includes parse time.
+        """
+        self.metrics = PipelineMetrics()
+        with self._parse_executor():
+            summary = await self._write(out, folder, pattern, incremental)
+        summary.metrics = self.metrics
+        self._log_metrics()
+        return summary
+
+    async def _write(
+        self, out: Path, folder: Path | None, pattern: str, incremental: bool
+    ) -> WriteSummary:
+        t0 = time.perf_counter()
+        out = Path(out)
+        if not incremental:
+            # rebuilt at the end; until then readers scan instead of trusting it
+            (out / INDEX_NAME).unlink(missing_ok=True)
+
+        with self.metrics.stage("discover"):
+            paths = self._find_files(folder, pattern)
+        engine = self._feature_engine()
+        with self.metrics.stage("plan"):
+            previous = DatasetManifest.load(out) if incremental else DatasetManifest()
+            state = FeatureState.load(out, engine) if incremental else None
+            # Stored features (and their state) and file layout must match the current spec
+            force = bool(previous.files) and (
+                state is None or not _stored_layout_matches(out, self._schema(engine))
+            )
+            if force:
+                logger.info(
+                    "Stored features or file layout of %s changed; rewriting all partitions",
+                    out,
+                )
+            state = state or FeatureState(engine)
+            # a full build compares against nothing, so skip hashing the input
+            plan = await plan_ingest(paths, previous, force=force, hash_files=incremental)
+
+        summary = WriteSummary(skipped_files=len(plan.skip))
+        manifest = DatasetManifest(
+            files={manifest_key(loc): plan.entries[loc] for loc in plan.skip}
+        )
+        logger.info(
+            "Ingest plan: parse=%d append=%d skip=%d removed=%d",
+            len(plan.parse),
+            len(plan.append),
+            len(plan.skip),
+            len(plan.removed),
+        )
+
+        rewritten: set[str] = set()
+        # read files only up to the size recorded (and hashed) in the manifest:
+        # bytes appended during the build are picked up by the next one
+        planned = {loc: entry.size for loc, entry in plan.entries.items()}
+
+        async def batches() -> AsyncIterator[pa.RecordBatch]:
+            repo = self._repository(plan.parse, ends=planned)
+            async for loc, bars in repo.iter_columnar_by_file():
+                summary.files += 1
+                bars = self._dedupe_file(loc, bars)
+                tickers = bars.unique_tickers()
+
+                entry = plan.entries[loc]
+                entry.rows = len(bars)
+                entry.tickers = tickers
+                entry.last_dt = _last_date(bars)
+                entry.offset = entry.size
+                manifest.files[manifest_key(loc)] = entry
+
+                if not len(bars):
+                    continue
+                summary.rows += len(bars)
+                summary.tickers.update(tickers)
+                # partitions rewritten from scratch start with a fresh window
+                state.reset(set(tickers) - rewritten)
+                rewritten.update(tickers)
+                yield state.apply(bars)
+
+        if plan.parse:
+            with self.metrics.stage("write"):
+                await PartitionedParquetWriter(
+                    out=out, schema=engine.schema(), options=self.parquet
+                ).write(batches())
+
+        if plan.append:
+            with self.metrics.stage("append"):
+                await self._append_tails(out, plan, manifest, summary, state)
+
+        # Batches were streamed file by file, so a ticker written this run
+        # that any other raw file also feeds (re-parsed or not) may hold
+        # cross-file duplicates and features computed out of date order.
+        # Rebuild those partitions from all their files, as run() would.
+        sources = Counter(t for loc in paths for t in plan.entries[loc].tickers)
+        shared = {t for t in summary.tickers if sources[t] > 1}
+        if shared:
+            with self.metrics.stage("reconcile"):
+                await self._rebuild_tickers(
+                    out,
+                    [loc for loc in paths if shared.intersection(plan.entries[loc].tickers)],
+                    shared,
+                    state,
+                    ends=planned,
+                )
+
+        # Partitions whose only source files were removed or emptied; a full
+        # build into an existing dataset also drops tickers it did not write
+        drop_partitions(out, plan.affected - summary.tickers)
+        if not incremental:
+            drop_partitions(out, partition_tickers(out) - summary.tickers)
+        state.reset(plan.affected - summary.tickers)
+        state.save(out)
+        self.sync_feature_sidecar(out)
+        update_index(out)
+        manifest.save(out)
+
+        logger.info(
+            "Wrote %d bars from %d files (tickers=%d, skipped files=%d) in %.2fs",
+            summary.rows,
+            summary.files,
+            len(summary.tickers),
+            summary.skipped_files,
+            time.perf_counter() - t0,
+        )
+        return summary
+
+    def _feature_engine(self) -> FeatureEngine:
+        """Features stored in the written dataset (none in lazy mode)."""
+        if not self.builder.add_basic_features or self.builder.lazy:
+            return FeatureEngine(())
+        return FeatureEngine(tuple(self.builder.features))
+
+    def sync_feature_sidecar(self, out: Path) -> None:
+        """Declare the builder's features in <out>/_features.json when they are lazy."""
+        if self.builder.add_basic_features and self.builder.lazy:
+            write_feature_sidecar(out, self.builder.features)
+        else:
+            remove_feature_sidecar(out)
+
+    def _dedupe_file(self, loc: str, bars: BarBatch) -> BarBatch:
+        """
+        One bar per (ticker, dt) within a streamed file (the later row wins).
+        Batches are written as they arrive; tickers fed by several files are
+        reconciled afterwards by _rebuild_tickers().
+        """
+        if not self.cfg.data_engine.dedupe:
+            return bars
+        bars, replaced = reconcile([(loc, bars)])
+        self.metrics.replaced_rows += replaced
+        return bars
+
+    def _schema(self, engine: FeatureEngine) -> pa.Schema:
+        """Arrow schema of the written files."""
+        return self.parquet.apply_schema(engine.schema())
+
+    def _append_writer(self, out: Path, state: FeatureState) -> PartitionedParquetWriter:
+        """Writer adding new fragments next to existing ones (no deletes)."""
+        return PartitionedParquetWriter(
+            out=out,
+            schema=state.engine.schema(),
+            options=self.parquet,
+            existing_data_behavior="overwrite_or_ignore",
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        )
+
+    async def _rebuild_tickers(
+        self,
+        out: Path,
+        paths: list[str],
+        tickers: set[str],
+        state: FeatureState,
+        *,
+        ends: dict[str, int],
+    ) -> None:
+        """
+        Rewrite the partitions of `tickers` from their rows in all of `paths`,
+        merged into one (ticker, dt)-sorted batch: with dedupe, one bar per
+        (ticker, dt) resolved across files by file_ranks() as in run().
+        """
+        de = self.cfg.data_engine
+        files = []
+        async for loc, bars in self._repository(paths, ends=ends).iter_columnar_by_file():
+            bars = bars.take(np.flatnonzero(bars.ticker_mask(tickers)))
+            if de.dedupe:
+                # within-file duplicates were counted when the file was streamed
+                bars = bars.take(bars.dedupe_order())
+            files.append((loc, bars))
+
+        if de.dedupe:
+            merged, replaced = reconcile(files, file_ranks(paths, de.priority))
+            self.metrics.replaced_rows += replaced
+        else:
+            merged = BarBatch.concat([b for _, b in files])
+
+        logger.info("Rebuilding %d partitions fed by several raw files", len(tickers))
+        drop_partitions(out, tickers)
+        state.reset(tickers)
+
+        async def batches() -> AsyncIterator[pa.RecordBatch]:
+            if len(merged):
+                yield state.apply(merged)
+
+        await self._append_writer(out, state).write(batches())
+
+    async def _append_tails(
+        self,
+        out: Path,
+        plan: IngestPlan,
+        manifest: DatasetManifest,
+        summary: WriteSummary,
+        state: FeatureState,
+    ) -> None:
+        """Parse only the bytes appended since the last build and add them as new fragments."""
+
+        async def batches() -> AsyncIterator[pa.RecordBatch]:
+            ends = {loc: plan.entries[loc].size for loc in plan.append}
+            repo = self._repository(list(plan.append), offsets=plan.append, ends=ends)
+            async for loc, bars in repo.iter_columnar_by_file():
+                summary.appended_files += 1
+                bars = self._dedupe_file(loc, bars)
+                tickers = bars.unique_tickers()
+
+                entry = plan.entries[loc]
+                entry.rows += len(bars)
+                entry.tickers = sorted(set(entry.tickers).union(tickers))
+                entry.last_dt = max(filter(None, [entry.last_dt, _last_date(bars)]), default=None)
+                entry.offset = entry.size
+                manifest.files[manifest_key(loc)] = entry
+
+                if not len(bars):
+                    continue
+                summary.rows += len(bars)
+                summary.tickers.update(tickers)
+                yield state.apply(bars)
+
+        await self._append_writer(out, state).write(batches())
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import PurePath
+from typing import Sequence
+
+import numpy as np
+
+from xfin.data_engine.domain.batch import BarBatch
+
+logger = logging.getLogger(__name__)
+
+
+def file_ranks(locators: Sequence[str], patterns: Sequence[str] = ()) -> dict[str, int]:
+    """
+    Rank raw files for last-write-wins: by the last of `patterns` a file
+    matches (unmatched files lowest), then by mtime, then by path.
+    Higher rank wins.
+
+    Patterns match from the right of the path (PurePath.match), so
+    "fix*.mst" matches by file name and "corrections/*.mst" matches files
+    in any folder named corrections, wherever the raw folder lives.
+    """
+
+    def key(loc: str) -> tuple[int, int, str]:
+        path = PurePath(loc)
+        matched = [i for i, pat in enumerate(patterns) if path.match(pat)]
+        return (max(matched, default=-1), os.stat(loc).st_mtime_ns, loc)
+
+    return {loc: rank for rank, loc in enumerate(sorted(locators, key=key))}
+
+
+def reconcile(
+    files: Sequence[tuple[str, BarBatch]], ranks: dict[str, int] | None = None
+) -> tuple[BarBatch, int]:
+    """
+    Merge per-file batches into one (ticker, dt)-sorted batch with a single
+    bar per (ticker, dt). A duplicate is resolved in favour of the file with
+    the higher rank (see file_ranks); within a file the later row wins.
+
+    Returns the batch and the number of rows that were replaced.
+    """
+    merged = BarBatch.concat([b for _, b in files])
+    prio = None
+    if ranks is not None and files:
+        # empty batches contribute no rows, so this lines up with concat()
+        prio = np.concatenate([np.full(len(b), ranks[loc], dtype=np.int64) for loc, b in files])
+
+    keep = merged.dedupe_order(prio)
+    replaced = len(merged) - len(keep)
+    if replaced:
+        logger.info("Reconciled %d duplicate (ticker, dt) bars", replaced)
+    return merged.take(keep), replaced
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .models import BAR_SCHEMA, BarField, OHLCVBar
+
+_EPOCH = date(1970, 1, 1)
+_NS_PER_DAY = 86_400 * 10**9
+_FLOAT_FIELDS = ("open", "high", "low", "close", "vol", "openint")
+
+
+@dataclass(frozen=True, slots=True)
+class BarBatch:
+    """
+    Struct-of-arrays container for many bars.
+
+    tickers:      dictionary of ticker symbols
+    ticker_codes: int32 index into `tickers`, one per bar
+    dates:        int32 days since 1970-01-01
+    open..openint: float64 columns (openint NaN when missing)
+
+    OHLCVBar stays available as a row view (row(), iteration) for callers
+    that still work bar by bar.
+    """
+
+    tickers: tuple[str, ...]
+    ticker_codes: np.ndarray
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    vol: np.ndarray
+    openint: np.ndarray
+
+    def __post_init__(self) -> None:
+        n = len(self.ticker_codes)
+        for name in ("dates", *_FLOAT_FIELDS):
+            if len(getattr(self, name)) != n:
+                raise ValueError(
+                    f"BarBatch column {name!r} has {len(getattr(self, name))} rows, expected {n}"
+                )
+
+    # --- construction -------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> "BarBatch":
+        f = np.empty(0, dtype=np.float64)
+        i = np.empty(0, dtype=np.int32)
+        return cls((), i, i, f, f, f, f, f, f)
+
+    @classmethod
+    def from_arrow(cls, data: pa.Table | pa.RecordBatch) -> "BarBatch":
+        """Build from columns laid out like BAR_SCHEMA (dt as timestamp or date32)."""
+        if data.num_rows == 0:
+            return cls.empty()
+
+        ticker = data.column(BarField.TICKER.value)
+        if isinstance(ticker, pa.ChunkedArray):
+            ticker = ticker.combine_chunks()
+        encoded = ticker.cast(pa.string()).dictionary_encode()
+
+        dt = data.column(BarField.DATE.value)
+        days = pc.cast(pc.cast(dt, pa.date32()), pa.int32())
+
+        def floats(name: str) -> np.ndarray:
+            col = pc.fill_null(pc.cast(data.column(name), pa.float64()), np.nan)
+            return np.asarray(col.to_numpy(), dtype=np.float64)
+
+        return cls(
+            tickers=tuple(encoded.dictionary.to_pylist()),
+            ticker_codes=encoded.indices.to_numpy().astype(np.int32, copy=False),
+            dates=np.asarray(days.to_numpy(), dtype=np.int32),
+            **{name: floats(name) for name in _FLOAT_FIELDS},
+        )
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[OHLCVBar]) -> "BarBatch":
+        bars = list(bars)
+        if not bars:
+            return cls.empty()
+
+        index: dict[str, int] = {}
+        codes = np.fromiter(
+            (index.setdefault(b.ticker, len(index)) for b in bars),
+            dtype=np.int32,
+            count=len(bars),
+        )
+        dates = np.fromiter(
+            ((b.dt - _EPOCH).days for b in bars), dtype=np.int32, count=len(bars)
+        )
+
+        def floats(name: str) -> np.ndarray:
+            return np.fromiter(
+                (
+                    np.nan if getattr(b, name) is None else getattr(b, name)
+                    for b in bars
+                ),
+                dtype=np.float64,
+                count=len(bars),
+            )
+
+        return cls(
+            tickers=tuple(index),
+            ticker_codes=codes,
+            dates=dates,
+            **{name: floats(name) for name in _FLOAT_FIELDS},
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["BarBatch"]) -> "BarBatch":
+        """Concatenate batches, merging their ticker dictionaries."""
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+
+        index: dict[str, int] = {}
+        codes = []
+        for b in batches:
+            remap = np.array(
+                [index.setdefault(t, len(index)) for t in b.tickers], dtype=np.int32
+            )
+            codes.append(remap[b.ticker_codes])
+
+        return cls(
+            tickers=tuple(index),
+            ticker_codes=np.concatenate(codes),
+            dates=np.concatenate([b.dates for b in batches]),
+            **{
+                name: np.concatenate([getattr(b, name) for b in batches])
+                for name in _FLOAT_FIELDS
+            },
+        )
+
+    # --- access -------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ticker_codes)
+
+    def row(self, i: int) -> OHLCVBar:
+        return OHLCVBar(
+            ticker=self.tickers[self.ticker_codes[i]],
+            dt=_EPOCH + timedelta(days=int(self.dates[i])),
+            open=float(self.open[i]),
+            high=float(self.high[i]),
+            low=float(self.low[i]),
+            close=float(self.close[i]),
+            vol=float(self.vol[i]),
+            openint=float(self.openint[i]),
+        )
+
+    def __iter__(self) -> Iterator[OHLCVBar]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def unique_tickers(self) -> list[str]:
+        """Tickers actually present (the dictionary may hold unused entries)."""
+        return sorted(self.tickers[c] for c in np.unique(self.ticker_codes))
+
+    def last_date(self) -> date | None:
+        if not len(self):
+            return None
+        return _EPOCH + timedelta(days=int(self.dates.max()))
+
+    # --- transforms ---------------------------------------------------
+
+    def take(self, indices: np.ndarray) -> "BarBatch":
+        return BarBatch(
+            tickers=self.tickers,
+            ticker_codes=self.ticker_codes[indices],
+            dates=self.dates[indices],
+            **{name: getattr(self, name)[indices] for name in _FLOAT_FIELDS},
+        )
+
+    def ticker_mask(self, tickers: Iterable[str]) -> np.ndarray:
+        wanted = set(tickers)
+        hit = np.array([t in wanted for t in self.tickers], dtype=bool)
+        return hit[self.ticker_codes] if len(hit) else np.zeros(len(self), dtype=bool)
+
+    def _ticker_rank(self) -> np.ndarray:
+        """Per-row rank of the ticker symbol in sorted symbol order."""
+        rank = np.empty(len(self.tickers), dtype=np.int32)
+        rank[np.argsort(np.array(self.tickers, dtype=object), kind="stable")] = np.arange(
+            len(self.tickers), dtype=np.int32
+        )
+        return rank[self.ticker_codes]
+
+    def sort_order(self) -> np.ndarray:
+        """Indices of a stable sort by (ticker symbol, date)."""
+        if not len(self):
+            return np.empty(0, dtype=np.intp)
+        return np.lexsort((self.dates, self._ticker_rank()))
+
+    def dedupe_order(self, priority: np.ndarray | None = None) -> np.ndarray:
+        """
+        Indices of the (ticker, date)-sorted batch with one row per
+        (ticker, date): the one with the highest `priority` (per row),
+        later rows winning ties.
+        """
+        n = len(self)
+        if not n:
+            return np.empty(0, dtype=np.intp)
+        prio = np.zeros(n, dtype=np.int64) if priority is None else np.asarray(priority)
+        if len(prio) != n:
+            raise ValueError(f"priority has {len(prio)} rows, expected {n}")
+
+        ticker = self._ticker_rank()
+        order = np.lexsort((np.arange(n), prio, self.dates, ticker))
+        t, d = ticker[order], self.dates[order]
+        last = np.ones(n, dtype=bool)
+        last[:-1] = (t[1:] != t[:-1]) | (d[1:] != d[:-1])
+        return order[last]
+
+    def sort_by_ticker_date(self) -> "BarBatch":
+        """Stable sort by (ticker symbol, date), like the pandas path."""
+        if not len(self):
+            return self
+        return self.take(self.sort_order())
+
+    # --- export -------------------------------------------------------
+
+    def _ticker_array(self) -> pa.Array:
+        return pa.array(self.tickers, pa.string()).take(pa.array(self.ticker_codes))
+
+    def to_arrow(self) -> pa.RecordBatch:
+        dt = pa.array(self.dates.astype(np.int64) * _NS_PER_DAY, pa.timestamp("ns"))
+        return pa.RecordBatch.from_arrays(
+            [
+                self._ticker_array(),
+                dt,
+                *(pa.array(getattr(self, name)) for name in _FLOAT_FIELDS),
+            ],
+            schema=BAR_SCHEMA,
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                BarField.TICKER.value: np.array(self.tickers, dtype=object)[self.ticker_codes]
+                if self.tickers
+                else np.empty(0, dtype=object),
+                BarField.DATE.value: (self.dates.astype(np.int64) * _NS_PER_DAY).view(
+                    "datetime64[ns]"
+                ),
+                **{name: getattr(self, name) for name in _FLOAT_FIELDS},
+            }
+        )
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+
+@dataclass
+class ParseStats:
+    """Rows produced and skipped by one parser call."""
+
+    rows: int = 0
+    skipped_empty: int = 0
+    skipped_badcols: int = 0
+    skipped_other: int = 0
+
+
+@dataclass
+class FileMetrics:
+    """
+    Read/parse cost of one raw file.
+
+    read_s is the time to get the file's contents (for mmap'd files just
+    mapping it; page faults then land in parse_s). When lines are streamed
+    into the row parser, reading and parsing interleave and all of it is
+    counted as parse_s.
+    """
+
+    locator: str
+    bytes: int = 0
+    read_s: float = 0.0
+    parse_s: float = 0.0
+    stats: ParseStats = field(default_factory=ParseStats)
+
+    @property
+    def seconds(self) -> float:
+        return self.read_s + self.parse_s
+
+    @property
+    def rows(self) -> int:
+        return self.stats.rows
+
+    @property
+    def bytes_per_s(self) -> float:
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "seconds": self.seconds,
+            "bytes_per_s": self.bytes_per_s,
+            "rows_per_s": self.rows_per_s,
+        }
+
+
+@dataclass
+class PipelineMetrics:
+    """
+    Instrumentation of one pipeline run.
+
+    files:  per-file read/parse metrics, in completion order
+    stages: wall time per pipeline stage in seconds (e.g. load, dataframe, write)
+    queue depth: files (or executor chunks) in flight in MstRepository,
+                 sampled each time a result is handed to the consumer
+    replaced_rows: duplicate (ticker, dt) bars dropped by reconciliation
+    """
+
+    files: list[FileMetrics] = field(default_factory=list)
+    stages: dict[str, float] = field(default_factory=dict)
+    queue_depth_max: int = 0
+    queue_depth_total: int = 0
+    queue_depth_samples: int = 0
+    replaced_rows: int = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block; repeated stages accumulate."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def record_file(self, metrics: FileMetrics) -> None:
+        self.files.append(metrics)
+
+    def record_queue_depth(self, depth: int) -> None:
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+        self.queue_depth_total += depth
+        self.queue_depth_samples += 1
+
+    @property
+    def queue_depth_mean(self) -> float:
+        if not self.queue_depth_samples:
+            return 0.0
+        return self.queue_depth_total / self.queue_depth_samples
+
+    @property
+    def rows(self) -> int:
+        return sum(f.rows for f in self.files)
+
+    @property
+    def bytes(self) -> int:
+        return sum(f.bytes for f in self.files)
+
+    def skipped(self) -> ParseStats:
+        """Parser counters summed over all files (rows included)."""
+        total = ParseStats()
+        for f in self.files:
+            total.rows += f.stats.rows
+            total.skipped_empty += f.stats.skipped_empty
+            total.skipped_badcols += f.stats.skipped_badcols
+            total.skipped_other += f.stats.skipped_other
+        return total
+
+    def slowest_files(self, n: int = 10) -> list[FileMetrics]:
+        return sorted(self.files, key=lambda f: f.seconds, reverse=True)[:n]
+
+    def to_dict(self) -> dict:
+        load = self.stages.get("load", 0.0)
+        return {
+            "stages": dict(self.stages),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "rows_per_s": self.rows / load if load > 0 else 0.0,
+            "bytes_per_s": self.bytes / load if load > 0 else 0.0,
+            "skipped": asdict(self.skipped()),
+            "queue_depth": {"max": self.queue_depth_max, "mean": self.queue_depth_mean},
+            "replaced_rows": self.replaced_rows,
+            "files": [f.to_dict() for f in self.files],
+        }
+
+    def dump_json(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
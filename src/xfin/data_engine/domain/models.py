@@ -4,6 +4,7 @@ from datetime import date, datetime
 from enum import Enum
 from typing import Sequence, Optional
 
+import pyarrow as pa
 from pydantic.dataclasses import dataclass
 
 
@@ -18,6 +19,21 @@ class BarField(str, Enum):
     OPENINT = "openint"
 
 
+# Arrow layout of the core bar columns (same order/types as the pandas path)
+BAR_SCHEMA = pa.schema(
+    [
+        pa.field(BarField.TICKER.value, pa.string()),
+        pa.field(BarField.DATE.value, pa.timestamp("ns")),
+        pa.field(BarField.OPEN.value, pa.float64()),
+        pa.field(BarField.HIGH.value, pa.float64()),
+        pa.field(BarField.LOW.value, pa.float64()),
+        pa.field(BarField.CLOSE.value, pa.float64()),
+        pa.field(BarField.VOL.value, pa.float64()),
+        pa.field(BarField.OPENINT.value, pa.float64()),
+    ]
+)
+
+
 @dataclass(frozen=True)
 class OHLCVBar:
     ticker: str
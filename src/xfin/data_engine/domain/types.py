@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Protocol
+from typing import ContextManager, Iterable, Iterator, Protocol
+
+from .batch import BarBatch
+from .metrics import ParseStats
 from .models import OHLCVBar
 
 
@@ -9,8 +12,51 @@ class BarParser(Protocol):
         ...
 
 
+class ColumnarBarParser(Protocol):
+    def parse_columnar(
+        self,
+        data: str | bytes | memoryview,
+        *,
+        filename: str | None = None,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        stats: ParseStats | None = None,
+    ) -> BarBatch:
+        ...
+
+
 class ByteSource(Protocol):
-    async def read_text(self, locator: str, encoding: str = "utf-8") -> str:
+    """Reads the bytes [offset, end) of a locator (end=None: to its end)."""
+
+    async def read_text(
+        self,
+        locator: str,
+        encoding: str = "utf-8",
+        *,
+        offset: int = 0,
+        end: int | None = None,
+    ) -> str:
+        ...
+
+
+class BufferSource(ByteSource, Protocol):
+    """A ByteSource that can also hand out raw bytes and streamed lines."""
+
+    errors: str
+
+    def open_bytes(
+        self, locator: str, *, offset: int = 0, end: int | None = None
+    ) -> ContextManager[memoryview]:
+        ...
+
+    def iter_lines(
+        self,
+        locator: str,
+        encoding: str = "utf-8",
+        *,
+        offset: int = 0,
+        end: int | None = None,
+    ) -> Iterator[str]:
         ...
 
 
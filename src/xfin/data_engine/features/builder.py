@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+from xfin.data_engine.domain.batch import BarBatch
 from xfin.data_engine.domain.models import BarField, OHLCVBar
+from xfin.data_engine.features.engine import DEFAULT_FEATURES, FeatureEngine, FeatureSpec
 
 
 @dataclass
 class BarDatasetBuilder:
     add_basic_features: bool = True
+    features: Sequence[FeatureSpec] = DEFAULT_FEATURES
+    # Declare features without computing them; readers materialise them on
+    # demand (see features.lazy.LazyFeatures)
+    lazy: bool = False
+
+    def to_dataframe(self, bars: list[OHLCVBar] | BarBatch) -> pd.DataFrame:
+        if isinstance(bars, BarBatch):
+            return self.columnar_to_dataframe([bars])
 
-    def to_dataframe(self, bars: list[OHLCVBar]) -> pd.DataFrame:
         rows = [
             {
                 BarField.TICKER.value: b.ticker,
@@ -30,29 +41,35 @@ class BarDatasetBuilder:
             return df
 
         df[BarField.DATE.value] = pd.to_datetime(df[BarField.DATE.value])
-        df = df.sort_values([BarField.TICKER.value, BarField.DATE.value]).reset_index(drop=True)
+        return self._finalize(df)
+
+    def columnar_to_dataframe(
+        self, batches: Sequence[BarBatch], *, presorted: bool = False
+    ) -> pd.DataFrame:
+        """
+        Build the same frame as to_dataframe() from per-file BarBatches
+        (MstBarParser.parse_columnar output), without per-bar objects.
+        Sorting happens on the column arrays, before pandas is involved;
+        presorted=True skips it for batches already in (ticker, dt) order.
+        """
+        batch = BarBatch.concat(batches)
+        if not len(batch):
+            return pd.DataFrame()
 
-        if self.add_basic_features:
+        if not presorted:
+            batch = batch.sort_by_ticker_date()
+        df = batch.to_dataframe()
+        return self._finalize(df, presorted=True)
+
+    def _finalize(self, df: pd.DataFrame, presorted: bool = False) -> pd.DataFrame:
+        if not presorted:
+            df = df.sort_values([BarField.TICKER.value, BarField.DATE.value]).reset_index(drop=True)
+
+        if self.add_basic_features and not self.lazy:
             df = self._add_generic_features(df)
 
         return df
 
     def _add_generic_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        t = BarField.TICKER.value
-        d = BarField.DATE.value
-        c = BarField.CLOSE.value
-        v = BarField.VOL.value
-
-        # # logdiff and pct change (example)
-        # close = df[c]
-        # prev_close = df.groupby(t)[c].shift(1)
-        # df["log_ret_1d"] = np.log(close) - np.log(prev_close)
-        # df["ret_1d"] = close / prev_close - 1.0
-        # bad_price = (close <= 0) | (prev_close <= 0)
-        # df.loc[bad_price, ["ret_1d", "log_ret_1d"]] = np.nan
-
-        # other examples
-        # df["vol_chg_1d"] = df.groupby(t)[v].pct_change()
-        # df["month"] = df[d].dt.month
-        # df["weekday"] = df[d].dt.weekday
-        return df
+        # df is sorted by (ticker, dt): one vectorised pass for all tickers
+        return FeatureEngine(self.features).apply(df)
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Callable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from numpy.lib.stride_tricks import sliding_window_view
+
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.models import BAR_SCHEMA, BarField
+
+# Rolling windows are reduced this many rows at a time, so the
+# (rows x window) temporaries stay cache-sized on a large universe
+_ROLLING_CHUNK = 1 << 12
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    One derived column.
+
+    name:   output column
+    kind:   kernel name (see KERNELS)
+    column: input column; may name a feature defined earlier in the spec
+    window: lag for return-like kinds, window length for rolling kinds
+    """
+
+    name: str
+    kind: str
+    column: str = BarField.CLOSE.value
+    window: int = 1
+
+    def __post_init__(self) -> None:
+        if self.kind not in KERNELS:
+            raise ValueError(
+                f"Unknown feature kind {self.kind!r} for {self.name!r}; "
+                f"expected one of {sorted(KERNELS)}"
+            )
+        if self.window < 1:
+            raise ValueError(f"Feature {self.name!r}: window must be >= 1, got {self.window}")
+
+
+@dataclass(frozen=True)
+class Segments:
+    """Contiguous per-ticker row ranges of a (ticker, date)-sorted array."""
+
+    starts: np.ndarray  # first row of each ticker
+    pos: np.ndarray  # row position within its ticker (0 for the first bar)
+
+    @classmethod
+    def from_keys(cls, keys: np.ndarray) -> "Segments":
+        n = len(keys)
+        if n == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(empty, empty)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        lengths = np.diff(np.r_[starts, n])
+        pos = np.arange(n) - np.repeat(starts, lengths)
+        return cls(starts, pos)
+
+
+def _lag(x: np.ndarray, seg: Segments, k: int) -> np.ndarray:
+    prev = np.full(len(x), np.nan)
+    if k < len(x):
+        prev[k:] = x[:-k]
+    prev[seg.pos < k] = np.nan
+    return prev
+
+
+def _rolling(
+    x: np.ndarray,
+    seg: Segments,
+    window: int,
+    reduce: Callable[[np.ndarray], tuple[np.ndarray, ...]],
+    n_out: int = 1,
+) -> tuple[np.ndarray, ...]:
+    """
+    Apply `reduce` to each full trailing window, never crossing a ticker
+    boundary (like groupby().rolling(window) with min_periods=window).
+    `reduce` maps a (rows, window) block to `n_out` per-row arrays.
+    """
+    outs = tuple(np.full(len(x), np.nan) for _ in range(n_out))
+    if len(x) < window:
+        return outs
+    view = sliding_window_view(x, window)
+    for lo in range(0, len(view), _ROLLING_CHUNK):
+        chunk = view[lo : lo + _ROLLING_CHUNK]
+        for out, values in zip(outs, reduce(chunk)):
+            out[lo + window - 1 : lo + window - 1 + len(chunk)] = values
+    head = seg.pos < window - 1
+    for out in outs:
+        out[head] = np.nan
+    return outs
+
+
+def _mean_std(w: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    mean = w.mean(axis=1)
+    dev = w - mean[:, None]
+    var = np.einsum("ij,ij->i", dev, dev) / (w.shape[1] - 1)
+    return mean, np.sqrt(var)
+
+
+def _ret(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    # simple return on prices; non-positive prices give NaN
+    x = cols[spec.column]
+    prev = _lag(x, seg, spec.window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = x / prev - 1.0
+    out[(x <= 0) | (prev <= 0)] = np.nan
+    return out
+
+
+def _log_ret(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    x = cols[spec.column]
+    prev = _lag(x, seg, spec.window)
+    bad = (x <= 0) | (prev <= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.log(x) - np.log(prev)
+    out[bad] = np.nan
+    return out
+
+
+def _pct_change(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    # same semantics as groupby().pct_change(): x/0 gives +-inf, 0/0 NaN
+    x = cols[spec.column]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / _lag(x, seg, spec.window) - 1.0
+
+
+def _rolling_mean(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    (mean,) = _rolling(cols[spec.column], seg, spec.window, lambda w: (w.mean(axis=1),))
+    return mean
+
+
+def _rolling_std(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    if spec.window < 2:
+        return np.full(len(cols[spec.column]), np.nan)
+    _, std = _rolling(cols[spec.column], seg, spec.window, _mean_std, n_out=2)
+    return std
+
+
+def _zscore(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    x = cols[spec.column]
+    if spec.window < 2:
+        return np.full(len(x), np.nan)
+    mean, std = _rolling(x, seg, spec.window, _mean_std, n_out=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (x - mean) / std
+    out[std == 0] = np.nan
+    return out
+
+
+def _range(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    # intraday range relative to `column` (close by default)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (cols[BarField.HIGH.value] - cols[BarField.LOW.value]) / cols[spec.column]
+    out[cols[spec.column] <= 0] = np.nan
+    return out
+
+
+def _days(cols: Mapping[str, np.ndarray]) -> np.ndarray:
+    return cols[BarField.DATE.value].astype("datetime64[D]")
+
+
+def _month(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    return (_days(cols).astype("datetime64[M]").astype(np.int64) % 12 + 1).astype(np.int32)
+
+
+def _weekday(cols: Mapping[str, np.ndarray], seg: Segments, spec: FeatureSpec) -> np.ndarray:
+    # 1970-01-01 was a Thursday (Monday=0)
+    return ((_days(cols).astype(np.int64) + 3) % 7).astype(np.int32)
+
+
+Kernel = Callable[[Mapping[str, np.ndarray], Segments, FeatureSpec], np.ndarray]
+
+KERNELS: dict[str, Kernel] = {
+    "ret": _ret,
+    "log_ret": _log_ret,
+    "pct_change": _pct_change,
+    "rolling_mean": _rolling_mean,
+    "rolling_std": _rolling_std,
+    "zscore": _zscore,
+    "range": _range,
+    "month": _month,
+    "weekday": _weekday,
+}
+
+# Rows of history one output row needs from its input column, by kind
+_HISTORY: dict[str, Callable[[int], int]] = {
+    "ret": lambda w: w,
+    "log_ret": lambda w: w,
+    "pct_change": lambda w: w,
+    "rolling_mean": lambda w: w - 1,
+    "rolling_std": lambda w: w - 1,
+    "zscore": lambda w: w - 1,
+}
+_INT_KINDS = {"month", "weekday"}
+# Columns a kind reads besides `column`
+_EXTRA_INPUTS: dict[str, tuple[str, ...]] = {
+    "range": (BarField.HIGH.value, BarField.LOW.value),
+    "month": (BarField.DATE.value,),
+    "weekday": (BarField.DATE.value,),
+}
+
+DEFAULT_FEATURES: tuple[FeatureSpec, ...] = (
+    FeatureSpec("ret_1d", "ret"),
+    FeatureSpec("log_ret_1d", "log_ret"),
+    FeatureSpec("vol_chg_1d", "pct_change", column=BarField.VOL.value),
+    FeatureSpec("close_ma_5", "rolling_mean", window=5),
+    FeatureSpec("close_ma_20", "rolling_mean", window=20),
+    FeatureSpec("volatility_20", "rolling_std", column="log_ret_1d", window=20),
+    FeatureSpec("range_1d", "range"),
+    FeatureSpec("vol_z_20", "zscore", column=BarField.VOL.value, window=20),
+    FeatureSpec("month", "month"),
+    FeatureSpec("weekday", "weekday"),
+)
+
+
+@dataclass(frozen=True)
+class FeatureEngine:
+    """
+    Computes a declarative list of features for every ticker at once.
+
+    Input rows must be sorted by (ticker, date). Per-ticker windows are
+    handled with segment offsets over the flat arrays, so each feature is
+    one vectorised pass over the whole universe instead of a groupby.
+    """
+
+    specs: Sequence[FeatureSpec] = DEFAULT_FEATURES
+
+    def compute(
+        self, columns: Mapping[str, np.ndarray], segments: Segments
+    ) -> dict[str, np.ndarray]:
+        """Return {feature name: array}; later specs may read earlier features."""
+        cols = dict(columns)
+        out: dict[str, np.ndarray] = {}
+        for spec in self.specs:
+            if spec.column not in cols:
+                raise ValueError(
+                    f"Feature {spec.name!r} needs column {spec.column!r}, "
+                    f"available: {sorted(cols)}"
+                )
+            values = KERNELS[spec.kind](cols, segments, spec)
+            cols[spec.name] = out[spec.name] = values
+        return out
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add the features to a (ticker, date)-sorted bar frame."""
+        if df.empty:
+            return df
+        return df.assign(**self.compute_frame(df))
+
+    def compute_frame(self, df: pd.DataFrame) -> dict[str, np.ndarray]:
+        """compute() over the columns of a (ticker, date)-sorted bar frame."""
+        columns = {
+            BarField.DATE.value: df[BarField.DATE.value].to_numpy(),
+            **{
+                c: df[c].to_numpy(dtype=np.float64)
+                for c in df.columns
+                if c not in (BarField.TICKER.value, BarField.DATE.value)
+                and pd.api.types.is_numeric_dtype(df[c])
+            },
+        }
+        segments = Segments.from_keys(df[BarField.TICKER.value].to_numpy())
+        return self.compute(columns, segments)
+
+    def compute_batch(self, batch: BarBatch) -> dict[str, np.ndarray]:
+        """Features for a (ticker, date)-sorted BarBatch (see sort_by_ticker_date)."""
+        columns = {
+            BarField.DATE.value: batch.dates.astype("datetime64[D]"),
+            **{
+                f.value: getattr(batch, f.value)
+                for f in BarField
+                if f not in (BarField.TICKER, BarField.DATE)
+            },
+        }
+        return self.compute(columns, Segments.from_keys(batch.ticker_codes))
+
+    def select(self, names: Sequence[str]) -> "FeatureEngine":
+        """Engine computing only `names` and the features they are derived from."""
+        known = {s.name for s in self.specs}
+        unknown = sorted(set(names) - known)
+        if unknown:
+            raise ValueError(f"Unknown features {unknown}; declared: {sorted(known)}")
+
+        needed = set(names)
+        for spec in reversed(self.specs):
+            if spec.name in needed and spec.column in known:
+                needed.add(spec.column)
+        return FeatureEngine(tuple(s for s in self.specs if s.name in needed))
+
+    def inputs(self) -> set[str]:
+        """Stored columns the specs read (features derived from other features excluded)."""
+        names = {s.name for s in self.specs}
+        cols: set[str] = set()
+        for spec in self.specs:
+            if spec.column not in names:
+                cols.add(spec.column)
+            cols.update(_EXTRA_INPUTS.get(spec.kind, ()))
+        return cols
+
+    def lookback(self) -> int:
+        """
+        Rows of per-ticker history needed to compute every feature of one
+        new bar exactly (window chains included, e.g. a rolling std of a
+        1-day return needs window + 1 bars).
+        """
+        need: dict[str, int] = {}
+        for spec in self.specs:
+            own = _HISTORY.get(spec.kind, lambda w: 0)(spec.window)
+            need[spec.name] = need.get(spec.column, 0) + own
+        return max(need.values(), default=0)
+
+    def schema(self, base: pa.Schema = BAR_SCHEMA) -> pa.Schema:
+        """`base` plus one field per feature, in spec order."""
+        fields = [
+            pa.field(s.name, pa.int32() if s.kind in _INT_KINDS else pa.float64())
+            for s in self.specs
+        ]
+        return pa.schema([*base, *fields])
+
+    def fingerprint(self) -> str:
+        """Stable hash of the spec; persisted state is only reused when it matches."""
+        payload = json.dumps([asdict(s) for s in self.specs], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+
+from xfin.data_engine.domain.models import BarField
+from xfin.data_engine.features.engine import FeatureEngine, FeatureSpec
+from xfin.data_engine.io.writer import partition_dir
+
+logger = logging.getLogger(__name__)
+
+# Leading underscore: ignored when the dataset itself is scanned
+FEATURES_NAME = "_features.json"
+CACHE_DIR = "_feature_cache"
+FEATURES_VERSION = 1
+
+_TOKEN_KEY = b"xfin.partition"
+_SPECS_KEY = b"xfin.specs"
+
+
+def _partition_token(partition: Path) -> str:
+    """Changes whenever a fragment of the partition is added, removed or rewritten."""
+    h = hashlib.sha256()
+    for p in sorted(partition.glob("*.parquet")):
+        st = p.stat()
+        h.update(f"{p.name}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _spec_digest(spec: FeatureSpec) -> str:
+    return hashlib.sha256(json.dumps(asdict(spec), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def write_feature_sidecar(root: Path, specs: Sequence[FeatureSpec]) -> None:
+    """Declare `specs` as lazy features of the dataset at `root`."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    payload = {"version": FEATURES_VERSION, "features": [asdict(s) for s in specs]}
+    tmp = root / (FEATURES_NAME + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp, root / FEATURES_NAME)
+
+
+def remove_feature_sidecar(root: Path) -> None:
+    """The dataset stores its features; drop any lazy declaration."""
+    (Path(root) / FEATURES_NAME).unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class LazyFeatures:
+    """
+    Features declared for a dataset (<root>/_features.json) but not stored
+    in its Parquet files.
+
+    They are computed on read, per ticker partition and only for the
+    requested names (plus what those derive from), over the partition's
+    full history so windows are exact under date filters. Results are
+    cached in <root>/_feature_cache/ and reused until the partition's
+    fragments change.
+    """
+
+    root: Path
+    engine: FeatureEngine
+
+    @classmethod
+    def load(cls, root: Path) -> "LazyFeatures | None":
+        path = Path(root) / FEATURES_NAME
+        if not path.is_file():
+            return None
+
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != FEATURES_VERSION:
+            raise ValueError(
+                f"Unsupported feature sidecar version {raw.get('version')!r} in {path}"
+            )
+        specs = tuple(FeatureSpec(**f) for f in raw.get("features", []))
+        return cls(root=Path(root), engine=FeatureEngine(specs))
+
+    @property
+    def names(self) -> list[str]:
+        return [s.name for s in self.engine.specs]
+
+    def split(self, columns: Sequence[str]) -> tuple[list[str], list[str]]:
+        """Split requested columns into (stored, lazy)."""
+        declared = set(self.names)
+        stored = [c for c in columns if c not in declared]
+        lazy = [c for c in columns if c in declared]
+        return stored, lazy
+
+    def attach(self, df: pd.DataFrame, names: Sequence[str] | None = None) -> pd.DataFrame:
+        """
+        Add lazy features `names` (default: all declared) to a frame read
+        from this dataset. `df` needs ticker and dt and may be any
+        row/date subset of the dataset.
+        """
+        names = list(self.names if names is None else names)
+        if not names or df.empty:
+            return df
+
+        t, d = BarField.TICKER.value, BarField.DATE.value
+        tickers = sorted(df[t].astype(str).unique())
+        computed = pd.concat(
+            [self._ticker_features(ticker, names) for ticker in tickers], ignore_index=True
+        )
+        # last write wins if the partition holds duplicate bars
+        computed = computed.drop_duplicates([t, d], keep="last")
+
+        key = df[[t, d]].astype({t: str})
+        feats = key.merge(computed, on=[t, d], how="left")
+        return df.assign(**{n: feats[n].to_numpy() for n in names})
+
+    def _ticker_features(self, ticker: str, names: list[str]) -> pd.DataFrame:
+        partition = partition_dir(self.root, ticker)
+        token = _partition_token(partition)
+        cache_path = self.root / CACHE_DIR / f"{partition.name}.arrow"
+        engine = self.engine.select(names)
+        digests = {s.name: _spec_digest(s) for s in engine.specs}
+
+        cached = self._read_cache(cache_path, token)
+        if cached is not None:
+            table, stored_digests = cached
+            if all(stored_digests.get(n) == digests[n] for n in names):
+                return self._frame(ticker, table, names)
+        else:
+            table, stored_digests = None, {}
+
+        logger.debug("Computing features %s for partition %s", names, partition)
+        inputs = sorted(engine.inputs() | {BarField.DATE.value})
+        bars = ds.dataset(str(partition), format="parquet").to_table(columns=inputs).to_pandas()
+        bars[BarField.TICKER.value] = ticker
+        bars = bars.sort_values(BarField.DATE.value, kind="stable").reset_index(drop=True)
+        features = engine.compute_frame(bars)
+
+        if table is not None:
+            # same partition token: other cached features still line up
+            keep = {n: table.column(n) for n in table.column_names if n not in features}
+        else:
+            keep, stored_digests = {BarField.DATE.value: pa.array(bars[BarField.DATE.value])}, {}
+        columns = {**keep, **{n: pa.array(v) for n, v in features.items()}}
+        stored_digests = {**stored_digests, **digests}
+
+        table = pa.table(columns).replace_schema_metadata(
+            {_TOKEN_KEY: token.encode("ascii"), _SPECS_KEY: json.dumps(stored_digests).encode()}
+        )
+        self._write_cache(cache_path, table)
+        return self._frame(ticker, table, names)
+
+    @staticmethod
+    def _frame(ticker: str, table: pa.Table, names: list[str]) -> pd.DataFrame:
+        df = table.select([BarField.DATE.value, *names]).to_pandas()
+        df.insert(0, BarField.TICKER.value, ticker)
+        return df
+
+    @staticmethod
+    def _read_cache(path: Path, token: str) -> tuple[pa.Table, dict[str, str]] | None:
+        if not path.is_file():
+            return None
+        table = feather.read_table(path)
+        meta = table.schema.metadata or {}
+        if meta.get(_TOKEN_KEY, b"").decode("ascii") != token:
+            return None
+        return table, json.loads(meta.get(_SPECS_KEY, b"{}"))
+
+    @staticmethod
+    def _write_cache(path: Path, table: pa.Table) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        feather.write_feather(table, tmp)
+        os.replace(tmp, path)
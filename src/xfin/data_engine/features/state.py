@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.models import BAR_SCHEMA
+from xfin.data_engine.features.engine import FeatureEngine, Segments
+
+logger = logging.getLogger(__name__)
+
+# Leading underscore: ignored when the dataset itself is scanned
+STATE_NAME = "_feature_state.parquet"
+_FINGERPRINT_KEY = b"xfin.features"
+
+
+@dataclass
+class FeatureState:
+    """
+    Per-ticker rolling state of the feature engine: the last
+    `engine.lookback()` bars of every ticker written so far.
+
+    Features of newly appended bars are computed from that tail plus the
+    new rows only, so an append costs O(new rows x window) and gives the
+    same values as recomputing the ticker's full history.
+    """
+
+    engine: FeatureEngine
+    tails: dict[str, BarBatch] = field(default_factory=dict)
+
+    def reset(self, tickers: Iterable[str]) -> None:
+        """Forget tickers whose history is about to be rewritten from scratch."""
+        for t in tickers:
+            self.tails.pop(t, None)
+
+    def apply(self, bars: BarBatch) -> pa.RecordBatch:
+        """
+        Features for `bars`, continuing each ticker from its stored tail;
+        then advance the tails. `bars` must be later than the stored tail
+        of their ticker (new bars are appended, not back-filled).
+
+        Returns the (ticker, dt)-sorted bars with feature columns, laid out
+        as engine.schema().
+        """
+        prior = [self.tails[t] for t in bars.unique_tickers() if t in self.tails]
+        combined = BarBatch.concat([*prior, bars])
+        n_prior = len(combined) - len(bars)
+
+        order = combined.sort_order()
+        ordered = combined.take(order)
+        features = self.engine.compute_batch(ordered)
+
+        self._keep_tails(ordered)
+
+        new = np.flatnonzero(order >= n_prior)
+        out = ordered.take(new).to_arrow()
+        return pa.RecordBatch.from_arrays(
+            [*out.columns, *(pa.array(features[s.name][new]) for s in self.engine.specs)],
+            schema=self.engine.schema(),
+        )
+
+    def _keep_tails(self, ordered: BarBatch) -> None:
+        lookback = self.engine.lookback()
+        for ticker, start, end in _ticker_ranges(ordered):
+            if lookback == 0:
+                self.tails.pop(ticker, None)
+                continue
+            self.tails[ticker] = ordered.take(np.arange(max(start, end - lookback), end))
+
+    # --- persistence --------------------------------------------------
+
+    def save(self, root: Path) -> None:
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_batches(
+            [BarBatch.concat(list(self.tails.values())).to_arrow()], schema=BAR_SCHEMA
+        )
+        table = table.replace_schema_metadata(
+            {_FINGERPRINT_KEY: self.engine.fingerprint().encode("ascii")}
+        )
+        tmp = root / (STATE_NAME + ".tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, root / STATE_NAME)
+
+    @classmethod
+    def load(cls, root: Path, engine: FeatureEngine) -> "FeatureState | None":
+        """
+        Stored state for `engine`, or None if there is none or it was built
+        with a different feature spec (callers then rebuild from scratch).
+        """
+        path = Path(root) / STATE_NAME
+        if not path.is_file():
+            return None
+
+        table = pq.read_table(path)
+        stored = (table.schema.metadata or {}).get(_FINGERPRINT_KEY, b"").decode("ascii")
+        if stored != engine.fingerprint():
+            logger.info("Feature spec changed since %s was written; ignoring it", path)
+            return None
+
+        state = cls(engine=engine)
+        batch = BarBatch.from_arrow(table).sort_by_ticker_date()
+        for ticker, start, end in _ticker_ranges(batch):
+            state.tails[ticker] = batch.take(np.arange(start, end))
+        return state
+
+
+def _ticker_ranges(ordered: BarBatch) -> Iterator[tuple[str, int, int]]:
+    """(ticker, start, end) row ranges of a ticker-sorted batch."""
+    seg = Segments.from_keys(ordered.ticker_codes)
+    ends = np.r_[seg.starts[1:], len(ordered)]
+    for start, end in zip(seg.starts, ends):
+        yield ordered.tickers[ordered.ticker_codes[start]], int(start), int(end)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from xfin.data_engine.domain.models import BarField
+
+logger = logging.getLogger(__name__)
+
+# Leading underscore: pyarrow.dataset / pandas ignore it when scanning the dataset
+INDEX_NAME = "_index.json"
+INDEX_VERSION = 1
+
+
+def _fragments(partition: Path) -> list[tuple[str, int, int]]:
+    """(name, size, mtime_ns) of the Parquet fragments of one partition."""
+    out = []
+    for p in sorted(partition.iterdir()):
+        if p.is_file() and p.suffix == ".parquet" and not p.name.startswith(("_", ".")):
+            st = p.stat()
+            out.append((p.name, st.st_size, st.st_mtime_ns))
+    return out
+
+
+def _fragment_range(path: Path) -> tuple[pd.Timestamp | None, pd.Timestamp | None, int]:
+    """(min dt, max dt, rows) of one fragment, from its footer statistics."""
+    meta = pq.ParquetFile(path).metadata
+    names = meta.schema.to_arrow_schema().names
+    if meta.num_rows == 0:
+        return None, None, 0
+    col = names.index(BarField.DATE.value)
+
+    lo, hi = [], []
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            # writer without statistics: read the column instead
+            dt = pq.read_table(path, columns=[BarField.DATE.value]).column(0).to_pandas()
+            return dt.min(), dt.max(), meta.num_rows
+        lo.append(pd.Timestamp(stats.min))
+        hi.append(pd.Timestamp(stats.max))
+    return min(lo), max(hi), meta.num_rows
+
+
+@dataclass
+class PartitionEntry:
+    """Where one ticker lives and which dates it covers."""
+
+    path: str  # relative to the dataset root, e.g. "ticker=MBANK"
+    min_dt: str | None = None  # ISO timestamps
+    max_dt: str | None = None
+    rows: int = 0
+    fragments: list[tuple[str, int, int]] = field(default_factory=list)
+
+    def overlaps(self, date_min: pd.Timestamp | None, date_max: pd.Timestamp | None) -> bool:
+        if self.min_dt is None or self.max_dt is None:
+            return False
+        if date_min is not None and pd.Timestamp(self.max_dt) < date_min:
+            return False
+        if date_max is not None and pd.Timestamp(self.min_dt) > date_max:
+            return False
+        return True
+
+
+@dataclass
+class DatasetIndex:
+    """
+    Ticker -> partition index stored next to the processed dataset
+    (<root>/_index.json), so readers can list tickers and prune
+    partitions by date without opening Parquet footers.
+
+    Written by xfin-data after every build; readers fall back to scanning
+    the dataset when it is missing.
+    """
+
+    partitions: dict[str, PartitionEntry] = field(default_factory=dict)
+    version: int = INDEX_VERSION
+
+    @classmethod
+    def load(cls, root: Path) -> "DatasetIndex | None":
+        path = Path(root) / INDEX_NAME
+        if not path.is_file():
+            return None
+
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != INDEX_VERSION:
+            logger.warning("Ignoring %s with unsupported version %r", path, raw.get("version"))
+            return None
+        partitions = {
+            t: PartitionEntry(**{**e, "fragments": [tuple(f) for f in e.get("fragments", [])]})
+            for t, e in raw.get("partitions", {}).items()
+        }
+        return cls(partitions=partitions)
+
+    @classmethod
+    def build(cls, root: Path, previous: "DatasetIndex | None" = None) -> "DatasetIndex":
+        """
+        Index the partitions under `root`. Footers are read only for
+        partitions whose fragments changed since `previous`.
+        """
+        root = Path(root)
+        prior = previous.partitions if previous is not None else {}
+        index = cls()
+        prefix = f"{BarField.TICKER.value}="
+        for partition in sorted(root.iterdir()):
+            if not partition.is_dir() or not partition.name.startswith(prefix):
+                continue
+            ticker = unquote(partition.name[len(prefix) :])
+            fragments = _fragments(partition)
+            if not fragments:
+                continue
+
+            old = prior.get(ticker)
+            if old is not None and old.fragments == fragments:
+                index.partitions[ticker] = old
+                continue
+
+            ranges = [_fragment_range(partition / name) for name, _, _ in fragments]
+            lows = [lo for lo, _, _ in ranges if lo is not None]
+            highs = [hi for _, hi, _ in ranges if hi is not None]
+            index.partitions[ticker] = PartitionEntry(
+                path=partition.name,
+                min_dt=min(lows).isoformat() if lows else None,
+                max_dt=max(highs).isoformat() if highs else None,
+                rows=sum(rows for _, _, rows in ranges),
+                fragments=fragments,
+            )
+        return index
+
+    def save(self, root: Path) -> None:
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.version,
+            "partitions": {t: asdict(e) for t, e in sorted(self.partitions.items())},
+        }
+        tmp = root / (INDEX_NAME + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, root / INDEX_NAME)
+
+    @property
+    def tickers(self) -> list[str]:
+        return sorted(self.partitions)
+
+    def prune(
+        self, tickers: list[str], date_min: str | None = None, date_max: str | None = None
+    ) -> list[str]:
+        """
+        `tickers` minus those the index knows to have no bars within
+        [date_min, date_max]. Tickers missing from the index are kept, so
+        the caller looks for their partitions instead of losing them.
+        """
+        lo = pd.Timestamp(date_min) if date_min else None
+        hi = pd.Timestamp(date_max) if date_max else None
+        return [
+            t for t in tickers if t not in self.partitions or self.partitions[t].overlaps(lo, hi)
+        ]
+
+
+def update_index(root: Path) -> DatasetIndex:
+    """Refresh <root>/_index.json after a build and return it."""
+    index = DatasetIndex.build(root, DatasetIndex.load(root))
+    index.save(root)
+    logger.debug("Indexed %d partitions in %s", len(index.partitions), root)
+    return index
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+# Leading underscore: pyarrow.dataset / pandas ignore it when scanning the dataset
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_sha256_with_prefix(
+    path: str | Path, prefix_len: int, chunk_size: int = 1 << 20
+) -> tuple[str, str]:
+    """
+    Hash the first `prefix_len` bytes and the whole file in one read.
+
+    Returns (prefix_digest, full_digest); used to check that a grown file
+    only had bytes appended since it was last ingested.
+    """
+    prefix = hashlib.sha256()
+    full = hashlib.sha256()
+    remaining = prefix_len
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            if remaining > 0:
+                prefix.update(chunk[:remaining])
+                remaining -= len(chunk[:remaining])
+            full.update(chunk)
+    return prefix.hexdigest(), full.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """What was ingested from one raw file."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str  # "" when the build did not hash the file (full rebuilds)
+    last_dt: str | None = None  # ISO date of the newest bar
+    rows: int = 0
+    tickers: list[str] = field(default_factory=list)
+    offset: int = 0  # bytes ingested so far; tail ingestion resumes here
+
+    def same_stat(self, st: os.stat_result) -> bool:
+        return self.size == st.st_size and self.mtime_ns == st.st_mtime_ns
+
+
+@dataclass
+class DatasetManifest:
+    """
+    Per-file ingest record stored next to the processed dataset
+    (<out>/_manifest.json), used to skip unchanged raw files.
+    """
+
+    files: dict[str, ManifestEntry] = field(default_factory=dict)
+    version: int = MANIFEST_VERSION
+
+    @classmethod
+    def load(cls, root: Path) -> "DatasetManifest":
+        path = Path(root) / MANIFEST_NAME
+        if not path.is_file():
+            return cls()
+
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != MANIFEST_VERSION:
+            raise ValueError(
+                f"Unsupported manifest version {raw.get('version')!r} in {path}"
+            )
+        files = {k: ManifestEntry(**v) for k, v in raw.get("files", {}).items()}
+        return cls(files=files)
+
+    def save(self, root: Path) -> None:
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.version,
+            "files": {k: asdict(v) for k, v in sorted(self.files.items())},
+        }
+        tmp = root / (MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, root / MANIFEST_NAME)
+
+    def tickers_of(self, paths: set[str]) -> set[str]:
+        return {t for p in paths if p in self.files for t in self.files[p].tickers}
@@ -1,14 +1,77 @@
 from __future__ import annotations
 
 from typing import Iterable, Iterator
+import codecs
 import logging
 from dataclasses import dataclass
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.metrics import ParseStats
 from xfin.data_engine.domain.models import OHLCVBar
 from xfin.data_engine.domain.types import BarParser
 
 _base_logger = logging.getLogger(__name__)
 
+# Same line breaks str.splitlines() uses for MST files (LF, CRLF, bare CR)
+_LINE_BREAK_RE = r"\r\n|[\n\r]"
+_DATE_RE = r"^\d{8}$"
+# Literals accepted by float(): decimals, exponents, nan/inf
+_FLOAT_RE = r"^[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|(?i:nan|inf|infinity))$"
+
+
+def _as_arrow_text(
+    data: str | bytes | memoryview, encoding: str, errors: str
+) -> pa.Array:
+    """
+    Wrap a whole file as a one-element Arrow string array.
+
+    UTF-8 bytes are wrapped zero-copy (Arrow only validates them). Other
+    encodings, or invalid UTF-8, are decoded with `errors` like
+    Path.read_text() would.
+    """
+    if isinstance(data, str):
+        return pa.array([data], pa.large_string())
+
+    if codecs.lookup(encoding).name == "utf-8":
+        buf = pa.py_buffer(data)
+        offsets = pa.array([0, buf.size], pa.int64()).buffers()[1]
+        raw = pa.Array.from_buffers(pa.large_binary(), 1, [None, offsets, buf])
+        try:
+            return raw.cast(pa.large_string())
+        except pa.ArrowInvalid:
+            pass
+
+    return pa.array([bytes(data).decode(encoding, errors=errors)], pa.large_string())
+
+
+def _log_skipped(
+    logger: logging.LoggerAdapter,
+    empty: int,
+    badcols: int,
+    other: int,
+    *,
+    rows: int,
+    stats: ParseStats | None,
+) -> None:
+    if stats is not None:
+        stats.rows += rows
+        stats.skipped_empty += empty
+        stats.skipped_badcols += badcols
+        stats.skipped_other += other
+
+    # Log only if anything interesting happened
+    if empty or badcols or other:
+        logger.debug(
+            "Skipped rows: empty=%d badcols=%d other=%d",
+            empty,
+            badcols,
+            other,
+        )
+
 
 @dataclass
 class MstBarParser(BarParser):
@@ -20,6 +83,7 @@ class MstBarParser(BarParser):
         lines: Iterable[str],
         *,
         filename: str | None = None,
+        stats: ParseStats | None = None,
     ) -> Iterator[OHLCVBar]:
         # Create adapter ONCE per file
         logger = logging.LoggerAdapter(
@@ -30,6 +94,7 @@ class MstBarParser(BarParser):
         skipped_empty = 0
         skipped_badcols = 0
         skipped_other = 0
+        rows = 0
 
         for line in lines:
             line = line.strip()
@@ -50,15 +115,122 @@ class MstBarParser(BarParser):
                 continue
 
             try:
-                yield OHLCVBar.from_fields(parts)
+                bar = OHLCVBar.from_fields(parts)
             except Exception:
                 skipped_other += 1
+                continue
+            rows += 1
+            yield bar
+
+        _log_skipped(
+            logger, skipped_empty, skipped_badcols, skipped_other, rows=rows, stats=stats
+        )
+
+    def parse_columnar(
+        self,
+        data: str | bytes | memoryview,
+        *,
+        filename: str | None = None,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        stats: ParseStats | None = None,
+    ) -> BarBatch:
+        """
+        Parse a whole MST file into a BarBatch (column arrays) in one pass.
+
+        Applies the same skip rules as parse_lines() (empty lines, header,
+        7/8 column check, unparsable values) with vectorised Arrow kernels,
+        so no per-bar Python object is created. `data` may be decoded text
+        or the raw file bytes (e.g. an mmap view); bytes are decoded with
+        `encoding`/`errors`.
+
+        If `stats` is given, produced/skipped row counts are added to it.
+        """
+        logger = logging.LoggerAdapter(
+            _base_logger,
+            {"data_file": filename or "<unknown>"},
+        )
+
+        if len(data) == 0:
+            return BarBatch.empty()
+
+        text = _as_arrow_text(data, encoding, errors)
+        lines = pc.split_pattern_regex(text, _LINE_BREAK_RE).flatten()
+        # splitlines() does not produce a trailing empty line
+        if pc.utf8_slice_codeunits(text, start=-1)[0].as_py() in ("\n", "\r"):
+            lines = lines.slice(0, len(lines) - 1)
+        lines = pc.utf8_trim_whitespace(lines)
+
+        is_empty = pc.equal(pc.utf8_length(lines), 0)
+        skipped_empty = pc.sum(is_empty).as_py() or 0
+        keep = pc.invert(is_empty)
+
+        if self.has_header:
+            no_bom = pc.utf8_ltrim(lines, characters="\ufeff")
+            is_header = pc.starts_with(pc.utf8_lower(no_bom), "<ticker>")
+            keep = pc.and_(keep, pc.invert(is_header))
+
+        parts = pc.split_pattern(lines.filter(keep), self.delimiter)
+        ncols = pc.list_value_length(parts).to_numpy(zero_copy_only=False)
+        good = (ncols == 7) | (ncols == 8)
+        skipped_badcols = int((~good).sum())
+
+        parts = parts.filter(pa.array(good))
+        ncols = ncols[good]
+        values = pc.utf8_trim_whitespace(parts.flatten())
+        offsets = parts.offsets.to_numpy()
+        starts = offsets[:-1] - offsets[0]
 
-        # Log only if anything interesting happened
-        if skipped_empty or skipped_badcols or skipped_other:
-            logger.debug(
-                "Skipped rows: empty=%d badcols=%d other=%d",
-                skipped_empty,
-                skipped_badcols,
-                skipped_other,
-            )
+        def column(i: int) -> pa.Array:
+            return values.take(pa.array(starts + i))
+
+        ticker = column(0)
+        dt_raw = column(1)
+        prices = [column(i) for i in range(2, 7)]
+        # Optional 8th column; rows with 7 fields get null (-> NaN below)
+        oi_raw = values.take(pa.array(starts + 7, mask=ncols != 8))
+        oi_raw = pc.if_else(pc.equal(oi_raw, ""), pa.scalar(None, oi_raw.type), oi_raw)
+
+        dt = pc.strptime(dt_raw, format="%Y%m%d", unit="s", error_is_null=True)
+        ok = pc.and_(pc.is_valid(dt), pc.match_substring_regex(dt_raw, _DATE_RE))
+        for col in prices:
+            ok = pc.and_(ok, pc.match_substring_regex(col, _FLOAT_RE))
+        ok = pc.and_(
+            ok,
+            pc.or_kleene(pc.is_null(oi_raw), pc.match_substring_regex(oi_raw, _FLOAT_RE)),
+        )
+        ok = pc.fill_null(ok, False)
+        skipped_other = len(ok) - (pc.sum(ok).as_py() or 0)
+
+        _log_skipped(
+            logger,
+            skipped_empty,
+            skipped_badcols,
+            skipped_other,
+            rows=len(ok) - skipped_other,
+            stats=stats,
+        )
+
+        if skipped_other:
+            ticker = ticker.filter(ok)
+            dt = dt.filter(ok)
+            prices = [col.filter(ok) for col in prices]
+            oi_raw = oi_raw.filter(ok)
+
+        encoded = pc.cast(ticker, pa.string()).dictionary_encode()
+        days = pc.cast(pc.cast(dt, pa.date32()), pa.int32())
+
+        def floats(col: pa.Array) -> np.ndarray:
+            return pc.fill_null(pc.cast(col, pa.float64()), np.nan).to_numpy()
+
+        return BarBatch(
+            tickers=tuple(encoded.dictionary.to_pylist()),
+            ticker_codes=encoded.indices.to_numpy().astype(np.int32, copy=False),
+            dates=days.to_numpy().astype(np.int32, copy=False),
+            open=floats(prices[0]),
+            high=floats(prices[1]),
+            low=floats(prices[2]),
+            close=floats(prices[3]),
+            vol=floats(prices[4]),
+            openint=floats(oi_raw),
+        )
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+_STAGING_PREFIX = ".staging-"
+_LEGACY_NAME = "v00000000T000000-legacy"
+
+
+def versions_dir(out: Path) -> Path:
+    """Where the versions of the dataset published at `out` live (a hidden sibling)."""
+    out = Path(out)
+    return out.parent / f".{out.name}.versions"
+
+
+def list_versions(out: Path) -> list[Path]:
+    """Complete versions, oldest first (names sort by creation time)."""
+    root = versions_dir(out)
+    if not root.is_dir():
+        return []
+    return sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+
+def current_version(out: Path) -> Path | None:
+    """
+    The directory readers of `out` currently see: the symlink target, or
+    `out` itself for a dataset written before versioning.
+    """
+    out = Path(out)
+    if out.is_symlink():
+        return out.resolve()
+    return out if out.is_dir() else None
+
+
+def _new_version_name() -> str:
+    ns = time.time_ns()
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(ns // 10**9))
+    return f"v{stamp}.{ns % 10**9:09d}-{uuid.uuid4().hex[:8]}"
+
+
+def _link_copy(src: Path, dst: Path) -> None:
+    """
+    Copy a dataset version by hard links: writers only ever add files or
+    replace them by rename, so the copies never alias modified data.
+    """
+
+    def link(s: str, d: str) -> None:
+        try:
+            os.link(s, d)
+        except OSError:  # e.g. another filesystem
+            shutil.copy2(s, d)
+
+    shutil.copytree(
+        src,
+        dst,
+        copy_function=link,
+        ignore=lambda _, names: [n for n in names if n.startswith(".")],
+    )
+
+
+def _point(out: Path, version: Path) -> None:
+    """Atomically point the `out` symlink at `version`."""
+    tmp = out.parent / f".{out.name}.{uuid.uuid4().hex}.link"
+    os.symlink(os.path.relpath(version, out.parent), tmp, target_is_directory=True)
+    if out.is_dir() and not out.is_symlink():
+        # first versioned publish: keep the unversioned dataset as a version
+        legacy = versions_dir(out) / _LEGACY_NAME
+        logger.info("Moving unversioned dataset %s to %s", out, legacy)
+        os.rename(out, legacy)
+    os.replace(tmp, out)
+
+
+def publish(out: Path, version: Path, *, keep: int = 2) -> None:
+    """Make `version` the dataset readers of `out` see; prune old versions."""
+    out = Path(out)
+    previous = current_version(out)
+    _point(out, version)
+    logger.info("Published %s -> %s", out, version.name)
+    prune_versions(out, keep=keep, protect={version, *(p for p in [previous] if p)})
+
+
+def prune_versions(out: Path, *, keep: int = 2, protect: set[Path] | None = None) -> None:
+    """Delete all but the newest `keep` versions (never the current one or `protect`)."""
+    versions = list_versions(out)
+    current = current_version(out)
+    protected = {p.resolve() for p in [*(protect or ()), *([current] if current else [])]}
+    for old in versions[: max(len(versions) - keep, 0)]:
+        if old.resolve() in protected:
+            continue
+        logger.info("Removing old dataset version %s", old)
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def rollback(out: Path) -> Path:
+    """Point `out` back at the version published before the current one."""
+    out = Path(out)
+    current = current_version(out)
+    versions = list_versions(out)
+    older = [v for v in versions if current is None or v.name < current.name]
+    if not older:
+        raise ValueError(f"No previous version of {out} to roll back to")
+    _point(out, older[-1])
+    logger.info("Rolled back %s -> %s", out, older[-1].name)
+    return older[-1]
+
+
+@contextmanager
+def staged_version(out: Path, *, base: bool = False, keep: int = 2) -> Iterator[Path]:
+    """
+    Yield a private staging directory for a new version of the dataset at
+    `out`; publish it on success, delete it on error.
+
+    base=True starts from a hard-link copy of the current version (for
+    incremental writes); otherwise the staging directory is empty.
+    Readers of `out` keep seeing the current version until the publish.
+    """
+    out = Path(out)
+    root = versions_dir(out)
+    root.mkdir(parents=True, exist_ok=True)
+    staging = root / f"{_STAGING_PREFIX}{uuid.uuid4().hex}"
+
+    current = current_version(out)
+    if base and current is not None:
+        _link_copy(current, staging)
+    else:
+        staging.mkdir()
+
+    try:
+        yield staging
+    except BaseException:
+        logger.warning("Discarding staged version %s", staging)
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    version = root / _new_version_name()
+    os.rename(staging, version)
+    publish(out, version, keep=keep)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from xfin.data_engine.domain.models import BarField
+from xfin.data_engine.features.lazy import LazyFeatures
+from xfin.data_engine.io.index import DatasetIndex
+from xfin.data_engine.io.writer import partition_dir
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_exists(path: Path) -> None:
+    if not path.exists():
+        raise FileNotFoundError(f"Path not found: {path}")
+
+
+def _visible(path: Path) -> bool:
+    # dataset scans skip "_"/"." entries (manifest, caches, sidecars)
+    return not path.name.startswith(("_", "."))
+
+
+def partition_files(root: Path, tickers: Sequence[str] | None = None) -> list[Path]:
+    """
+    Parquet fragments of the dataset, optionally only those of `tickers`.
+
+    With tickers only their partition directories are listed, so the
+    cost does not grow with the size of the universe.
+    """
+    root = Path(root)
+    if tickers is None:
+        dirs = sorted(p for p in root.iterdir() if p.is_dir() and _visible(p))
+    else:
+        dirs = [partition_dir(root, t) for t in dict.fromkeys(tickers)]
+    return [
+        f
+        for d in dirs
+        if d.is_dir()
+        for f in sorted(d.iterdir())
+        if f.is_file() and _visible(f) and f.suffix == ".parquet"
+    ]
+
+
+def open_bars_dataset(root: Path, tickers: Sequence[str] | None = None) -> ds.Dataset:
+    """pyarrow dataset over the hive-partitioned bars, restricted to `tickers`."""
+    files = partition_files(root, tickers)
+    return ds.dataset(
+        [str(f) for f in files],
+        format="parquet",
+        partitioning="hive",
+        partition_base_dir=str(root),
+    )
+
+
+def discover_tickers(root: Path) -> list[str]:
+    """
+    Tickers present in a hive-partitioned dataset.
+
+    Taken from <root>/_index.json when present. Otherwise partition keys
+    like ticker=MBANK are materialized as a virtual column 'ticker' during
+    scanning, so only that column is read.
+    """
+    _ensure_exists(Path(root))
+    index = DatasetIndex.load(root)
+    if index is not None:
+        return index.tickers
+    tbl = open_bars_dataset(root).to_table(columns=[BarField.TICKER.value])
+    vals = pc.unique(tbl[BarField.TICKER.value]).to_pylist()
+    return sorted([v for v in vals if v is not None])
+
+
+def load_partitioned_bars_arrow(
+    root: Path,
+    *,
+    tickers: Sequence[str] | None = None,
+    max_tickers: int | None = None,
+    columns: Iterable[str] | None = None,
+    date_min: str | None = None,
+    date_max: str | None = None,
+    features: Sequence[str] = (),
+) -> pd.DataFrame:
+    """
+    Load the hive-partitioned Parquet bars dataset with pushdown.
+
+    tickers:    only those partitions are listed and read
+    columns:    column projection, ticker and dt always kept (None: all stored)
+    date_*:     inclusive dt bounds, pushed into the Parquet scan
+    features:   lazy features to materialise on top of `columns`
+
+    Lazy features declared in <root>/_features.json are computed (or taken
+    from the per-partition cache) only when named in `columns` or `features`.
+    With <root>/_index.json, partitions outside the date bounds are not opened.
+    """
+    # pin the published version: a concurrent publish swaps the symlink only
+    root = Path(root).resolve()
+    _ensure_exists(root)
+
+    lazy = LazyFeatures.load(root)
+    lazy_cols = list(features)
+    if lazy is not None and columns is not None:
+        columns, requested = lazy.split(list(columns))
+        lazy_cols = list(dict.fromkeys([*requested, *lazy_cols]))
+
+    index = DatasetIndex.load(root)
+    if tickers:
+        chosen = list(tickers)
+        missing = [t for t in chosen if not partition_dir(root, t).is_dir()]
+        if missing:
+            logger.warning("No partitions in %s for requested tickers %s", root, missing)
+    else:
+        chosen = index.tickers if index is not None else discover_tickers(root)
+        if max_tickers is not None:
+            chosen = chosen[:max_tickers]
+
+    if index is not None and (date_min or date_max):
+        pruned = index.prune(chosen, date_min, date_max)
+        logger.debug(
+            "Index pruned %d of %d tickers by date", len(chosen) - len(pruned), len(chosen)
+        )
+        chosen = pruned
+
+    dataset = open_bars_dataset(root, chosen)
+    logger.debug("Reading %d fragments for %d tickers", len(dataset.files), len(chosen))
+    if not dataset.files:
+        logger.warning("No partitions found in %s for tickers=%s", root, chosen)
+        names = [*(columns or []), BarField.TICKER.value, BarField.DATE.value]
+        return pd.DataFrame(columns=list(dict.fromkeys(names)))
+
+    # features the dataset already stores are read like any column
+    stored = set(dataset.schema.names)
+    if columns is not None:
+        columns = [*columns, *(c for c in lazy_cols if c in stored and c not in columns)]
+    lazy_cols = [c for c in lazy_cols if c not in stored]
+    if lazy_cols and lazy is None:
+        raise ValueError(f"Features {lazy_cols} are not stored in {root} nor declared lazy")
+
+    filt = None
+
+    if date_min:
+        dt_min = pd.to_datetime(date_min)
+        expr = ds.field(BarField.DATE.value) >= pa.scalar(dt_min.to_datetime64())
+        filt = expr if filt is None else (filt & expr)
+
+    if date_max:
+        dt_max = pd.to_datetime(date_max)
+        expr = ds.field(BarField.DATE.value) <= pa.scalar(dt_max.to_datetime64())
+        filt = expr if filt is None else (filt & expr)
+
+    if columns is not None:
+        cols = list(
+            dict.fromkeys([*columns, BarField.TICKER.value, BarField.DATE.value])
+        )
+    else:
+        cols = None
+
+    table = dataset.to_table(filter=filt, columns=cols)
+    df = table.to_pandas()
+
+    if BarField.DATE.value in df.columns:
+        df[BarField.DATE.value] = pd.to_datetime(df[BarField.DATE.value])
+
+    required = {BarField.TICKER.value, BarField.DATE.value}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {sorted(missing)}")
+
+    if lazy_cols:
+        df = lazy.attach(df, lazy_cols)
+
+    return df
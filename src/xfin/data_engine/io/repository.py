@@ -2,11 +2,142 @@ from __future__ import annotations
 
 from pathlib import Path
 import asyncio
-from dataclasses import dataclass
-from typing import Iterator, Sequence
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Mapping,
+    Sequence,
+    TypeVar,
+)
 
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.metrics import FileMetrics, ParseStats, PipelineMetrics
 from xfin.data_engine.domain.models import OHLCVBar
-from xfin.data_engine.domain.types import BarParser, BarRepository, ByteSource
+from xfin.data_engine.domain.types import (
+    BarParser,
+    BarRepository,
+    BufferSource,
+    ByteSource,
+)
+
+U = TypeVar("U")
+R = TypeVar("R")
+
+_END = object()
+
+
+def _parse_text(
+    parser: BarParser, text: str, name: str, columnar: bool, stats: ParseStats
+) -> Any:
+    if columnar:
+        return parser.parse_columnar(text, filename=name, stats=stats)
+    return list(parser.parse_lines(text.splitlines(), filename=name, stats=stats))
+
+
+def _span_bytes(loc: str, offset: int, end: int | None) -> int | None:
+    """Size of the byte range [offset, end) of a local file (None if `loc` is not one)."""
+    try:
+        size = os.path.getsize(loc)
+    except OSError:
+        return None
+    return max(0, (size if end is None else min(size, end)) - offset)
+
+
+def _parse_text_timed(
+    parser: BarParser,
+    loc: str,
+    text: str,
+    read_s: float,
+    nbytes: int | None,
+    columnar: bool,
+) -> tuple[Any, FileMetrics]:
+    fm = FileMetrics(
+        locator=loc,
+        # characters stand in for bytes when the source has no file size
+        # (equal for ASCII bar files); re-encoding would copy the text
+        bytes=len(text) if nbytes is None else nbytes,
+        read_s=read_s,
+    )
+    t0 = time.perf_counter()
+    result = _parse_text(parser, text, Path(loc).name or loc, columnar, fm.stats)
+    fm.parse_s = time.perf_counter() - t0
+    return result, fm
+
+
+def _is_buffer_source(source: ByteSource) -> bool:
+    return hasattr(source, "open_bytes") and hasattr(source, "iter_lines")
+
+
+def _load_file(
+    source: BufferSource,
+    parser: BarParser,
+    loc: str,
+    offset: int,
+    end: int | None,
+    encoding: str,
+    columnar: bool,
+) -> tuple[Any, FileMetrics]:
+    """
+    Read and parse bytes [offset, end) of one file without building a
+    decoded copy of it:
+    columnar mode parses straight from the mapped bytes, row mode streams
+    decoded lines into parse_lines().
+    """
+    name = Path(loc).name or loc
+    fm = FileMetrics(locator=loc)
+    t0 = time.perf_counter()
+
+    if columnar:
+        with source.open_bytes(loc, offset=offset, end=end) as buf:
+            t1 = time.perf_counter()
+            fm.read_s = t1 - t0
+            fm.bytes = len(buf)
+            result = parser.parse_columnar(
+                buf, filename=name, encoding=encoding, errors=source.errors, stats=fm.stats
+            )
+        fm.parse_s = time.perf_counter() - t1
+        return result, fm
+
+    lines = source.iter_lines(loc, encoding, offset=offset, end=end)
+    result = list(parser.parse_lines(lines, filename=name, stats=fm.stats))
+    fm.parse_s = time.perf_counter() - t0
+    fm.bytes = _span_bytes(loc, offset, end) or 0
+    return result, fm
+
+
+def _load_chunk(
+    source: ByteSource,
+    parser: BarParser,
+    locators: Sequence[str],
+    offsets: Mapping[str, int],
+    ends: Mapping[str, int],
+    encoding: str,
+    columnar: bool,
+) -> list[tuple[str, Any, FileMetrics]]:
+    """Executor entry point: read and parse a chunk of files in the worker."""
+    out = []
+    for loc in locators:
+        offset, end = offsets.get(loc, 0), ends.get(loc)
+        if _is_buffer_source(source):
+            out.append(
+                (loc, *_load_file(source, parser, loc, offset, end, encoding, columnar))
+            )
+            continue
+        t0 = time.perf_counter()
+        text = source.read_text_sync(loc, encoding=encoding, offset=offset, end=end)
+        read_s = time.perf_counter() - t0
+        nbytes = _span_bytes(loc, offset, end)
+        out.append((loc, *_parse_text_timed(parser, loc, text, read_s, nbytes, columnar)))
+    return out
 
 
 @dataclass
@@ -16,22 +147,182 @@ class MstRepository(BarRepository):
     parser: BarParser
     encoding: str = "utf-8"
     max_concurrency: int = 50
+    # per-locator byte offset to resume from (tail ingestion of appended files)
+    offsets: Mapping[str, int] = field(default_factory=dict)
+    # per-locator byte offset to stop at, e.g. the size a build planned and
+    # recorded, so bytes appended while it runs are left for the next one
+    ends: Mapping[str, int] = field(default_factory=dict)
+    # Optional executor (e.g. ProcessPoolExecutor) that reads+parses whole
+    # chunks of locators off the event loop; source and parser must pickle
+    # and the source must provide open_bytes()/iter_lines() or read_text_sync().
+    executor: Executor | None = None
+    chunk_size: int = 4
+    # Files (or executor chunks) loading or parsed-but-unconsumed at once;
+    # None -> max_concurrency. Caps memory regardless of file count.
+    max_in_flight: int | None = None
+    # Yield in sorted locator order instead of completion order
+    ordered: bool = False
+    # Optional sink for per-file read/parse metrics and queue depth
+    metrics: PipelineMetrics | None = None
+
+    async def _stream(
+        self, units: Sequence[U], load: Callable[[U], Awaitable[R]]
+    ) -> AsyncIterator[R]:
+        """
+        Run load(unit) over all units with bounded memory.
+
+        At most max_in_flight units are loading or waiting to be consumed;
+        the next unit is only started once the consumer has taken a result,
+        so a slow consumer throttles reading. With ordered=True results are
+        yielded in unit order, otherwise as soon as they complete.
+        """
+        limit = max(1, self.max_in_flight or self.max_concurrency)
+        remaining = iter(units)
+        pending: deque[asyncio.Task] = deque()
+
+        def start_next() -> None:
+            unit = next(remaining, _END)
+            if unit is not _END:
+                pending.append(asyncio.create_task(load(unit)))
+
+        try:
+            for _ in range(limit):
+                start_next()
+
+            while pending:
+                if self.ordered:
+                    done = [pending.popleft()]
+                    await done[0]
+                else:
+                    finished, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    done = [t for t in pending if t in finished]
+                    for t in done:
+                        pending.remove(t)
+
+                for i, task in enumerate(done):
+                    if self.metrics is not None:
+                        # started and not yet consumed, including this one
+                        self.metrics.record_queue_depth(len(pending) + len(done) - i)
+                    yield task.result()
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _iter_loaded(self, columnar: bool) -> AsyncIterator[tuple[str, Any]]:
+        """Read every locator concurrently and yield (locator, parsed result)."""
+        if self.executor is not None:
+            loaded = self._iter_loaded_executor(columnar)
+        else:
+            loaded = self._iter_loaded_local(columnar)
+
+        async for loc, result, fm in loaded:
+            if self.metrics is not None:
+                self.metrics.record_file(fm)
+            yield loc, result
+
+    async def _iter_loaded_local(
+        self, columnar: bool
+    ) -> AsyncIterator[tuple[str, Any, FileMetrics]]:
 
-    async def iter_bars(self) -> Iterator[OHLCVBar]:
         sem = asyncio.Semaphore(self.max_concurrency)
 
-        async def load_one(loc: str) -> list[OHLCVBar]:
+        async def load_one(loc: str) -> tuple[str, Any, FileMetrics]:
             async with sem:
-                text = await self.source.read_text(loc, encoding=self.encoding)
+                offset, end = self.offsets.get(loc, 0), self.ends.get(loc)
+                if _is_buffer_source(self.source):
+                    # read+parse off the loop; Arrow kernels release the GIL
+                    return loc, *await asyncio.to_thread(
+                        _load_file,
+                        self.source,
+                        self.parser,
+                        loc,
+                        offset,
+                        end,
+                        self.encoding,
+                        columnar,
+                    )
+
+                t0 = time.perf_counter()
+                text = await self.source.read_text(
+                    loc, encoding=self.encoding, offset=offset, end=end
+                )
+                read_s = time.perf_counter() - t0
+
+                return loc, *_parse_text_timed(
+                    self.parser,
+                    loc,
+                    text,
+                    read_s,
+                    _span_bytes(loc, offset, end),
+                    columnar,
+                )
 
-                name = Path(loc).name or loc
+        async for item in self._stream(self._ordered_locators(), load_one):
+            yield item
 
-                return list(
-                    self.parser.parse_lines(text.splitlines(), filename=name)
+    async def _iter_loaded_executor(
+        self, columnar: bool
+    ) -> AsyncIterator[tuple[str, Any, FileMetrics]]:
+        if not (_is_buffer_source(self.source) or hasattr(self.source, "read_text_sync")):
+            raise TypeError(
+                f"{type(self.source).__name__} has no blocking read API; "
+                "it cannot be used with an executor"
+            )
+
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(self.max_concurrency)
+        locators = self._ordered_locators()
+        size = max(1, self.chunk_size)
+        chunks = [locators[i : i + size] for i in range(0, len(locators), size)]
+
+        async def load_chunk(chunk: list[str]) -> list[tuple[str, Any, FileMetrics]]:
+            offsets = {loc: self.offsets[loc] for loc in chunk if loc in self.offsets}
+            ends = {loc: self.ends[loc] for loc in chunk if loc in self.ends}
+            async with sem:
+                return await loop.run_in_executor(
+                    self.executor,
+                    partial(
+                        _load_chunk,
+                        self.source,
+                        self.parser,
+                        chunk,
+                        offsets,
+                        ends,
+                        self.encoding,
+                        columnar,
+                    ),
                 )
 
-        tasks = [asyncio.create_task(load_one(loc)) for loc in self.locators]
+        async for items in self._stream(chunks, load_chunk):
+            for item in items:
+                yield item
+
+    def _ordered_locators(self) -> list[str]:
+        return sorted(self.locators) if self.ordered else list(self.locators)
 
-        for fut in asyncio.as_completed(tasks):
-            for bar in await fut:
+    async def iter_bars(self) -> Iterator[OHLCVBar]:
+        async for _, bars in self.iter_bars_by_file():
+            for bar in bars:
                 yield bar
+
+    async def iter_bars_by_file(self) -> AsyncIterator[tuple[str, list[OHLCVBar]]]:
+        """All bars of each file, paired with the locator they came from."""
+        async for item in self._iter_loaded(columnar=False):
+            yield item
+
+    async def iter_columnar(self) -> AsyncIterator[BarBatch]:
+        """
+        Yield one BarBatch per file using the parser's columnar mode.
+
+        Requires a parser implementing ColumnarBarParser (e.g. MstBarParser).
+        """
+        async for _, batch in self.iter_columnar_by_file():
+            yield batch
+
+    async def iter_columnar_by_file(self) -> AsyncIterator[tuple[str, BarBatch]]:
+        """Same as iter_columnar(), paired with the locator each batch came from."""
+        async for item in self._iter_loaded(columnar=True):
+            yield item
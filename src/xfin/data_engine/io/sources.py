@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import io
+import mmap
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 from dataclasses import dataclass
 
@@ -12,10 +16,78 @@ from xfin.data_engine.domain.types import ByteSource
 class LocalFileSource(ByteSource):
     errors: str = "replace"
 
-    async def read_text(self, locator: str, encoding: str = "utf-8") -> str:
+    def read_text_sync(
+        self,
+        locator: str,
+        encoding: str = "utf-8",
+        *,
+        offset: int = 0,
+        end: int | None = None,
+    ) -> str:
+        """Blocking read, usable from worker threads/processes."""
         path = Path(locator)
-
-        def _read() -> str:
+        if not offset and end is None:
             return path.read_text(encoding=encoding, errors=self.errors)
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read() if end is None else f.read(max(0, end - offset))
+            return data.decode(encoding, errors=self.errors)
+
+    async def read_text(
+        self,
+        locator: str,
+        encoding: str = "utf-8",
+        *,
+        offset: int = 0,
+        end: int | None = None,
+    ) -> str:
+        """
+        Read and decode the file's bytes [offset, end) (defaults: from the
+        start, to the end of the file).
+        """
+        return await asyncio.to_thread(
+            self.read_text_sync, locator, encoding, offset=offset, end=end
+        )
+
+    @contextmanager
+    def open_bytes(
+        self, locator: str, *, offset: int = 0, end: int | None = None
+    ) -> Iterator[memoryview]:
+        """
+        Memory-map the file and yield a read-only view of its bytes
+        [offset, end). Nothing is copied or decoded; the view is only valid
+        inside the `with` block.
+        """
+        with open(locator, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file cannot be mapped
+                yield memoryview(b"")
+                return
+
+            view = memoryview(mm)
+            try:
+                yield view[offset:end]
+            finally:
+                view.release()
+                try:
+                    mm.close()
+                except BufferError:
+                    # a consumer still holds an export; the map is freed with it
+                    pass
 
-        return await asyncio.to_thread(_read)
+    def iter_lines(
+        self,
+        locator: str,
+        encoding: str = "utf-8",
+        *,
+        offset: int = 0,
+        end: int | None = None,
+    ) -> Iterator[str]:
+        """Decode and yield lines through a buffered chunk reader (no full-file str)."""
+        with open(locator, "rb") as raw:
+            raw.seek(offset)
+            # a bounded range is read up front (tails of appended files are small)
+            data = raw if end is None else io.BytesIO(raw.read(max(0, end - offset)))
+            with io.TextIOWrapper(data, encoding=encoding, errors=self.errors) as f:
+                yield from f
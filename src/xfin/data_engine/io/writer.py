@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, Iterator
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from xfin.data_engine.domain.models import BarField
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def partition_dir(root: Path, ticker: str) -> Path:
+    # Same escaping pyarrow applies to hive partition values
+    return Path(root) / f"{BarField.TICKER.value}={quote(ticker, safe='')}"
+
+
+def partition_tickers(root: Path) -> set[str]:
+    """Tickers with a partition directory under `root`."""
+    root = Path(root)
+    if not root.is_dir():
+        return set()
+    prefix = f"{BarField.TICKER.value}="
+    return {
+        unquote(p.name[len(prefix) :])
+        for p in root.iterdir()
+        if p.is_dir() and p.name.startswith(prefix)
+    }
+
+
+COMPRESSIONS = ("snappy", "zstd", "gzip", "brotli", "lz4", "none")
+# codecs that accept compression_level
+LEVELED_COMPRESSIONS = ("zstd", "gzip", "brotli")
+
+
+@dataclass(frozen=True)
+class ParquetOptions:
+    """
+    Physical layout of the written Parquet files.
+
+    compression:        codec (COMPRESSIONS); level only for zstd/gzip/brotli
+    row_group_size:     rows per row group (None: pyarrow default); small
+                        batches of a partition are buffered up to this size
+    sort_by_date:       write each partition's rows in dt order, so row group
+                        min/max statistics let date-range reads skip groups
+    use_dictionary:     dictionary-encode columns
+    float32_columns:    columns stored as float32 (e.g. vol, openint)
+    """
+
+    compression: str = "snappy"
+    compression_level: int | None = None
+    row_group_size: int | None = None
+    sort_by_date: bool = True
+    use_dictionary: bool = True
+    float32_columns: tuple[str, ...] = field(default_factory=tuple)
+
+    def __post_init__(self) -> None:
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {self.compression!r}; expected one of {COMPRESSIONS}"
+            )
+        if self.compression_level is not None and self.compression not in LEVELED_COMPRESSIONS:
+            raise ValueError(
+                f"compression {self.compression!r} takes no compression_level; "
+                f"levels apply to {LEVELED_COMPRESSIONS}"
+            )
+        if self.row_group_size is not None and self.row_group_size <= 0:
+            raise ValueError(f"row_group_size must be positive, got {self.row_group_size}")
+
+    def apply_schema(self, schema: pa.Schema) -> pa.Schema:
+        """`schema` with float32_columns downcast."""
+        unknown = set(self.float32_columns) - set(schema.names)
+        if unknown:
+            raise ValueError(f"float32 columns not in schema: {sorted(unknown)}")
+        for name in self.float32_columns:
+            i = schema.get_field_index(name)
+            schema = schema.set(i, schema.field(i).with_type(pa.float32()))
+        return schema
+
+    def parquet_kwargs(self) -> dict[str, Any]:
+        """Options understood by both pyarrow.parquet and ParquetFileFormat."""
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "use_dictionary": self.use_dictionary,
+            "write_statistics": True,
+        }
+
+
+@dataclass
+class PartitionedParquetWriter:
+    """
+    Stream Arrow record batches into a hive-partitioned Parquet dataset
+    (ticker=<TICKER>/part-*.parquet) with a single pyarrow.dataset.write_dataset
+    call, so only the batches buffered in the queue are held in memory.
+
+    Batches are written in arrival order; callers hand in (ticker, dt)-sorted
+    batches so options.sort_by_date holds per fragment.
+    """
+
+    out: Path
+    schema: pa.Schema
+    partition_col: str = BarField.TICKER.value
+    existing_data_behavior: str = "delete_matching"
+    basename_template: str = "part-{i}.parquet"
+    max_buffered_batches: int = 4
+    max_partitions: int = 1 << 16
+    options: ParquetOptions = field(default_factory=ParquetOptions)
+
+    def _write(self, batches: Iterator[pa.RecordBatch]) -> None:
+        schema = self.options.apply_schema(self.schema)
+        partitioning = ds.partitioning(
+            pa.schema([schema.field(self.partition_col)]), flavor="hive"
+        )
+        fmt = ds.ParquetFileFormat()
+        group = self.options.row_group_size
+        if group is not None:
+            sizes = {"min_rows_per_group": group, "max_rows_per_group": group}
+        else:
+            sizes = {}
+        ds.write_dataset(
+            (b.cast(schema) for b in batches) if schema != self.schema else batches,
+            self.out,
+            schema=schema,
+            format=fmt,
+            file_options=fmt.make_write_options(**self.options.parquet_kwargs()),
+            partitioning=partitioning,
+            basename_template=self.basename_template,
+            existing_data_behavior=self.existing_data_behavior,
+            max_partitions=self.max_partitions,
+            **sizes,
+            # keep row order within each written batch deterministic
+            use_threads=False,
+        )
+
+    async def write(self, batches: AsyncIterable[pa.RecordBatch]) -> None:
+        """Consume an async stream of batches; the Parquet writer runs in a worker thread."""
+        q: queue.Queue = queue.Queue(maxsize=self.max_buffered_batches)
+
+        def _drain() -> Iterator[pa.RecordBatch]:
+            while True:
+                item = q.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+
+        writer = asyncio.ensure_future(asyncio.to_thread(self._write, _drain()))
+
+        def _put(item: object) -> None:
+            # Blocking put with a timeout so a dead writer cannot deadlock the producer
+            while not writer.done():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        try:
+            async for batch in batches:
+                await asyncio.to_thread(_put, batch)
+                if writer.done():
+                    break
+        except BaseException as e:
+            await asyncio.to_thread(_put, RuntimeError(f"Producer failed: {e!r}"))
+            await asyncio.gather(writer, return_exceptions=True)
+            raise
+
+        await asyncio.to_thread(_put, _DONE)
+        await writer
+        logger.debug("Finished writing partitioned dataset to %s", self.out)
+
+
+def write_partitioned_frame(
+    df: pd.DataFrame,
+    out: Path,
+    options: ParquetOptions = ParquetOptions(),
+    partition_col: str = BarField.TICKER.value,
+) -> None:
+    """Write a bars DataFrame as a hive-partitioned dataset with `options`."""
+    missing = set(options.float32_columns) - set(df.columns)
+    if missing:
+        raise ValueError(f"float32 columns not in frame: {sorted(missing)}")
+    if options.sort_by_date:
+        df = df.sort_values([partition_col, BarField.DATE.value], kind="stable")
+    df = df.astype({c: "float32" for c in options.float32_columns})
+    df.to_parquet(
+        out,
+        index=False,
+        partition_cols=[partition_col],
+        row_group_size=options.row_group_size,
+        **options.parquet_kwargs(),
+    )
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Iterator, Literal
+
+import numpy as np
+import pandas as pd
+
+from xfin.forecaster.diagnostics import mae, rmse
+from xfin.forecaster.parallel import process_pool, read_shared, resolve_n_jobs, shared_frame
+from xfin.forecaster.models.base import updates_exactly
+from xfin.forecaster.runner import ModelState, RunConfig, fit_predict
+
+logger = logging.getLogger(__name__)
+
+Window = Literal["expanding", "rolling"]
+
+
+@dataclass(frozen=True)
+class BacktestConfig:
+    """
+    Walk-forward split over the panel's trading dates.
+
+    n_folds:         number of consecutive test windows, ending at the last date
+    test_size:       dates per test window (None: split what follows
+                     min_train_size evenly over n_folds)
+    min_train_size:  dates the first training window must cover
+    window:          "expanding" (train on all history) or "rolling"
+                     (the last train_size dates only)
+    gap:             dates skipped between train and test; None uses
+                     horizon - 1, so no training target is observed after
+                     the first test date
+    n_jobs:          folds evaluated in parallel (1 = in-process)
+    refit:           refit every fold even for models whose update() is
+                     exact (by default expanding in-process backtests fit
+                     them once and update them fold by fold, with the same
+                     results as a refit)
+    """
+
+    n_folds: int = 5
+    test_size: int | None = None
+    min_train_size: int = 20
+    window: Window = "expanding"
+    train_size: int | None = None
+    gap: int | None = None
+    n_jobs: int = 1
+    refit: bool = False
+
+    def __post_init__(self) -> None:
+        if self.n_folds < 1:
+            raise ValueError(f"n_folds must be >= 1, got {self.n_folds}")
+        if self.n_jobs == 0:
+            raise ValueError("n_jobs must be non-zero (1 = in-process, -1 = all cores)")
+        if self.window not in ("expanding", "rolling"):
+            raise ValueError(f"Unknown window: {self.window!r}")
+        if self.window == "rolling" and not self.train_size:
+            raise ValueError("rolling window needs train_size")
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Date-index bounds [start, end) of one train/test split."""
+
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def make_folds(n_dates: int, cfg: BacktestConfig, horizon: int = 1) -> list[Fold]:
+    """Walk-forward folds over `n_dates` sorted trading dates."""
+    gap = max(horizon - 1, 0) if cfg.gap is None else cfg.gap
+    test_size = cfg.test_size or (n_dates - cfg.min_train_size - gap) // cfg.n_folds
+    if test_size < 1:
+        raise ValueError(
+            f"{n_dates} dates are too few for {cfg.n_folds} folds "
+            f"after min_train_size={cfg.min_train_size} and gap={gap}"
+        )
+
+    folds = []
+    for k in range(cfg.n_folds):
+        test_start = n_dates - (cfg.n_folds - k) * test_size
+        train_end = test_start - gap
+        train_start = 0 if cfg.window == "expanding" else max(0, train_end - cfg.train_size)
+        if train_end - train_start < cfg.min_train_size:
+            raise ValueError(
+                f"Fold {k} would train on {train_end - train_start} dates "
+                f"(< min_train_size={cfg.min_train_size})"
+            )
+        folds.append(Fold(k, train_start, train_end, test_start, test_start + test_size))
+    return folds
+
+
+def score(y_true: pd.Series, y_pred: pd.Series) -> dict[str, float]:
+    """Error metrics over the rows that have a prediction."""
+    ok = y_pred.notna()
+    return {
+        "mae": mae(y_true[ok], y_pred[ok]),
+        "rmse": rmse(y_true[ok], y_pred[ok]),
+        "n_test": int(len(y_true)),
+        "coverage": float(ok.mean()) if len(ok) else 0.0,
+    }
+
+
+@dataclass
+class FoldResult:
+    fold: Fold
+    train_dates: tuple[pd.Timestamp, pd.Timestamp]
+    test_dates: tuple[pd.Timestamp, pd.Timestamp]
+    n_train: int
+    y_true: pd.Series
+    y_pred: pd.Series
+
+    @property
+    def metrics(self) -> dict[str, float]:
+        return score(self.y_true, self.y_pred)
+
+
+@dataclass
+class BacktestResult:
+    folds: list[FoldResult] = field(default_factory=list)
+
+    def metrics(self) -> pd.DataFrame:
+        """One row per fold plus an "all" row over the pooled predictions."""
+        rows = [
+            {
+                "fold": r.fold.index,
+                "train_start": r.train_dates[0],
+                "train_end": r.train_dates[1],
+                "test_start": r.test_dates[0],
+                "test_end": r.test_dates[1],
+                "n_train": r.n_train,
+                **r.metrics,
+            }
+            for r in self.folds
+        ]
+        if self.folds:
+            rows.append(
+                {
+                    "fold": "all",
+                    "test_start": self.folds[0].test_dates[0],
+                    "test_end": self.folds[-1].test_dates[1],
+                    **score(
+                        pd.concat([r.y_true for r in self.folds]),
+                        pd.concat([r.y_pred for r in self.folds]),
+                    ),
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def predictions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Out-of-sample predictions with ticker/dt taken from the backtested frame."""
+        parts = [
+            pd.DataFrame({"fold": r.fold.index, "y_true": r.y_true, "y_pred": r.y_pred})
+            for r in self.folds
+        ]
+        out = pd.concat(parts)
+        return df.loc[out.index, ["ticker", "dt"]].join(out)
+
+
+def _fold_result(
+    fold: Fold, dates: np.ndarray, n_train: int, test: pd.DataFrame, y_pred: pd.Series
+) -> FoldResult:
+    def span(start: int, end: int) -> tuple[pd.Timestamp, pd.Timestamp]:
+        return pd.Timestamp(dates[start]), pd.Timestamp(dates[end - 1])
+
+    return FoldResult(
+        fold=fold,
+        train_dates=span(fold.train_start, fold.train_end),
+        test_dates=span(fold.test_start, fold.test_end),
+        n_train=n_train,
+        y_true=test["y"],
+        y_pred=y_pred,
+    )
+
+
+def _run_fold(
+    df: pd.DataFrame, bounds: np.ndarray, dates: np.ndarray, fold: Fold, run: RunConfig
+) -> FoldResult:
+    # rows are in date order, so train and test are contiguous slices (no copies)
+    train = df.iloc[bounds[fold.train_start] : bounds[fold.train_end]]
+    test = df.iloc[bounds[fold.test_start] : bounds[fold.test_end]]
+    logger.debug("Fold %d: train rows=%d test rows=%d", fold.index, len(train), len(test))
+    return _fold_result(fold, dates, len(train), test, fit_predict(train, test, run))
+
+
+def _iter_folds_online(
+    df: pd.DataFrame, bounds: np.ndarray, dates: np.ndarray, folds: list[Fold], run: RunConfig
+) -> Iterator[FoldResult]:
+    """
+    Expanding folds for models with an exact update(): fit once on the
+    first training window, then feed each later fold only the dates added
+    since.
+    """
+    state: ModelState | None = None
+    seen = 0
+    for fold in folds:
+        new = df.iloc[bounds[seen] : bounds[fold.train_end]]
+        state = ModelState.fit(new, run) if state is None else state.update(new)
+        seen = fold.train_end
+        test = df.iloc[bounds[fold.test_start] : bounds[fold.test_end]]
+        n_train = int(bounds[fold.train_end])
+        logger.debug("Fold %d: +%d train rows, test rows=%d", fold.index, len(new), len(test))
+        yield _fold_result(fold, dates, n_train, test, state.predict(test))
+
+
+def _run_fold_shared(
+    path: str, bounds: np.ndarray, dates: np.ndarray, fold: Fold, run: RunConfig
+) -> FoldResult:
+    """Worker: the fold's rows only, from the memory-mapped frame."""
+    table = read_shared(path)
+    start, end = bounds[fold.train_start], bounds[fold.test_end]
+    part = table.slice(start, end - start).to_pandas()
+    # positions relative to the slice, same dates
+    return _run_fold(part, bounds - start, dates, fold, run)
+
+
+def _layout(
+    df: pd.DataFrame, run: RunConfig, cfg: BacktestConfig
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, list[Fold]]:
+    """Date-sorted frame, first row of every date (plus the end) and the folds."""
+    if "y" not in df.columns:
+        raise ValueError("backtest() expects a frame prepared by prepare_supervised()")
+    if not df.index.is_unique:
+        # predictions are matched back to rows by index label
+        raise ValueError("backtest() needs a frame with a unique index")
+
+    df = df.sort_values(["dt", "ticker"], kind="stable")
+    dt = df["dt"].to_numpy()
+    dates = np.unique(dt)
+    # bounds[i]: first row of date i (rows are date-sorted)
+    bounds = np.searchsorted(dt, dates, side="left")
+    bounds = np.append(bounds, len(df))
+    return df, bounds, dates, make_folds(len(dates), cfg, horizon=run.horizon)
+
+
+def _log_fold(r: FoldResult) -> None:
+    m = r.metrics
+    logger.info(
+        "Fold %d test %s..%s: mae=%.6g rmse=%.6g n=%d",
+        r.fold.index,
+        r.test_dates[0].date(),
+        r.test_dates[1].date(),
+        m["mae"],
+        m["rmse"],
+        m["n_test"],
+    )
+
+
+def walk_forward(
+    df: pd.DataFrame, run: RunConfig, cfg: BacktestConfig = BacktestConfig()
+) -> Iterator[FoldResult]:
+    """
+    In-process backtest() that yields one fold at a time, so a caller can
+    stop after the early folds (e.g. a pruned tuning trial). cfg.n_jobs is
+    not used.
+    """
+    df, bounds, dates, folds = _layout(df, run, cfg)
+    online = (
+        cfg.window == "expanding" and not cfg.refit and updates_exactly(run.make_model())
+    )
+    if online:
+        yield from _iter_folds_online(df, bounds, dates, folds, run)
+    else:
+        for f in folds:
+            yield _run_fold(df, bounds, dates, f, run)
+
+
+def backtest(
+    df: pd.DataFrame, run: RunConfig, cfg: BacktestConfig = BacktestConfig()
+) -> BacktestResult:
+    """
+    Walk-forward evaluation of `run.model` on a frame prepared by
+    prepare_supervised(): for each fold fit on the training dates, predict
+    the following test dates out of sample.
+
+    The frame is put in date order once; every fold then takes its train
+    and test rows as contiguous slices of it, so features are computed
+    once and never re-sliced by mask or copied per fold.
+
+    In-process expanding backtests of models with an exact update() fit
+    once and then only feed each fold its new dates (unless cfg.refit);
+    other models are refitted every fold, so n_jobs never changes the
+    results. With
+    n_jobs != 1 the frame is shared with worker processes through a
+    memory-mapped Arrow file and each worker reads only its fold's rows.
+    """
+    if cfg.n_jobs == 1:
+        results = list(walk_forward(df, run, cfg))
+    else:
+        df, bounds, dates, folds = _layout(df, run, cfg)
+        # folds run in parallel, so each fold stays sequential inside
+        inner = replace(run, n_jobs=1)
+        workers = min(resolve_n_jobs(cfg.n_jobs), len(folds))
+        logger.info("Backtesting %d folds on %d workers", len(folds), workers)
+        with shared_frame(df) as path, process_pool(workers) as pool:
+            futures = [
+                pool.submit(_run_fold_shared, path, bounds, dates, f, inner) for f in folds
+            ]
+            results = [f.result() for f in futures]
+
+    for r in results:
+        _log_fold(r)
+    return BacktestResult(folds=results)
@@ -1,61 +1,336 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import sys
 from pathlib import Path
 
 import pandas as pd
 
+from xfin.cache import FrameCache, cache_key, stat_fingerprint
+from xfin.data_engine.io.reader import partition_files
+from xfin.forecaster.backtest import BacktestConfig, backtest
+from xfin.forecaster.dataset import latest_bars, load_dataset, prepare_supervised
 from xfin.logging_config import setup_logging
 from xfin.forecaster.diagnostics import mae
 from xfin.forecaster.registry import list_models
-from xfin.forecaster.runner import RunConfig, run_forecast
+from xfin.forecaster.runner import ModelState, RunConfig, run_supervised
 
 logger = logging.getLogger(__name__)
 
 
-def _parse_tickers(s: str | None) -> list[str] | None:
+def _parse_csv(s: str | None) -> list[str] | None:
     if not s:
         return None
     return [t.strip() for t in s.split(",") if t.strip()]
 
 
-def main() -> int:
-    p = argparse.ArgumentParser(prog="xfin-forecast")
+def _parse_params(items: list[str] | None) -> dict:
+    """KEY=VALUE pairs; values are read as JSON when possible (numbers, true, lists)."""
+    params = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Expected KEY=VALUE, got {item!r}")
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+    return params
+
+
+def _add_common_args(p: argparse.ArgumentParser) -> None:
     p.add_argument("--data", default="data/processed/bars", help="Processed dataset root (partitioned parquet)")
     p.add_argument("--model", default="naive_last_close", choices=list_models())
+    p.add_argument(
+        "--param",
+        action="append",
+        metavar="KEY=VALUE",
+        help="Model constructor argument, repeatable (e.g. --param n_estimators=500)",
+    )
     p.add_argument("--mode", default="auto", choices=["auto", "global", "per_ticker"])
     p.add_argument("--tickers", default=None, help="Comma-separated tickers, e.g. AAA,BBB (optional)")
     p.add_argument("--horizon", type=int, default=1)
+    p.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Worker processes for per_ticker mode (1 = sequential, -1 = all cores)",
+    )
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Tickers per worker task (default: about four tasks per worker)",
+    )
+    p.add_argument(
+        "--features",
+        default=None,
+        help="Comma-separated lazy features to materialise (declared in <data>/_features.json)",
+    )
+
+    p.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Cache prepared supervised frames here (keyed by dataset, options and code)",
+    )
+    p.add_argument("--cache-max-mb", type=int, default=2048)
 
     p.add_argument("--log-level", default="INFO")
     p.add_argument("--log-file", default=None)
-    args = p.parse_args()
 
+
+def _run_config(args: argparse.Namespace) -> RunConfig:
+    return RunConfig(
+        model=args.model,
+        mode=args.mode,
+        tickers=_parse_csv(args.tickers),
+        horizon=args.horizon,
+        n_jobs=args.n_jobs,
+        chunk_size=args.chunk_size,
+        params=_parse_params(args.param),
+    )
+
+
+def _load_bars(args: argparse.Namespace, cfg: RunConfig) -> pd.DataFrame:
+    data_root = Path(args.data)
+    logger.info("Loading dataset: %s (tickers=%s)", data_root, cfg.tickers or "all")
+    return load_dataset(data_root, tickers=cfg.tickers, features=_parse_csv(args.features) or [])
+
+
+def _load_supervised(args: argparse.Namespace, cfg: RunConfig) -> pd.DataFrame:
+    """Read the dataset and build the supervised frame, through the cache if enabled."""
+    data_root = Path(args.data)
+    features = _parse_csv(args.features) or []
+
+    def load() -> pd.DataFrame:
+        df = _load_bars(args, cfg)
+        return prepare_supervised(df, target_col=cfg.target_col, horizon=cfg.horizon)
+
+    if not args.cache_dir:
+        return load()
+
+    cache = FrameCache(Path(args.cache_dir), max_bytes=args.cache_max_mb << 20)
+    key = cache_key(
+        "supervised",
+        stat_fingerprint([*partition_files(data_root, cfg.tickers), *data_root.glob("_*.json")]),
+        sorted(cfg.tickers or []),
+        features,
+        cfg.target_col,
+        cfg.horizon,
+    )
+    return cache.get_or_compute(key, load)
+
+
+def _setup(args: argparse.Namespace) -> int:
+    """Logging and input checks shared by all commands; non-zero means exit."""
     try:
         setup_logging(level=args.log_level, log_file=args.log_file)
     except ValueError as e:
         print(f"Invalid log level: {e}", file=sys.stderr)
         return 2
 
-    data_root = Path(args.data)
-    if not data_root.exists():
-        logger.error("Data path does not exist: %s", data_root)
+    if not Path(args.data).exists():
+        logger.error("Data path does not exist: %s", args.data)
         return 2
+    return 0
 
-    logger.info("Loading dataset: %s", data_root)
-    df = pd.read_parquet(data_root)
-    df["dt"] = pd.to_datetime(df["dt"])
 
-    cfg = RunConfig(
-        model=args.model,
-        mode=args.mode,
-        tickers=_parse_tickers(args.tickers),
-        horizon=args.horizon,
+def _add_backtest_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--folds", type=int, default=5)
+    p.add_argument("--test-size", type=int, default=None, help="Dates per test fold")
+    p.add_argument(
+        "--min-train-size", type=int, default=20, help="Dates in the first train window"
+    )
+    p.add_argument("--window", choices=["expanding", "rolling"], default="expanding")
+    p.add_argument("--train-size", type=int, default=None, help="Dates per rolling train window")
+    p.add_argument(
+        "--gap", type=int, default=None, help="Dates between train and test (default: horizon-1)"
+    )
+    p.add_argument(
+        "--refit",
+        action="store_true",
+        help="Refit every fold instead of updating models whose update() matches a refit",
+    )
+
+
+def _backtest_config(args: argparse.Namespace, n_jobs: int = 1) -> BacktestConfig:
+    return BacktestConfig(
+        n_folds=args.folds,
+        test_size=args.test_size,
+        min_train_size=args.min_train_size,
+        window=args.window,
+        train_size=args.train_size,
+        gap=args.gap,
+        n_jobs=n_jobs,
+        refit=args.refit,
     )
 
-    result = run_forecast(df, cfg)
+
+def backtest_main(argv: list[str] | None = None) -> int:
+    """xfin-forecast backtest: walk-forward out-of-sample evaluation."""
+    p = argparse.ArgumentParser(prog="xfin-forecast backtest")
+    _add_common_args(p)
+    _add_backtest_args(p)
+    p.add_argument("--fold-jobs", type=int, default=1, help="Folds evaluated in parallel")
+    p.add_argument("--predictions-csv", default=None, help="Write out-of-sample predictions here")
+    args = p.parse_args(argv)
+
+    if code := _setup(args):
+        return code
+
+    try:
+        cfg = _run_config(args)
+        bt = _backtest_config(args, n_jobs=args.fold_jobs)
+        df = _load_supervised(args, cfg)
+        result = backtest(df, cfg, bt)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+
+    print(result.metrics().to_string(index=False))
+    if args.predictions_csv:
+        result.predictions(df).to_csv(args.predictions_csv, index=False)
+    return 0
+
+
+def tune_main(argv: list[str] | None = None) -> int:
+    """xfin-forecast tune: hyperparameter search scored by walk-forward backtest."""
+    # imported here: optuna is slow to import and only needed by this command
+    from xfin.forecaster.tuning import METRICS, TuneConfig, tune
+
+    p = argparse.ArgumentParser(prog="xfin-forecast tune")
+    _add_common_args(p)
+    _add_backtest_args(p)
+    p.add_argument("--study", default=None, help="Study name (default: <model>-h<horizon>)")
+    p.add_argument(
+        "--storage",
+        default=None,
+        help="Journal file, SQLite file (*.db) or optuna storage URL; an existing study "
+        "resumes (default: data/optuna/<study>.journal)",
+    )
+    p.add_argument("--trials", type=int, default=50, help="Finished trials to reach in total")
+    p.add_argument("--trial-jobs", type=int, default=1, help="Trials run in parallel processes")
+    p.add_argument("--metric", choices=list(METRICS), default="mae")
+    p.add_argument("--no-prune", action="store_true", help="Run every trial over all folds")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--timeout", type=float, default=None, help="Seconds per worker")
+    p.add_argument("--trials-csv", default=None, help="Write all trials of the study here")
+    args = p.parse_args(argv)
+
+    if code := _setup(args):
+        return code
+
+    try:
+        cfg = _run_config(args)
+        study = args.study or f"{cfg.model}-h{cfg.horizon}"
+        tc = TuneConfig(
+            study=study,
+            storage=args.storage or str(Path("data/optuna") / f"{study}.journal"),
+            n_trials=args.trials,
+            n_jobs=args.trial_jobs,
+            metric=args.metric,
+            prune=not args.no_prune,
+            seed=args.seed,
+            timeout=args.timeout,
+        )
+        df = _load_supervised(args, cfg)
+        result = tune(df, cfg, _backtest_config(args), tc)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+
+    trials = result.trials_dataframe(attrs=("number", "state", "value", "params"))
+    if args.trials_csv:
+        trials.to_csv(args.trials_csv, index=False)
+    print(trials["state"].value_counts().to_string())
+    try:
+        best = result.best_trial
+    except ValueError:  # no completed trial
+        logger.error("Study %s has no completed trial", study)
+        return 1
+    print(f"best trial {best.number}: {args.metric}={best.value:.6g}")
+    params = best.user_attrs.get("params", best.params)
+    print(" ".join(f"--param {k}={json.dumps(v)}" for k, v in params.items()))
+    return 0
+
+
+def _run_stateful(bars: pd.DataFrame, cfg: RunConfig, path: Path) -> int:
+    """
+    Fit once, then move the saved model state forward: later runs only
+    feed it the supervised rows it has not seen. Prints the forecast
+    for the newest bar of every ticker.
+    """
+    df = prepare_supervised(bars, target_col=cfg.target_col, horizon=cfg.horizon)
+    if path.exists():
+        state = ModelState.load(path)
+        stored = (state.cfg.model, state.cfg.mode, dict(state.cfg.params))
+        stored += (state.cfg.target_col, state.cfg.horizon)
+        wanted = (cfg.model, cfg.mode, dict(cfg.params), cfg.target_col, cfg.horizon)
+        if stored != wanted:
+            logger.error(
+                "State %s was fitted with model, mode, params, target, horizon = %s, not %s",
+                path,
+                stored,
+                wanted,
+            )
+            return 2
+        new = state.unseen(df)
+        state.update(new)
+        logger.info(
+            "Updated %s with %d new rows (%s, through %s)",
+            cfg.model,
+            len(new),
+            "online" if state.online else "refit",
+            state.last_dt,
+        )
+    else:
+        state = ModelState.fit(df, cfg)
+        logger.info("Fitted %s on %d rows (through %s)", cfg.model, len(df), state.last_dt)
+    state.save(path)
+
+    latest = latest_bars(bars)
+    forecast = latest[["ticker", "dt", cfg.target_col]].assign(y_pred=state.predict(latest))
+    logger.info("Forecast %d tickers, %d bar(s) ahead", len(forecast), cfg.horizon)
+    print(forecast.to_string(index=False))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["backtest"]:
+        return backtest_main(argv[1:])
+    if argv[:1] == ["tune"]:
+        return tune_main(argv[1:])
+
+    p = argparse.ArgumentParser(
+        prog="xfin-forecast",
+        epilog="Subcommands: 'xfin-forecast backtest --help' (walk-forward evaluation), "
+        "'xfin-forecast tune --help' (hyperparameter search).",
+    )
+    _add_common_args(p)
+    p.add_argument(
+        "--state",
+        default=None,
+        help="Keep the fitted model here and only update it with new rows on later runs",
+    )
+    args = p.parse_args(argv)
+
+    if code := _setup(args):
+        return code
+
+    try:
+        cfg = _run_config(args)
+        if args.state:
+            # the newest bars have no target yet, so this needs the bars themselves
+            return _run_stateful(_load_bars(args, cfg), cfg, Path(args.state))
+        df = _load_supervised(args, cfg)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+
+    result = run_supervised(df, cfg)
 
     # Print a minimal metric
     if isinstance(result, dict):
@@ -1,9 +1,33 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Sequence
 
 import pandas as pd
 
+from xfin.data_engine.io.reader import load_partitioned_bars_arrow
+
+
+def load_dataset(
+    root: str | Path,
+    *,
+    tickers: Sequence[str] | None = None,
+    features: Sequence[str] = (),
+    date_min: str | None = None,
+    date_max: str | None = None,
+) -> pd.DataFrame:
+    """
+    Read the processed bars dataset with ticker/date pushdown: only the
+    partitions of `tickers` are opened. `features` may name lazy features.
+    """
+    return load_partitioned_bars_arrow(
+        Path(root),
+        tickers=tickers,
+        features=features,
+        date_min=date_min,
+        date_max=date_max,
+    )
+
 
 def select_tickers(df: pd.DataFrame, tickers: Sequence[str] | None) -> pd.DataFrame:
     """
@@ -32,3 +56,11 @@ def prepare_supervised(
     df["y"] = df.groupby("ticker")[target_col].shift(-horizon)
     df = df.dropna(subset=["y"])
     return df
+
+
+def latest_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Newest bar of every ticker, i.e. the rows to forecast: prepare_supervised()
+    drops them because their target is not known yet.
+    """
+    return df.sort_values(["ticker", "dt"]).groupby("ticker", sort=True).tail(1)
@@ -5,3 +5,7 @@ import pandas as pd
 
 def mae(y_true: pd.Series, y_pred: pd.Series) -> float:
     return float((y_true.astype(float) - y_pred.astype(float)).abs().mean())
+
+
+def rmse(y_true: pd.Series, y_pred: pd.Series) -> float:
+    return float(((y_true.astype(float) - y_pred.astype(float)) ** 2).mean() ** 0.5)
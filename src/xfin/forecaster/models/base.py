@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Literal, Protocol
+from typing import Any, Literal, Protocol, runtime_checkable
 
 import pandas as pd
 
@@ -29,3 +29,42 @@ class Forecaster(Protocol):
 
     def fit(self, df: pd.DataFrame) -> "Forecaster": ...
     def predict(self, df: pd.DataFrame) -> ForecastResult: ...
+
+
+@runtime_checkable
+class SupportsUpdate(Protocol):
+    """
+    Optional capability: fold new training rows into an already fitted
+    model instead of refitting on the whole history.
+
+    `df` holds only rows newer than everything the model has seen;
+    fit(a).update(b) should give the same model as fit(a + b), up to the
+    model's own approximations, at a cost that depends on len(b) only.
+
+    Models for which that holds exactly set the class attribute
+    `exact_update = True`; only those may stand in for a refit where
+    results must not depend on it (walk-forward backtests).
+    """
+
+    def update(self, df: pd.DataFrame) -> "Forecaster": ...
+
+
+def supports_update(model: object) -> bool:
+    """True if `model` implements the optional update() method."""
+    return isinstance(model, SupportsUpdate)
+
+
+def updates_exactly(model: object) -> bool:
+    """True if `model` has update() and declares it equal to a refit."""
+    return supports_update(model) and getattr(model, "exact_update", False)
+
+
+@runtime_checkable
+class Tunable(Protocol):
+    """
+    Optional capability: a hyperparameter search space for
+    xfin-forecast tune. search_space() draws constructor arguments of the
+    model from an optuna Trial (trial.suggest_*) and returns them.
+    """
+
+    def search_space(self, trial: Any) -> dict[str, Any]: ...
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+from xfin.forecaster.models.base import ForecastResult
+
+# never features: keys and the target
+_NON_FEATURES = {"ticker", "dt", "y"}
+
+
+def _threads(n_jobs: int) -> int:
+    # imported here: parallel imports the registry, which imports this module
+    from xfin.forecaster.parallel import resolve_n_jobs
+
+    return resolve_n_jobs(n_jobs)
+
+
+class _GlobalBoosting(ABC):
+    """
+    Shared plumbing of the gradient-boosted global models: one model over
+    all tickers, trained on the feature columns plus the ticker as a
+    categorical feature.
+
+    Trees cannot extrapolate price levels, so the model learns the
+    relative change y / close - 1 and predictions are mapped back to
+    prices. The design matrix is a single float32 array filled column by
+    column straight from the frame's arrays (no intermediate DataFrame).
+    update() continues boosting from the fitted model with `update_rounds`
+    more trees on the new rows only (warm start), which is not the model a
+    refit would grow, so backtests refit it every fold.
+    """
+    scope = "global"
+    exact_update = False
+
+    def __init__(
+        self,
+        *,
+        features: Sequence[str] | None = None,
+        n_estimators: int = 300,
+        learning_rate: float = 0.05,
+        update_rounds: int = 20,
+        n_jobs: int = -1,
+        seed: int = 0,
+        **params: Any,
+    ):
+        if n_estimators < 1:
+            raise ValueError(f"n_estimators must be >= 1, got {n_estimators}")
+        self.features = list(features) if features is not None else None
+        self.n_estimators = n_estimators
+        self.learning_rate = learning_rate
+        self.update_rounds = update_rounds
+        self.n_jobs = n_jobs
+        self.seed = seed
+        self.params = params  # passed to the library as-is
+        self.feature_names_: list[str] | None = None
+        self.tickers_: pd.Index | None = None
+        self.booster_ = None
+
+    # -- design matrix ------------------------------------------------------
+
+    def _feature_columns(self, df: pd.DataFrame) -> list[str]:
+        if self.features is not None:
+            missing = [c for c in self.features if c not in df.columns]
+            if missing:
+                raise ValueError(f"Missing feature columns: {missing}")
+            return self.features
+        return [
+            c
+            for c in df.columns
+            if c not in _NON_FEATURES and pd.api.types.is_numeric_dtype(df[c])
+        ]
+
+    def _matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        float32 [features..., ticker code]; infinities (e.g. changes from a
+        zero volume) and unseen tickers become missing values (NaN).
+        """
+        X = np.empty((len(df), len(self.feature_names_) + 1), dtype=np.float32)
+        for j, c in enumerate(self.feature_names_):
+            X[:, j] = df[c].to_numpy(dtype=np.float32, copy=False)
+        np.putmask(X, np.isinf(X), np.nan)
+        codes = self.tickers_.get_indexer(df["ticker"])
+        X[:, -1] = np.where(codes >= 0, codes, np.nan)
+        return X
+
+    def _train_on(self, df: pd.DataFrame, rounds: int, init=None):
+        close = df["close"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = df["y"].to_numpy(dtype=np.float64) / close - 1.0
+        X = self._matrix(df)
+        ok = np.isfinite(y)  # e.g. close == 0
+        if not ok.all():
+            X, y = X[ok], y[ok]
+        return self._train(X, y.astype(np.float32), rounds, init=init)
+
+    # -- Forecaster ---------------------------------------------------------
+
+    def fit(self, df: pd.DataFrame):
+        missing = {"ticker", "close", "y"} - set(df.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {sorted(missing)}")
+        self.feature_names_ = self._feature_columns(df)
+        self.tickers_ = pd.Index(sorted(pd.unique(df["ticker"])))
+        self.booster_ = self._train_on(df, self.n_estimators)
+        return self
+
+    def update(self, df: pd.DataFrame):
+        if self.booster_ is None:
+            return self.fit(df)
+        if not df.empty and self.update_rounds > 0:
+            self.booster_ = self._train_on(df, self.update_rounds, init=self.booster_)
+        return self
+
+    def predict(self, df: pd.DataFrame) -> ForecastResult:
+        if self.booster_ is None:
+            raise ValueError(f"{self.name} is not fitted")
+        change = self._predict(self._matrix(df))
+        y_pred = pd.Series(
+            df["close"].to_numpy(dtype=np.float64) * (1.0 + change), index=df.index
+        )
+        return ForecastResult(y_pred=y_pred, meta={"features": self.feature_names_})
+
+    @property
+    def categorical_index(self) -> int:
+        return len(self.feature_names_)
+
+    def search_space(self, trial) -> dict:
+        """Boosting length and rate; subclasses add their tree parameters."""
+        return {
+            "n_estimators": trial.suggest_int("n_estimators", 50, 600, step=50),
+            "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+        }
+
+    @abstractmethod
+    def _train(self, X: np.ndarray, y: np.ndarray, rounds: int, init=None):
+        """Train `rounds` trees on (X, y), continuing from booster `init` if given."""
+
+    @abstractmethod
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        """Predicted relative change for the rows of X."""
+
+
+class LightGBMForecaster(_GlobalBoosting):
+    """LightGBM histogram GBDT over all tickers (see _GlobalBoosting)."""
+    name = "lightgbm"
+
+    def search_space(self, trial) -> dict:
+        return {
+            **super().search_space(trial),
+            "num_leaves": trial.suggest_int("num_leaves", 8, 256, log=True),
+            "min_data_in_leaf": trial.suggest_int("min_data_in_leaf", 5, 500, log=True),
+            "feature_fraction": trial.suggest_float("feature_fraction", 0.5, 1.0),
+            "bagging_fraction": trial.suggest_float("bagging_fraction", 0.5, 1.0),
+            "bagging_freq": 1,
+            "lambda_l2": trial.suggest_float("lambda_l2", 1e-8, 10.0, log=True),
+        }
+
+    def _train(self, X: np.ndarray, y: np.ndarray, rounds: int, init=None):
+        import lightgbm as lgb
+
+        params = {
+            "objective": "regression",
+            "learning_rate": self.learning_rate,
+            "num_threads": _threads(self.n_jobs),
+            "seed": self.seed,
+            "deterministic": True,
+            "verbosity": -1,
+            **self.params,
+        }
+        data = lgb.Dataset(
+            X,
+            label=y,
+            feature_name=[*self.feature_names_, "ticker"],
+            categorical_feature=[self.categorical_index],
+            params=params,
+        )
+        return lgb.train(params, data, num_boost_round=rounds, init_model=init)
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        return self.booster_.predict(X, num_threads=_threads(self.n_jobs))
+
+
+class XGBoostForecaster(_GlobalBoosting):
+    """XGBoost `hist` GBDT over all tickers (see _GlobalBoosting)."""
+    name = "xgboost"
+
+    def search_space(self, trial) -> dict:
+        return {
+            **super().search_space(trial),
+            "max_depth": trial.suggest_int("max_depth", 3, 10),
+            "min_child_weight": trial.suggest_float("min_child_weight", 1.0, 100.0, log=True),
+            "subsample": trial.suggest_float("subsample", 0.5, 1.0),
+            "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+            "lambda": trial.suggest_float("lambda", 1e-8, 10.0, log=True),
+        }
+
+    def _dmatrix(self, X: np.ndarray, y: np.ndarray | None = None):
+        import xgboost as xgb
+
+        return xgb.DMatrix(
+            X,
+            label=y,
+            feature_names=[*self.feature_names_, "ticker"],
+            feature_types=["q"] * self.categorical_index + ["c"],
+            enable_categorical=True,
+            nthread=_threads(self.n_jobs),
+        )
+
+    def _train(self, X: np.ndarray, y: np.ndarray, rounds: int, init=None):
+        import xgboost as xgb
+
+        params = {
+            "objective": "reg:squarederror",
+            "tree_method": "hist",
+            "eta": self.learning_rate,
+            "nthread": _threads(self.n_jobs),
+            "seed": self.seed,
+            **self.params,
+        }
+        return xgb.train(params, self._dmatrix(X, y), num_boost_round=rounds, xgb_model=init)
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        return self.booster_.predict(self._dmatrix(X))
@@ -14,10 +14,14 @@ class NaiveLastClose:
     """
     name = "naive_last_close"
     scope = "global"
+    exact_update = True
 
     def fit(self, df: pd.DataFrame) -> "NaiveLastClose":
         return self  # no training
 
+    def update(self, df: pd.DataFrame) -> "NaiveLastClose":
+        return self  # no state to move forward
+
     def predict(self, df: pd.DataFrame) -> ForecastResult:
         if "close" not in df.columns:
             raise ValueError("Expected column 'close' in df")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from xfin.forecaster.models.base import ForecastResult
+
+
+class EwmDrift:
+    """
+    Persistence plus an exponentially smoothed drift: predict
+    close + d, where d is the exponentially weighted mean of the past
+    changes (y - close) seen in training, newest weighted most
+    (simple exponential smoothing of the change, smoothing factor `alpha`).
+
+    The whole fitted state is d and a row count, so update() folds in new
+    rows in O(new rows) and fit(a).update(b) equals fit(a + b) as long as
+    b is newer than a. Rows are consumed in (dt, ticker) order; meant for
+    per_ticker mode.
+    """
+    name = "ewm_drift"
+    scope = "per_ticker"
+    exact_update = True
+
+    def __init__(self, alpha: float = 0.1):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.drift_: float | None = None
+        self.n_obs_ = 0
+
+    def search_space(self, trial) -> dict:
+        return {"alpha": trial.suggest_float("alpha", 0.005, 1.0, log=True)}
+
+    def fit(self, df: pd.DataFrame) -> "EwmDrift":
+        self.drift_ = None
+        self.n_obs_ = 0
+        return self.update(df)
+
+    def update(self, df: pd.DataFrame) -> "EwmDrift":
+        missing = {"dt", "close", "y"} - set(df.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {sorted(missing)}")
+        if df.empty:
+            return self
+
+        rows = df.sort_values(["dt", "ticker"] if "ticker" in df.columns else ["dt"])
+        change = (rows["y"].astype(float) - rows["close"].astype(float)).to_numpy()
+        change = change[~np.isnan(change)]
+        if change.size == 0:
+            return self
+
+        level = self.drift_
+        if level is None:
+            level, change = float(change[0]), change[1:]
+        # closed form of level = alpha * x + (1 - alpha) * level over `change`
+        a, n = self.alpha, change.size
+        weights = a * (1.0 - a) ** np.arange(n - 1, -1, -1)
+        self.drift_ = float((1.0 - a) ** n * level + weights @ change)
+        self.n_obs_ += len(rows)
+        return self
+
+    def predict(self, df: pd.DataFrame) -> ForecastResult:
+        if self.drift_ is None:
+            raise ValueError("EwmDrift is not fitted")
+        if "close" not in df.columns:
+            raise ValueError("Expected column 'close' in df")
+        y_pred = df["close"].astype(float) + self.drift_
+        return ForecastResult(y_pred=y_pred, meta={"drift": self.drift_, "n_obs": self.n_obs_})
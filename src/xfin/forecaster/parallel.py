@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from xfin.forecaster.models.base import ForecastResult
+from xfin.forecaster.registry import create_model
+
+logger = logging.getLogger(__name__)
+
+# (ticker, first row, row count) in the ticker-sorted shared table
+TickerSlice = tuple[str, int, int]
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """joblib-style worker count: -1 = all cores, -2 = all but one, ..."""
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be non-zero")
+    cpus = os.cpu_count() or 1
+    return max(1, n_jobs if n_jobs > 0 else cpus + 1 + n_jobs)
+
+
+def _shared_dir() -> str | None:
+    # RAM-backed where available, so workers map the table straight from memory
+    return "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+
+@contextmanager
+def shared_frame(df: pd.DataFrame) -> Iterator[str]:
+    """
+    Write `df` (index included) once to an Arrow IPC file that worker
+    processes memory-map read-only; yield its path, delete it afterwards.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    with tempfile.TemporaryDirectory(prefix="xfin-forecast-", dir=_shared_dir()) as tmp:
+        path = str(Path(tmp) / "frame.arrow")
+        with ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+        del table
+        yield path
+
+
+def read_shared(path: str) -> pa.Table:
+    """Zero-copy view of a table written by shared_frame()."""
+    with pa.memory_map(path) as source:
+        return ipc.open_file(source).read_all()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn: safe alongside threads, same as the data engine's parse pool
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _fit_predict_chunk(
+    path: str, model: str, params: Mapping[str, Any], slices: list[TickerSlice]
+) -> list[tuple]:
+    """Worker: fit and predict one model per ticker slice of the shared table."""
+    table = read_shared(path)
+    out = []
+    for ticker, start, length in slices:
+        g = table.slice(start, length).to_pandas()
+        m = create_model(model, **params)
+        m.fit(g)
+        out.append((ticker, m.predict(g)))
+    return out
+
+
+def run_per_ticker_parallel(
+    df: pd.DataFrame,
+    model: str,
+    *,
+    params: Mapping[str, Any] | None = None,
+    n_jobs: int = -1,
+    chunk_size: int | None = None,
+) -> dict[str, ForecastResult]:
+    """
+    Per-ticker fit/predict of `model` in a process pool.
+
+    The frame is written once, grouped by ticker, to an Arrow IPC file
+    that every worker memory-maps read-only; tasks carry only
+    (ticker, offset, length) slices, `chunk_size` tickers at a time
+    (default: about four chunks per worker). Each ticker sees the same rows,
+    index and dtypes as in the sequential loop, so results are identical.
+    """
+    groups = df.groupby("ticker", sort=True).indices
+    if not groups:
+        return {}
+
+    order = np.concatenate(list(groups.values()))
+    slices: list[TickerSlice] = []
+    start = 0
+    for ticker, rows in groups.items():
+        slices.append((ticker, start, len(rows)))
+        start += len(rows)
+
+    workers = min(resolve_n_jobs(n_jobs), len(slices))
+    size = chunk_size or max(1, math.ceil(len(slices) / (workers * 4)))
+    chunks = [slices[i : i + size] for i in range(0, len(slices), size)]
+    logger.info(
+        "Per-ticker run of %s: %d tickers in %d chunks on %d workers",
+        model,
+        len(slices),
+        len(chunks),
+        workers,
+    )
+
+    with shared_frame(df.iloc[order]) as path, process_pool(workers) as pool:
+        kwargs = dict(params or {})
+        futures = [pool.submit(_fit_predict_chunk, path, model, kwargs, c) for c in chunks]
+        results = dict(item for f in futures for item in f.result())
+
+    return {ticker: results[ticker] for ticker, _, _ in slices}
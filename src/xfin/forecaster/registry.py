@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from typing import Callable
 
+from xfin.forecaster.models.boosting import LightGBMForecaster, XGBoostForecaster
 from xfin.forecaster.models.naive import NaiveLastClose
+from xfin.forecaster.models.smoothing import EwmDrift
 
-_REGISTRY: dict[str, Callable[[], object]] = {
+_REGISTRY: dict[str, Callable[..., object]] = {
     NaiveLastClose.name: NaiveLastClose,
+    EwmDrift.name: EwmDrift,
+    LightGBMForecaster.name: LightGBMForecaster,
+    XGBoostForecaster.name: XGBoostForecaster,
 }
 
 
@@ -14,9 +19,13 @@ def list_models() -> list[str]:
     return sorted(_REGISTRY.keys())
 
 
-def create_model(name: str):
-    """Instantiate a model by name."""
+def create_model(name: str, **params):
+    """Instantiate a model by name; `params` go to the model's constructor."""
     try:
-        return _REGISTRY[name]()
+        factory = _REGISTRY[name]
     except KeyError:
         raise ValueError(f"Unknown model {name!r}. Available: {', '.join(list_models())}")
+    try:
+        return factory(**params)
+    except TypeError as e:  # unexpected keyword
+        raise ValueError(f"Invalid parameters for model {name!r}: {e}") from e
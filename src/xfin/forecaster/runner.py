@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Literal, Sequence
+import logging
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal, Mapping, Sequence
 
 import pandas as pd
 
-from xfin.forecaster.dataset import prepare_supervised, select_tickers
-from xfin.forecaster.models.base import ForecastResult
+from xfin.forecaster.dataset import load_dataset, prepare_supervised, select_tickers
+from xfin.forecaster.models.base import ForecastResult, supports_update
+from xfin.forecaster.parallel import run_per_ticker_parallel
 from xfin.forecaster.registry import create_model
 
+logger = logging.getLogger(__name__)
+
 Mode = Literal["auto", "global", "per_ticker"]
 
 
@@ -19,33 +25,214 @@ class RunConfig:
     tickers: Sequence[str] | None = None
     target_col: str = "close"
     horizon: int = 1
+    # per_ticker mode: worker processes (1 = in-process loop, -1 = all cores)
+    n_jobs: int = 1
+    # tickers per worker task (None: about four chunks per worker)
+    chunk_size: int | None = None
+    # constructor arguments of the model, e.g. {"n_estimators": 500}
+    params: Mapping[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.n_jobs == 0:
+            raise ValueError("n_jobs must be non-zero (1 = in-process, -1 = all cores)")
+        if self.chunk_size is not None and self.chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {self.chunk_size}")
 
+    def make_model(self):
+        return create_model(self.model, **self.params)
 
-def run_forecast(df: pd.DataFrame, cfg: RunConfig):
+
+def run_forecast(df: pd.DataFrame | str | Path, cfg: RunConfig):
     """
     Run forecasting in chosen mode.
 
+    `df` is a bars frame or the root of the processed dataset; a root is
+    read with pushdown, so only the partitions of cfg.tickers are loaded.
+
     Returns:
       - ForecastResult (global)
       - dict[ticker, ForecastResult] (per_ticker)
     """
+    if isinstance(df, (str, Path)):
+        df = load_dataset(df, tickers=cfg.tickers)
     df = select_tickers(df, cfg.tickers)
     df = prepare_supervised(df, target_col=cfg.target_col, horizon=cfg.horizon)
+    return run_supervised(df, cfg)
+
+
+def _resolve_mode(model, cfg: RunConfig) -> Mode:
+    if cfg.mode == "auto":
+        return "per_ticker" if getattr(model, "scope", "global") == "per_ticker" else "global"
+    return cfg.mode
+
+
+@dataclass
+class ModelState:
+    """
+    Fitted model(s) of one RunConfig that can be moved forward in time.
+
+    update() hands only the new rows to models implementing the optional
+    update() method (SupportsUpdate), so a daily refresh costs the size of
+    the new data, not of the history. Other models are refitted on the
+    kept history plus the new rows, which is why only they keep one.
+    In per_ticker mode a ticker first seen in an update gets a fresh model,
+    and each ticker moves forward from its own newest date, so a ticker
+    whose data lags behind the others can catch up.
+    """
+
+    cfg: RunConfig
+    mode: Mode
+    # global mode: a single model under the key None
+    models: dict[str | None, object] = field(default_factory=dict)
+    history: pd.DataFrame | None = None
+    last_dt: pd.Timestamp | None = None
+    # per_ticker mode: newest date each ticker's model has seen
+    ticker_last_dt: dict[str, pd.Timestamp] = field(default_factory=dict)
+
+    @property
+    def online(self) -> bool:
+        return self.history is None
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, cfg: RunConfig) -> "ModelState":
+        """Fit on a frame prepared by prepare_supervised()."""
+        model = cfg.make_model()
+        online = supports_update(model)
+        state = cls(cfg=cfg, mode=_resolve_mode(model, cfg), history=None if online else df)
+        if state.mode == "global":
+            state.models[None] = model.fit(df)
+        elif state.mode == "per_ticker":
+            for tkr, g in df.groupby("ticker", sort=True, observed=True):
+                state.models[tkr] = cfg.make_model().fit(g)
+        else:
+            raise ValueError(f"Unknown mode: {cfg.mode!r}")
+        state._advance(df)
+        return state
+
+    def unseen(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rows newer than what the state has seen: newer than last_dt, or in
+        per_ticker mode than the newest date of their own ticker.
+        """
+        return df[~self._seen(df)]
 
-    model = create_model(cfg.model)
+    def _seen(self, df: pd.DataFrame) -> pd.Series:
+        if self.mode == "per_ticker":
+            # NaT for tickers without a model: none of their rows are seen
+            cutoff = pd.to_datetime(df["ticker"].astype(object).map(self.ticker_last_dt))
+            return df["dt"] <= cutoff
+        if self.last_dt is None:
+            return pd.Series(False, index=df.index)
+        return df["dt"] <= self.last_dt
 
-    mode: Mode = cfg.mode
-    if mode == "auto":
-        mode = "per_ticker" if getattr(model, "scope", "global") == "per_ticker" else "global"
+    def update(self, df: pd.DataFrame) -> "ModelState":
+        """
+        Fold in the unseen() rows (older rows are dropped with a warning,
+        they are already part of the fit).
+        """
+        stale = self._seen(df)
+        if stale.any():
+            logger.warning("Ignoring %d rows the state has already seen", int(stale.sum()))
+            df = df[~stale]
+        if df.empty:
+            return self
+
+        if self.mode == "global":
+            self.models[None] = self._move(self.models[None], df, self.history)
+        else:
+            old = None
+            if self.history is not None:
+                old = self.history.groupby("ticker", observed=True)
+            for tkr, g in df.groupby("ticker", sort=True, observed=True):
+                model = self.models.get(tkr)
+                if model is None:
+                    self.models[tkr] = self.cfg.make_model().fit(g)
+                    continue
+                prior = old.get_group(tkr) if old is not None else None
+                self.models[tkr] = self._move(model, g, prior)
+
+        if self.history is not None:
+            self.history = pd.concat([self.history, df])
+        self._advance(df)
+        return self
+
+    def _move(self, model, new: pd.DataFrame, prior: pd.DataFrame | None):
+        if prior is None:
+            return model.update(new)
+        return self.cfg.make_model().fit(pd.concat([prior, new]))
+
+    def _advance(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        top = pd.Timestamp(df["dt"].max())
+        self.last_dt = top if self.last_dt is None else max(self.last_dt, top)
+        if self.mode == "per_ticker":
+            for tkr, dt in df.groupby("ticker", observed=True)["dt"].max().items():
+                prev = self.ticker_last_dt.get(tkr)
+                self.ticker_last_dt[tkr] = dt if prev is None else max(prev, dt)
+
+    def predict(self, df: pd.DataFrame) -> pd.Series:
+        """Predictions aligned with df.index (NaN for tickers without a model)."""
+        if self.mode == "global":
+            return self.models[None].predict(df).y_pred.reindex(df.index)
+        parts = [
+            self.models[tkr].predict(g).y_pred
+            for tkr, g in df.groupby("ticker", sort=True, observed=True)
+            if tkr in self.models
+        ]
+        pred = pd.concat(parts) if parts else pd.Series(dtype=float)
+        return pred.reindex(df.index)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ModelState":
+        with Path(path).open("rb") as f:
+            state = pickle.load(f)
+        if not isinstance(state, cls):
+            raise ValueError(f"{path} does not hold a ModelState")
+        return state
+
+
+def fit_predict(train: pd.DataFrame, test: pd.DataFrame, cfg: RunConfig) -> pd.Series:
+    """
+    Fit on `train`, predict `test` (both prepared by prepare_supervised());
+    predictions are aligned with test.index. In per_ticker mode each
+    ticker's model sees only its own training rows; tickers without any
+    are predicted as NaN.
+    """
+    return ModelState.fit(train, cfg).predict(test)
+
+
+def run_supervised(df: pd.DataFrame, cfg: RunConfig):
+    """
+    Fit/predict on a frame already prepared by prepare_supervised()
+    (e.g. one taken from a FrameCache); same return types as run_forecast().
+    """
+    model = cfg.make_model()
+    mode = _resolve_mode(model, cfg)
 
     if mode == "global":
         model.fit(df)
         return model.predict(df)
 
     if mode == "per_ticker":
+        if cfg.n_jobs != 1:
+            return run_per_ticker_parallel(
+                df,
+                cfg.model,
+                params=cfg.params,
+                n_jobs=cfg.n_jobs,
+                chunk_size=cfg.chunk_size,
+            )
         out: dict[str, ForecastResult] = {}
         for tkr, g in df.groupby("ticker", sort=True):
-            m = create_model(cfg.model)
+            m = cfg.make_model()
             m.fit(g)
             out[tkr] = m.predict(g)
         return out
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+import optuna
+import pandas as pd
+from optuna.storages import JournalStorage
+from optuna.storages.journal import JournalFileBackend
+from optuna.trial import TrialState
+
+from xfin.forecaster.backtest import BacktestConfig, score, walk_forward
+from xfin.forecaster.models.base import Tunable
+from xfin.forecaster.parallel import process_pool, read_shared, resolve_n_jobs, shared_frame
+from xfin.forecaster.runner import RunConfig
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("mae", "rmse")
+_SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+# trials that count towards n_trials (failed ones are retried)
+_FINISHED = (TrialState.COMPLETE, TrialState.PRUNED)
+
+
+@dataclass(frozen=True)
+class TuneConfig:
+    """
+    Optuna study over a model's search space, scored by walk-forward backtest.
+
+    study:     study name; rerunning with the same name and storage resumes it
+    storage:   journal file, SQLite file (*.db, *.sqlite, *.sqlite3) or an
+               optuna storage URL (e.g. sqlite:///tune.db)
+    n_trials:  finished (complete or pruned) trials the study should reach
+               in total, so an interrupted study only runs what is missing
+    n_jobs:    trial worker processes (-1 = all cores)
+    metric:    minimised over the pooled out-of-sample predictions
+    prune:     stop a trial after a fold when its running metric is worse
+               than the median of earlier trials at that fold
+    seed:      sampler seed; worker i uses seed + i
+    timeout:   seconds each worker keeps starting trials (None: no limit)
+    """
+
+    study: str
+    storage: str
+    n_trials: int = 50
+    n_jobs: int = 1
+    metric: str = "mae"
+    prune: bool = True
+    seed: int | None = 0
+    timeout: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.n_trials < 1:
+            raise ValueError(f"n_trials must be >= 1, got {self.n_trials}")
+        if self.n_jobs == 0:
+            raise ValueError("n_jobs must be non-zero (1 = in-process, -1 = all cores)")
+        if self.metric not in METRICS:
+            raise ValueError(f"Unknown metric {self.metric!r}; expected one of {METRICS}")
+
+
+def open_storage(storage: str) -> str | JournalStorage:
+    """Storage URLs pass through; local paths become SQLite or journal-file storage."""
+    if "://" in storage:
+        return storage
+    path = Path(storage)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix in _SQLITE_SUFFIXES:
+        return f"sqlite:///{path}"
+    # append-only log with file locks: safe for several worker processes
+    return JournalStorage(JournalFileBackend(str(path)))
+
+
+def _splits(bt: BacktestConfig) -> dict:
+    """The backtest settings that decide a trial's score (not how folds are run)."""
+    return {k: v for k, v in asdict(bt).items() if k not in ("n_jobs", "refit")}
+
+
+def load_study(
+    cfg: TuneConfig, run: RunConfig, bt: BacktestConfig, *, worker: int = 0
+) -> optuna.Study:
+    """
+    Create the study or load it to resume; refuses a study created for
+    another model, metric, horizon or backtest split, whose scores would
+    not be comparable.
+    """
+    seed = None if cfg.seed is None else cfg.seed + worker
+    study = optuna.create_study(
+        study_name=cfg.study,
+        storage=open_storage(cfg.storage),
+        direction="minimize",
+        load_if_exists=True,
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        # judge a trial only after its second fold, against at least 5 finished trials
+        pruner=(
+            optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+            if cfg.prune
+            else optuna.pruners.NopPruner()
+        ),
+    )
+
+    expected = {
+        "model": run.model,
+        "metric": cfg.metric,
+        "horizon": run.horizon,
+        "backtest": _splits(bt),
+    }
+    stored = {k: study.user_attrs[k] for k in expected if k in study.user_attrs}
+    if stored and stored != expected:
+        raise ValueError(f"Study {cfg.study!r} was created for {stored}, not {expected}")
+    if not stored:
+        for k, v in expected.items():
+            study.set_user_attr(k, v)
+    return study
+
+
+def finished_trials(study: optuna.Study) -> int:
+    return len(study.get_trials(deepcopy=False, states=_FINISHED))
+
+
+class _FixedParams:
+    """
+    Trial proxy for search_space(): suggest_*() of a parameter the user
+    fixed returns the fixed value instead of sampling it, so fixed values
+    win and only the free parameters become the trial's searched params.
+    """
+
+    def __init__(self, trial: optuna.Trial, fixed: dict):
+        self._trial = trial
+        self._fixed = fixed
+
+    def __getattr__(self, attr: str):
+        method = getattr(self._trial, attr)
+        if not attr.startswith("suggest_"):
+            return method
+
+        def suggest(name: str, *args, **kwargs):
+            if name in self._fixed:
+                return self._fixed[name]
+            return method(name, *args, **kwargs)
+
+        return suggest
+
+
+def _objective(
+    trial: optuna.Trial, df: pd.DataFrame, run: RunConfig, bt: BacktestConfig, metric: str
+) -> float:
+    fixed = dict(run.params)
+    # fixed --param values last: constants of the search space must not override them
+    params = {**run.make_model().search_space(_FixedParams(trial, fixed)), **fixed}
+    # the full constructor arguments, fixed ones included, to rebuild the model
+    trial.set_user_attr("params", params)
+    trial_run = replace(run, params=params, n_jobs=1)
+
+    y_true, y_pred = [], []
+    value = math.nan
+    for r in walk_forward(df, trial_run, bt):
+        y_true.append(r.y_true)
+        y_pred.append(r.y_pred)
+        value = score(pd.concat(y_true), pd.concat(y_pred))[metric]
+        trial.report(value, r.fold.index)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    return value
+
+
+def _optimize(
+    df: pd.DataFrame, run: RunConfig, bt: BacktestConfig, cfg: TuneConfig, worker: int
+) -> None:
+    study = load_study(cfg, run, bt, worker=worker)
+    if finished_trials(study) >= cfg.n_trials:
+        return
+    study.optimize(
+        lambda trial: _objective(trial, df, run, bt, cfg.metric),
+        timeout=cfg.timeout,
+        callbacks=[optuna.study.MaxTrialsCallback(cfg.n_trials, states=_FINISHED)],
+    )
+
+
+def _optimize_shared(
+    path: str, run: RunConfig, bt: BacktestConfig, cfg: TuneConfig, worker: int
+) -> None:
+    """Worker: trials on the memory-mapped frame until the study is done."""
+    _optimize(read_shared(path).to_pandas(), run, bt, cfg, worker)
+
+
+def tune(
+    df: pd.DataFrame, run: RunConfig, bt: BacktestConfig, cfg: TuneConfig
+) -> optuna.Study:
+    """
+    Search `run.model`'s hyperparameters (its search_space()) on a frame
+    prepared by prepare_supervised(); each trial is a walk-forward backtest
+    whose running metric is reported after every fold for pruning. Models
+    whose update() is not exact (boosting) are refitted every fold, so the
+    tuned parameters are scored as a refitted model would use them.
+
+    Trials run in cfg.n_jobs worker processes that share the frame through
+    a memory-mapped Arrow file and coordinate through the study storage;
+    each worker stops once the study has cfg.n_trials finished trials (a
+    few more can finish while the last ones are still running). Returns
+    the study, with all trials of earlier runs included.
+    """
+    if not isinstance(run.make_model(), Tunable):
+        raise ValueError(f"Model {run.model!r} has no search space")
+
+    study = load_study(cfg, run, bt)
+    done = finished_trials(study)
+    if done >= cfg.n_trials:
+        logger.info("Study %s already has %d finished trials", cfg.study, done)
+        return study
+
+    # date order once, so every trial's backtest sorts an already sorted frame
+    df = df.sort_values(["dt", "ticker"], kind="stable")
+    workers = min(resolve_n_jobs(cfg.n_jobs), cfg.n_trials - done)
+    logger.info(
+        "Tuning %s in study %s: %d of %d trials finished, %d workers",
+        run.model,
+        cfg.study,
+        done,
+        cfg.n_trials,
+        workers,
+    )
+    if workers == 1:
+        _optimize(df, run, bt, cfg, worker=0)
+    else:
+        with shared_frame(df) as path, process_pool(workers) as pool:
+            futures = [
+                pool.submit(_optimize_shared, path, run, bt, cfg, i) for i in range(workers)
+            ]
+            for f in futures:
+                f.result()
+    return study
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from xfin.forecaster.dataset import prepare_supervised
+
+
+@pytest.fixture
+def make_panel():
+    """
+    Factory of supervised panels (prepare_supervised() frames): a seeded
+    random-walk close per ticker over business days from 2024-01-01.
+
+    starts: per-ticker index of the first day, for tickers listed later
+    """
+
+    def make(
+        tickers=("AAA", "BBB"),
+        periods: int = 30,
+        *,
+        seed: int = 0,
+        level: float = 100.0,
+        starts: dict[str, int] | None = None,
+        horizon: int = 1,
+    ) -> pd.DataFrame:
+        days = pd.bdate_range("2024-01-01", periods=periods)
+        rng = np.random.default_rng(seed)
+        frames = []
+        for t in tickers:
+            d = days[(starts or {}).get(t, 0) :]
+            close = level + rng.normal(size=len(d)).cumsum()
+            frames.append(pd.DataFrame({"ticker": t, "dt": d, "close": close}))
+        return prepare_supervised(pd.concat(frames, ignore_index=True), horizon=horizon)
+
+    return make
@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from xfin.forecaster.backtest import BacktestConfig, backtest, make_folds
+from xfin.forecaster.runner import RunConfig
+
+
+@pytest.fixture
+def panel(make_panel) -> pd.DataFrame:
+    """Two tickers over 40 business days; BBB starts 10 days later."""
+    return make_panel(periods=40, starts={"BBB": 10})
+
+
+def test_make_folds_walk_forward():
+    """
+    Contract:
+    - test windows are consecutive and end at the last date
+    - expanding folds start at 0, rolling folds keep train_size dates
+    - the default gap is horizon - 1 dates between train and test
+    """
+    folds = make_folds(30, BacktestConfig(n_folds=2, min_train_size=10))
+    assert [(f.train_start, f.train_end, f.test_start, f.test_end) for f in folds] == [
+        (0, 10, 10, 20),
+        (0, 20, 20, 30),
+    ]
+
+    rolling = make_folds(
+        30,
+        BacktestConfig(n_folds=2, test_size=5, min_train_size=5, window="rolling", train_size=8),
+        horizon=3,
+    )
+    assert [(f.train_start, f.train_end, f.test_start) for f in rolling] == [
+        (10, 18, 20),
+        (15, 23, 25),
+    ]
+
+    with pytest.raises(ValueError):
+        make_folds(10, BacktestConfig(n_folds=5, min_train_size=10))
+
+
+def test_backtest_predicts_out_of_sample_and_parallel_matches(panel):
+    """
+    Contract:
+    - every test row is predicted by a model fit on earlier dates only
+    - metrics have one row per fold plus a pooled "all" row
+    - per_ticker tickers without training history are reported via coverage
+    - folds run in worker processes give identical predictions
+    """
+    df = panel
+    run = RunConfig(model="naive_last_close", mode="global")
+    cfg = BacktestConfig(n_folds=3, min_train_size=5)
+
+    result = backtest(df, run, cfg)
+
+    for r in result.folds:
+        assert r.train_dates[1] < r.test_dates[0]
+        pd.testing.assert_series_equal(
+            r.y_pred, df.loc[r.y_true.index, "close"].astype(float), check_names=False
+        )
+    metrics = result.metrics()
+    assert list(metrics["fold"]) == [0, 1, 2, "all"]
+    assert metrics["n_test"].iloc[-1] == sum(len(r.y_true) for r in result.folds)
+
+    preds = result.predictions(df)
+    assert set(preds.columns) == {"ticker", "dt", "fold", "y_true", "y_pred"}
+
+    per_ticker = backtest(
+        df,
+        RunConfig(model="naive_last_close", mode="per_ticker"),
+        BacktestConfig(n_folds=3, test_size=10, min_train_size=5),
+    )
+    first = per_ticker.folds[0]
+    assert first.metrics["coverage"] < 1.0  # BBB has no rows before the first test date
+    assert first.y_pred[df.loc[first.y_true.index, "ticker"] == "BBB"].isna().all()
+
+    parallel = backtest(df, run, BacktestConfig(n_folds=3, min_train_size=5, n_jobs=2))
+    for a, b in zip(result.folds, parallel.folds):
+        pd.testing.assert_series_equal(a.y_pred, b.y_pred)
+        pd.testing.assert_series_equal(a.y_true, b.y_true)
+
+
+def test_expanding_backtest_updates_online_models(panel):
+    """
+    Contract:
+    - an in-process expanding backtest of a model with update() (fit once,
+      then fed each fold's new dates) matches refitting every fold in workers
+    """
+    df = panel
+    run = RunConfig(model="ewm_drift", mode="per_ticker")
+
+    online = backtest(df, run, BacktestConfig(n_folds=3, min_train_size=5))
+    refit = backtest(df, run, BacktestConfig(n_folds=3, min_train_size=5, n_jobs=2))
+
+    for a, b in zip(online.folds, refit.folds):
+        assert a.n_train == b.n_train
+        pd.testing.assert_series_equal(a.y_pred, b.y_pred, check_exact=False)
+
+
+def test_backtest_refits_models_with_approximate_update(panel):
+    """
+    Contract:
+    - boosting update() only warm-starts, so an in-process backtest refits
+      every fold: the same predictions as refit=True (and as fold workers)
+    """
+    pytest.importorskip("lightgbm")
+    df = panel
+    params = {"n_estimators": 20, "min_data_in_leaf": 2, "n_jobs": 1}
+    run = RunConfig(model="lightgbm", params=params)
+
+    default = backtest(df, run, BacktestConfig(n_folds=3, min_train_size=5))
+    refit = backtest(df, run, BacktestConfig(n_folds=3, min_train_size=5, refit=True))
+
+    for a, b in zip(default.folds, refit.folds):
+        pd.testing.assert_series_equal(a.y_pred, b.y_pred)
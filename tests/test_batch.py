@@ -0,0 +1,64 @@
+from datetime import date
+
+import numpy as np
+
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.domain.models import BAR_SCHEMA, OHLCVBar
+
+
+def _bars() -> list[OHLCVBar]:
+    return [
+        OHLCVBar("BBB", date(2024, 1, 2), 20, 21, 19, 20.5, 200, 3),
+        OHLCVBar("AAA", date(2024, 1, 3), 10, 12, 9, 11, 150),
+        OHLCVBar("AAA", date(2024, 1, 2), 10, 11, 9, 10, 100),
+    ]
+
+
+def test_bar_batch_round_trips_bars():
+    """
+    BarBatch stores bars as column arrays; OHLCVBar remains a row view.
+
+    Contract:
+    - ticker codes are int32 into a ticker dictionary, dates int32 days
+    - row(i) / iteration give back equivalent OHLCVBar objects
+    - missing openint is stored as NaN
+    """
+    batch = BarBatch.from_bars(_bars())
+
+    assert len(batch) == 3
+    assert batch.ticker_codes.dtype == np.int32
+    assert batch.dates.dtype == np.int32
+    assert batch.tickers == ("BBB", "AAA")
+
+    rows = list(batch)
+    assert [(r.ticker, r.dt, r.close) for r in rows] == [
+        (b.ticker, b.dt, b.close) for b in _bars()
+    ]
+    assert rows[0].openint == 3
+    assert np.isnan(rows[1].openint)
+
+
+def test_bar_batch_concat_sort_and_arrow_export():
+    """
+    Contract:
+    - concat() merges ticker dictionaries across batches
+    - sort_by_ticker_date() orders by ticker symbol, then date
+    - to_arrow() produces BAR_SCHEMA and from_arrow() reads it back
+    """
+    first = BarBatch.from_bars(_bars()[:1])
+    second = BarBatch.from_bars(_bars()[1:])
+
+    merged = BarBatch.concat([first, second]).sort_by_ticker_date()
+    assert [(r.ticker, r.dt) for r in merged] == [
+        ("AAA", date(2024, 1, 2)),
+        ("AAA", date(2024, 1, 3)),
+        ("BBB", date(2024, 1, 2)),
+    ]
+
+    record_batch = merged.to_arrow()
+    assert record_batch.schema == BAR_SCHEMA
+
+    back = BarBatch.from_arrow(record_batch)
+    assert back.unique_tickers() == ["AAA", "BBB"]
+    np.testing.assert_array_equal(back.close, merged.close)
+    np.testing.assert_array_equal(back.dates, merged.dates)
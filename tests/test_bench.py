@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from xfin.data_engine.bench.cli import main
+from xfin.data_engine.bench.runner import run_benchmark
+from xfin.data_engine.bench.synthetic import SyntheticMstSpec, write_synthetic_mst
+from xfin.data_engine.io.parsers import MstBarParser
+
+
+def test_synthetic_universe_shape(tmp_path: Path):
+    """
+    Contract:
+    - one file per ticker, ~252 business days per year
+    - malformed lines are skipped by the parser, the rest parse
+    - openint presence follows the spec
+    """
+    spec = SyntheticMstSpec(tickers=3, years=1, malformed_rate=0.1, openint=True, seed=1)
+    paths = write_synthetic_mst(tmp_path, spec)
+    assert len(paths) == 3
+
+    batch = MstBarParser().parse_columnar(paths[0].read_bytes())
+    assert 180 < len(batch) < 252
+    assert not (batch.openint != batch.openint).any()
+
+    clean = write_synthetic_mst(tmp_path / "clean", SyntheticMstSpec(tickers=1, years=1))
+    batch = MstBarParser().parse_columnar(clean[0].read_bytes())
+    assert len(batch) == 252
+    assert (batch.openint != batch.openint).all()
+
+
+def test_run_benchmark_times_every_stage(tmp_path: Path):
+    paths = write_synthetic_mst(tmp_path / "raw", SyntheticMstSpec(tickers=2, years=1))
+
+    for mode in ("columnar", "rows"):
+        report = run_benchmark(paths, tmp_path / "bars", mode=mode)
+        assert [s.name for s in report.stages] == ["parse", "fan_out", "dataframe", "write"]
+        assert {s.rows for s in report.stages} == {504}
+        assert all(s.seconds > 0 for s in report.stages)
+        assert "rows/s" in report.format_table()
+        # one run-wide high-water mark, not a per-stage column
+        assert report.peak_rss_mb > 0 and report.workers_peak_rss_mb is None
+        assert "peak RSS MiB: process" in report.format_table()
+
+
+def test_bench_cli_keeps_workdir_contents(tmp_path: Path):
+    """
+    Contract:
+    - --workdir gets a fresh xfin-bench-* subdirectory; data already in the
+      directory (e.g. a real dataset under bars/) is left alone
+    """
+    keep = tmp_path / "bars" / "ticker=AAA" / "part-0.parquet"
+    keep.parent.mkdir(parents=True)
+    keep.write_bytes(b"data")
+
+    argv = ["--tickers", "1", "--years", "1", "--workdir", str(tmp_path)]
+    assert main(argv) == 0
+
+    assert keep.read_bytes() == b"data"
+    (run,) = tmp_path.glob("xfin-bench-*")
+    assert (run / "bars").is_dir() and (run / "raw").is_dir()
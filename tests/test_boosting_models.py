@@ -0,0 +1,80 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from xfin.forecaster.models.base import supports_update, updates_exactly
+from xfin.forecaster.registry import create_model, list_models
+
+
+@pytest.fixture
+def panel(make_panel) -> pd.DataFrame:
+    """Three tickers whose next close moves with `signal`, scaled per ticker."""
+    df = make_panel(("AAA", "BBB", "CCC"), periods=201)
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=len(df))
+    close = df["close"] * df["ticker"].map({"AAA": 0.1, "BBB": 10.0, "CCC": 0.5})
+    beta = df["ticker"].map({"AAA": 0.02, "BBB": -0.02, "CCC": 0.0})
+    return df.assign(
+        close=close,
+        y=close * (1 + beta * signal),
+        signal=signal,
+        vol_chg_1d=np.where(signal > 2, np.inf, signal),
+    )
+
+
+@pytest.mark.parametrize("name", ["lightgbm", "xgboost"])
+def test_global_boosting_models(name, panel):
+    """
+    Contract:
+    - registered; constructor params come through create_model(**params)
+    - one global model learns the per-ticker (categorical) effect of the
+      features and beats persistence out of sample
+    - infinite features and unseen tickers are treated as missing values
+    - update() warm-starts with more trees; the model pickles
+    """
+    pytest.importorskip(name)
+    assert name in list_models()
+    df = panel
+    train, test = df[df["dt"] < "2024-08-01"], df[df["dt"] >= "2024-08-01"]
+
+    model = create_model(name, n_estimators=100, learning_rate=0.1, n_jobs=2).fit(train)
+    assert model.feature_names_ == ["close", "signal", "vol_chg_1d"]
+    assert model._matrix(test).dtype == np.float32
+
+    y_pred = model.predict(test).y_pred
+    assert y_pred.index.equals(test.index)
+    mae = (test["y"] - y_pred).abs().mean()
+    assert mae < 0.5 * (test["y"] - test["close"]).abs().mean()
+
+    unseen = test.assign(ticker="ZZZ")
+    assert model.predict(unseen).y_pred.notna().all()
+
+    assert supports_update(model) and not updates_exactly(model)
+    before = model.predict(test).y_pred
+    model.update(test)
+    assert not np.allclose(model.predict(test).y_pred, before)
+
+    restored = pickle.loads(pickle.dumps(model))
+    pd.testing.assert_series_equal(restored.predict(test).y_pred, model.predict(test).y_pred)
+
+    with pytest.raises(ValueError, match="n_estimators"):
+        create_model(name, n_estimators=0)
+
+
+def test_boosting_base_requires_train_and_predict():
+    """
+    Contract:
+    - a boosting model missing _train/_predict fails at construction
+    """
+    from xfin.forecaster.models.boosting import _GlobalBoosting
+
+    class Incomplete(_GlobalBoosting):
+        name = "incomplete"
+
+        def _train(self, X, y, rounds, init=None):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
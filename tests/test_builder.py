@@ -30,8 +30,8 @@ def test_builder_adds_features():
     builder = BarDatasetBuilder(add_basic_features=True)
     df = builder.to_dataframe(bars)
 
-    # assert "ret_1d" in df.columns
-    # assert "log_ret_1d" in df.columns
+    assert "ret_1d" in df.columns
+    assert "log_ret_1d" in df.columns
     assert "vol_chg_1d" in df.columns
-    # assert pd.isna(df.loc[0, "ret_1d"])
-    # assert df.loc[1, "ret_1d"] > 0
+    assert pd.isna(df.loc[0, "ret_1d"])
+    assert df.loc[1, "ret_1d"] > 0
@@ -0,0 +1,72 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from xfin.cache import FrameCache, cache_key, stat_fingerprint
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.features.builder import BarDatasetBuilder
+
+
+def test_frame_cache_roundtrip_and_lru_eviction(tmp_path: Path):
+    """
+    Contract:
+    - a stored frame comes back equal (dtypes and index included)
+    - past max_bytes the least recently *read* blobs are evicted first
+    """
+    df = pd.DataFrame(
+        {
+            "ticker": pd.Categorical(["AAA", "BBB"]),
+            "dt": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+            "close": [1.0, 2.0],
+        },
+        index=[3, 7],
+    )
+    cache = FrameCache(tmp_path)
+    cache.put("a", df)
+    pd.testing.assert_frame_equal(cache.get("a"), df)
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    size = (tmp_path / "a.arrow").stat().st_size
+    cache = FrameCache(tmp_path, max_bytes=2 * size)
+    cache.put("b", df)
+    os.utime(tmp_path / "a.arrow", ns=(1, 1))
+    os.utime(tmp_path / "b.arrow", ns=(2, 2))
+    cache.get("a")  # a becomes most recently used
+    cache.put("c", df)
+
+    assert sorted(p.stem for p in tmp_path.glob("*.arrow")) == ["a", "c"]
+
+
+def test_cache_key_and_fingerprint(tmp_path: Path):
+    (tmp_path / "x.parquet").write_bytes(b"1")
+    (tmp_path / "_cache").mkdir()
+    (tmp_path / "_cache" / "y").write_bytes(b"2")
+
+    fp = stat_fingerprint([tmp_path])
+    assert [Path(p).name for p, _, _ in fp] == ["x.parquet"]
+
+    assert cache_key("a", fp, BarDatasetBuilder()) == cache_key("a", fp, BarDatasetBuilder())
+    assert cache_key("a", fp, BarDatasetBuilder()) != cache_key(
+        "a", fp, BarDatasetBuilder(lazy=True)
+    )
+
+
+def test_pipeline_run_reuses_cached_frame(tmp_path: Path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "AAA.mst").write_text("AAA,20240102,10,11,9,10.5,100\nAAA,20240103,10.5,12,10,11,150\n")
+
+    pipeline = BuildDatasetPipeline(cache=FrameCache(tmp_path / "cache"))
+    first = asyncio.run(pipeline.run(folder=raw))
+    assert len(pipeline.metrics.files) == 1
+
+    second = asyncio.run(pipeline.run(folder=raw))
+    assert pipeline.metrics.files == []  # nothing parsed
+    pd.testing.assert_frame_equal(second, first)
+
+    (raw / "AAA.mst").write_text("AAA,20240102,10,11,9,10.5,100\n")
+    third = asyncio.run(pipeline.run(folder=raw))
+    assert len(third) == 1
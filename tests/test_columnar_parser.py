@@ -0,0 +1,74 @@
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+
+from xfin.config import AppConfig, DataEngineConfig
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.domain.models import BAR_SCHEMA
+from xfin.data_engine.io.parsers import MstBarParser
+
+MESSY = (
+    "\ufeff<TICKER>,<DTYYYYMMDD>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>\r\n"
+    "AAA,20240101,1,2,0.5,1.5,10\r\n"
+    "\r\n"
+    " AAA , 20240102 ,1.5,2.5,1,2,20,7\n"
+    "AAA,20240103,1,2\n"
+    "AAA,2024xx04,1,2,0.5,1.5,10\n"
+    "AAA,20240105,1,2,0.5,abc,10\n"
+    "BBB,20240101,1e1,2,.5,1.,10,\n"
+)
+
+
+def test_columnar_parser_matches_row_parser():
+    """
+    parse_columnar() must keep exactly the rows parse_lines() keeps.
+
+    Contract:
+    - header (with BOM), empty lines, bad column counts and unparsable
+      values are skipped
+    - values, tickers and dates match the per-row OHLCVBar path
+    - missing/empty openint becomes NaN
+    """
+    parser = MstBarParser(has_header=True)
+
+    batch = parser.parse_columnar(MESSY)
+    bars = list(parser.parse_lines(MESSY.splitlines()))
+
+    assert batch.to_arrow().schema == BAR_SCHEMA
+    assert len(batch) == len(bars) == 3
+
+    df = batch.to_dataframe()
+    assert df["ticker"].tolist() == [b.ticker for b in bars]
+    assert df["dt"].dt.date.tolist() == [b.dt for b in bars]
+    assert df["close"].tolist() == [b.close for b in bars]
+    assert df["openint"].isna().tolist() == [True, False, True]
+
+
+def test_columnar_parser_logs_skip_counters(caplog):
+    """
+    The columnar mode reports the same skip counters as parse_lines().
+    """
+    with caplog.at_level("DEBUG"):
+        MstBarParser(has_header=True).parse_columnar(MESSY, filename="messy.mst")
+
+    assert any(
+        "Skipped rows: empty=1 badcols=1 other=2" in rec.message for rec in caplog.records
+    )
+
+
+def test_pipeline_columnar_mode_matches_row_mode(tmp_path: Path):
+    """
+    BuildDatasetPipeline with columnar=True builds the same DataFrame.
+    """
+    (tmp_path / "a.mst").write_text(MESSY)
+    (tmp_path / "b.mst").write_text("CCC,20240102,10,11,9,10.5,100,1\n")
+
+    rows = asyncio.run(BuildDatasetPipeline().run(folder=tmp_path))
+    cols = asyncio.run(
+        BuildDatasetPipeline(
+            cfg=AppConfig(data_engine=DataEngineConfig(columnar=True))
+        ).run(folder=tmp_path)
+    )
+
+    pd.testing.assert_frame_equal(rows, cols)
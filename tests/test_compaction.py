@@ -0,0 +1,89 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from xfin.data_engine.cli import compact_main
+from xfin.data_engine.core.compaction import DatasetCompactor
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.io.index import DatasetIndex
+
+
+def _bars(ticker: str, start: str, periods: int, close: float = 10.0) -> str:
+    days = pd.bdate_range(start, periods=periods)
+    return "".join(
+        f"{ticker},{d:%Y%m%d},10,12,9,{close + i % 3},100\n" for i, d in enumerate(days)
+    )
+
+
+def _read(out: Path) -> pd.DataFrame:
+    df = pd.read_parquet(out)
+    df["ticker"] = df["ticker"].astype(str)
+    return df.sort_values(["ticker", "dt"]).reset_index(drop=True)
+
+
+def test_compact_merges_fragments_and_dedupes(tmp_path: Path):
+    """
+    Contract:
+    - appended fragments of a partition are merged into one dt-sorted file
+    - duplicate (ticker, dt) bars keep the most recently written row
+    - untouched partitions and the rows read back are otherwise unchanged
+    - the index sidecar reflects the compacted files
+    """
+    raw, out = tmp_path / "raw", tmp_path / "bars"
+    raw.mkdir()
+    (raw / "AAA.mst").write_text(_bars("AAA", "2024-01-01", 10))
+    (raw / "BBB.mst").write_text(_bars("BBB", "2024-01-01", 10))
+    asyncio.run(BuildDatasetPipeline().write(out, folder=raw, incremental=True))
+    with open(raw / "AAA.mst", "a") as f:
+        f.write(_bars("AAA", "2024-01-15", 5))
+    asyncio.run(BuildDatasetPipeline().write(out, folder=raw, incremental=True))
+
+    # a re-delivered bar written after the original one
+    (aaa_first,) = [f for f in (out / "ticker=AAA").glob("*.parquet") if "part-0" in f.name]
+    redelivered = pq.read_table(aaa_first, partitioning=None).slice(0, 1)
+    redelivered = redelivered.set_column(
+        redelivered.schema.get_field_index("close"), "close", [[99.0]]
+    )
+    late = out / "ticker=AAA" / "late.parquet"
+    pq.write_table(redelivered, late)
+    os.utime(late, ns=(2**62, 2**62))
+
+    before = _read(out)
+    bbb_files = sorted(p.name for p in (out / "ticker=BBB").glob("*.parquet"))
+    assert len(list((out / "ticker=AAA").glob("*.parquet"))) == 3
+
+    report = DatasetCompactor(out).run()
+
+    assert (report.files_before, report.files_after) == (4, 2)
+    assert report.compacted == 1
+    assert report.duplicates == 1
+    assert sorted(p.name for p in (out / "ticker=BBB").glob("*.parquet")) == bbb_files
+    assert not [p for p in out.iterdir() if p.name.startswith(".compact")]
+
+    (merged,) = (out / "ticker=AAA").glob("*.parquet")
+    dts = pq.read_table(merged, partitioning=None).column("dt").to_pylist()
+    assert dts == sorted(dts) and len(dts) == 15
+
+    after = _read(out)
+    first = (after["ticker"] == "AAA") & (after["dt"] == pd.Timestamp("2024-01-01"))
+    assert after.loc[first, "close"].tolist() == [99.0]
+    expected = before.drop_duplicates(["ticker", "dt"], keep="first").reset_index(drop=True)
+    expected.loc[first.to_numpy(), "close"] = 99.0
+    pd.testing.assert_frame_equal(after, expected, check_dtype=False)
+
+    assert DatasetIndex.load(out).partitions["AAA"].rows == 15
+
+
+@pytest.mark.parametrize("flag", ["--in-place", "--no-sort"])
+def test_compact_cli_rejects_unsafe_or_inert_flags(tmp_path: Path, flag: str):
+    """
+    Contract:
+    - compact always publishes a staged version (no --in-place partition
+      swaps under live readers) and always sorts (no --no-sort)
+    """
+    with pytest.raises(SystemExit):
+        compact_main(["--out", str(tmp_path), flag])
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
+import pytest
 
-from xfin.forecaster.runner import RunConfig, run_forecast
+from xfin.forecaster import registry
+from xfin.forecaster.models.base import ForecastResult, supports_update
+from xfin.forecaster.runner import ModelState, RunConfig, run_forecast
 
 
 def _toy_df() -> pd.DataFrame:
@@ -73,3 +77,149 @@ def test_run_forecast_can_limit_to_specific_tickers():
     assert isinstance(result, dict)
     assert set(result.keys()) == {"AAA"}
     assert len(result["AAA"].y_pred) == 2
+
+
+def test_parallel_per_ticker_matches_sequential():
+    """
+    Parallel per-ticker mode fans tickers out to worker processes.
+
+    Contract:
+    - n_jobs != 1 returns the same dict (keys, order, y_pred values and index)
+      as the sequential loop, also with tickers interleaved in the input
+    - chunk_size only changes how tickers are batched, not the result
+    """
+    df = _toy_df().sample(frac=1.0, random_state=0)
+    seq = run_forecast(df, RunConfig(model="naive_last_close", mode="per_ticker"))
+
+    for chunk_size in (None, 1):
+        cfg = RunConfig(
+            model="naive_last_close", mode="per_ticker", n_jobs=2, chunk_size=chunk_size
+        )
+        par = run_forecast(df, cfg)
+
+        assert list(par) == list(seq)
+        for tkr in seq:
+            pd.testing.assert_series_equal(par[tkr].y_pred, seq[tkr].y_pred)
+
+
+def test_cli_rejects_zero_workers(tmp_path):
+    """
+    Contract:
+    - --n-jobs 0 and --chunk-size 0 are configuration errors (exit code 2),
+      not tracebacks from the worker pool
+    """
+    from xfin.data_engine.io.writer import write_partitioned_frame
+    from xfin.forecaster.cli import main
+
+    with pytest.raises(ValueError, match="n_jobs"):
+        RunConfig(model="naive_last_close", n_jobs=0)
+    with pytest.raises(ValueError, match="chunk_size"):
+        RunConfig(model="naive_last_close", chunk_size=0)
+
+    write_partitioned_frame(_toy_df(), tmp_path / "bars")
+    argv = ["--data", str(tmp_path / "bars"), "--model", "ewm_drift", "--log-level", "WARNING"]
+    assert main([*argv, "--n-jobs", "0"]) == 2
+    assert main([*argv, "--chunk-size", "0"]) == 2
+
+
+@pytest.fixture
+def panel(make_panel) -> pd.DataFrame:
+    return make_panel(seed=1, level=50.0)
+
+
+def test_model_state_update_matches_refit(tmp_path, panel):
+    """
+    Models with update() move forward on new rows only.
+
+    Contract:
+    - fit(history).update(new) predicts like fit(history + new)
+    - rows not newer than the fitted dates are ignored by update()
+    - the state survives save()/load()
+    """
+    df = panel
+    cut = df["dt"].sort_values().unique()[20]
+    old, new = df[df["dt"] < cut], df[df["dt"] >= cut]
+    cfg = RunConfig(model="ewm_drift", mode="per_ticker")
+    assert supports_update(registry.create_model("ewm_drift"))
+
+    state = ModelState.fit(old, cfg)
+    state.save(tmp_path / "state.pkl")
+    state = ModelState.load(tmp_path / "state.pkl")
+    assert state.online
+    state.update(new).update(old)  # the second update is all stale rows
+
+    full = ModelState.fit(df, cfg)
+    assert state.last_dt == full.last_dt
+    np.testing.assert_allclose(state.predict(df), full.predict(df))
+
+
+def test_model_state_lagging_ticker_catches_up(panel):
+    """
+    Contract:
+    - in per_ticker mode each ticker moves forward from its own newest
+      date: rows of a ticker that lagged behind are not dropped as stale
+    """
+    df = panel
+    cut = df["dt"].sort_values().unique()[20]
+    lag = df["dt"].sort_values().unique()[15]
+    old = df[(df["dt"] < cut) & ((df["ticker"] == "AAA") | (df["dt"] < lag))]
+    cfg = RunConfig(model="ewm_drift", mode="per_ticker")
+
+    state = ModelState.fit(old, cfg)
+    assert len(state.unseen(df)) == len(df) - len(old)
+    state.update(state.unseen(df))
+
+    full = ModelState.fit(df, cfg)
+    assert state.ticker_last_dt == full.ticker_last_dt
+    np.testing.assert_allclose(state.predict(df), full.predict(df))
+
+
+def test_model_state_refits_models_without_update(monkeypatch, panel):
+    """
+    Contract:
+    - models without update() are refitted on the kept history plus the new rows
+    """
+
+    class MeanModel:
+        name = "mean"
+        scope = "global"
+
+        def fit(self, df):
+            self.mean_ = df["y"].mean()
+            return self
+
+        def predict(self, df):
+            return ForecastResult(pd.Series(self.mean_, index=df.index), {})
+
+    monkeypatch.setitem(registry._REGISTRY, "mean", MeanModel)
+    df = panel
+    cut = df["dt"].sort_values().unique()[10]
+    cfg = RunConfig(model="mean")
+
+    state = ModelState.fit(df[df["dt"] < cut], cfg).update(df[df["dt"] >= cut])
+
+    assert not state.online
+    assert state.predict(df.head(1)).iloc[0] == df["y"].mean()
+
+
+def test_cli_state_forecasts_newest_bars(tmp_path, capsys):
+    """
+    Contract:
+    - xfin-forecast --state forecasts the newest bar of every ticker (the
+      rows without a target), also on a rerun with no new data
+    - a state fitted with other model params is refused
+    """
+    from xfin.data_engine.io.writer import write_partitioned_frame
+    from xfin.forecaster.cli import main
+
+    write_partitioned_frame(_toy_df(), tmp_path / "bars")
+    argv = ["--data", str(tmp_path / "bars"), "--model", "ewm_drift"]
+    argv += ["--state", str(tmp_path / "state.pkl"), "--log-level", "WARNING"]
+
+    for _ in range(2):
+        assert main(argv) == 0
+        out = capsys.readouterr().out
+        assert "AAA 2024-01-03" in out and "BBB 2024-01-03" in out
+        assert "NaN" not in out
+
+    assert main([*argv, "--param", "alpha=0.5"]) == 2
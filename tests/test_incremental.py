@@ -0,0 +1,223 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.features.builder import BarDatasetBuilder
+from xfin.data_engine.features.engine import FeatureSpec
+from xfin.data_engine.io.manifest import MANIFEST_NAME
+
+
+def _setup(tmp_path: Path) -> tuple[Path, Path]:
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "AAA.mst").write_text("AAA,20240102,10,11,9,10.5,100\n")
+    (raw / "BBB.mst").write_text("BBB,20240102,20,21,19,20.5,200\n")
+    return raw, tmp_path / "bars"
+
+
+def _build(raw: Path, out: Path):
+    return asyncio.run(BuildDatasetPipeline().write(out, folder=raw, incremental=True))
+
+
+def test_incremental_skips_unchanged_files(tmp_path: Path):
+    """
+    Contract:
+    - the first build writes a manifest with size/mtime/hash/last date/rows
+    - a rebuild with no raw changes parses nothing
+    - touching a file without changing its content does not trigger a re-parse
+    """
+    raw, out = _setup(tmp_path)
+
+    first = _build(raw, out)
+    assert first.files == 2
+
+    manifest = json.loads((out / MANIFEST_NAME).read_text())
+    entry = manifest["files"][str((raw / "AAA.mst").resolve())]
+    assert entry["rows"] == 1
+    assert entry["last_dt"] == "2024-01-02"
+    assert entry["tickers"] == ["AAA"]
+
+    os.utime(raw / "AAA.mst", ns=(1, 1))
+    second = _build(raw, out)
+
+    assert second.files == 0
+    assert second.skipped_files == 2
+    assert len(pd.read_parquet(out)) == 2
+
+
+def test_incremental_rewrites_only_changed_ticker(tmp_path: Path):
+    """
+    Contract:
+    - a changed file rewrites only its own ticker partition
+    - partitions of unchanged files are left untouched on disk
+    - partitions whose raw file was removed are dropped
+    """
+    raw, out = _setup(tmp_path)
+    _build(raw, out)
+
+    bbb_files = sorted((out / "ticker=BBB").iterdir())
+    bbb_stat = [p.stat().st_mtime_ns for p in bbb_files]
+
+    # corrected re-delivery: existing bar rewritten, one bar added
+    (raw / "AAA.mst").write_text(
+        "AAA,20240102,10,11,9,10.4,100\nAAA,20240103,10.5,12,10,11,150\n"
+    )
+
+    summary = _build(raw, out)
+
+    assert summary.files == 1
+    assert summary.tickers == {"AAA"}
+    assert [p.stat().st_mtime_ns for p in sorted((out / "ticker=BBB").iterdir())] == bbb_stat
+
+    df = pd.read_parquet(out)
+    assert (df["ticker"] == "AAA").sum() == 2
+
+    (raw / "BBB.mst").unlink()
+    _build(raw, out)
+
+    assert not (out / "ticker=BBB").exists()
+    assert set(pd.read_parquet(out)["ticker"].astype(str)) == {"AAA"}
+
+
+def test_incremental_appends_tail_of_grown_file(tmp_path: Path):
+    """
+    Contract:
+    - a file that only had lines appended is parsed from its stored offset
+    - only the new bars are written, as a new fragment of the ticker partition
+    - the manifest offset moves to the new end of file
+    """
+    raw, out = _setup(tmp_path)
+    _build(raw, out)
+    before = {p.name for p in (out / "ticker=AAA").iterdir()}
+
+    with open(raw / "AAA.mst", "a") as f:
+        f.write("AAA,20240103,10.5,12,10,11,150\n")
+
+    summary = _build(raw, out)
+
+    assert summary.files == 0
+    assert summary.appended_files == 1
+    assert summary.rows == 1
+    assert len({p.name for p in (out / "ticker=AAA").iterdir()} - before) == 1
+
+    df = pd.read_parquet(out)
+    aaa = df[df["ticker"] == "AAA"].sort_values("dt")
+    assert aaa["close"].tolist() == [10.5, 11.0]
+
+    manifest = json.loads((out / MANIFEST_NAME).read_text())
+    entry = manifest["files"][str((raw / "AAA.mst").resolve())]
+    assert entry["offset"] == (raw / "AAA.mst").stat().st_size
+    assert entry["rows"] == 2
+    assert entry["last_dt"] == "2024-01-03"
+
+
+def _bars(ticker: str, start: int, n: int) -> str:
+    days = pd.bdate_range("2024-01-01", periods=start + n)[start:]
+    return "".join(
+        f"{ticker},{d:%Y%m%d},{10 + i % 7},{12 + i % 5},{9},{10 + (i * 3) % 11},{100 + i * 13 % 50}\n"
+        for i, d in zip(range(start, start + n), days)
+    )
+
+
+def test_appended_bars_continue_features_from_state(tmp_path: Path):
+    """
+    Contract:
+    - features of appended bars equal those of a full rebuild (windows
+      continue from the persisted per-ticker tails)
+    - a changed feature spec invalidates the state and rewrites everything
+    """
+    raw, out = _setup(tmp_path)
+    (raw / "AAA.mst").write_text(_bars("AAA", 0, 40))
+    _build(raw, out)
+
+    with open(raw / "AAA.mst", "a") as f:
+        f.write(_bars("AAA", 40, 5))
+    summary = _build(raw, out)
+    assert summary.appended_files == 1 and summary.files == 0
+
+    def frame(root: Path) -> pd.DataFrame:
+        df = pd.read_parquet(root)
+        df["ticker"] = df["ticker"].astype(str)
+        return df.sort_values(["ticker", "dt"]).reset_index(drop=True)
+
+    full = tmp_path / "full"
+    asyncio.run(BuildDatasetPipeline().write(full, folder=raw))
+    appended = frame(out)
+    assert len(appended) == 46
+    aaa = appended[appended["ticker"] == "AAA"]
+    assert aaa["volatility_20"].iloc[-5:].notna().all()
+    pd.testing.assert_frame_equal(appended, frame(full))
+
+    pipeline = BuildDatasetPipeline(
+        builder=BarDatasetBuilder(features=(FeatureSpec("ret_1d", "ret"),))
+    )
+    rebuilt = asyncio.run(pipeline.write(out, folder=raw, incremental=True))
+    assert rebuilt.files == 2
+    assert "volatility_20" not in pd.read_parquet(out).columns
+
+
+def test_full_build_skips_hashing(tmp_path: Path, monkeypatch):
+    """
+    Contract:
+    - a non-incremental build never hashes the raw files (sha256 "")
+    - a following incremental build still skips unchanged files and
+      re-ingests a grown one
+    """
+    from xfin.data_engine.core import incremental
+
+    raw, out = _setup(tmp_path)
+    hashed = []
+    real = incremental.file_sha256
+    monkeypatch.setattr(incremental, "file_sha256", lambda p: hashed.append(p) or real(p))
+
+    asyncio.run(BuildDatasetPipeline().write(out, folder=raw))
+    assert hashed == []
+    manifest = json.loads((out / MANIFEST_NAME).read_text())
+    assert {e["sha256"] for e in manifest["files"].values()} == {""}
+
+    with open(raw / "AAA.mst", "a") as f:
+        f.write("AAA,20240103,10,11,9,11.5,100\n")
+    second = _build(raw, out)
+
+    assert second.files == 1
+    assert second.skipped_files == 1
+    assert sorted(pd.read_parquet(out)["close"]) == [10.5, 11.5, 20.5]
+
+
+def test_bytes_appended_during_a_build_are_ingested_once(tmp_path: Path, monkeypatch):
+    """
+    Contract:
+    - a build parses each file only up to the size it planned (and records)
+    - lines appended after planning are left to the next build, which
+      ingests them exactly once
+    """
+    from xfin.data_engine.core import pipeline as pipeline_mod
+
+    raw, out = _setup(tmp_path)
+    _build(raw, out)
+    real = pipeline_mod.plan_ingest
+
+    async def plan_then_grow(*args, **kwargs):
+        plan = await real(*args, **kwargs)
+        with open(raw / "AAA.mst", "a") as f:
+            f.write("AAA,20240104,11,12,10,12.5,100\n")
+        return plan
+
+    with open(raw / "AAA.mst", "a") as f:
+        f.write("AAA,20240103,10.5,12,10,11,150\n")
+    monkeypatch.setattr(pipeline_mod, "plan_ingest", plan_then_grow)
+    grown = _build(raw, out)
+    monkeypatch.setattr(pipeline_mod, "plan_ingest", real)
+
+    assert grown.rows == 1
+    aaa = pd.read_parquet(out, filters=[("ticker", "==", "AAA")])
+    assert aaa["close"].tolist() == [10.5, 11.0]
+
+    caught_up = _build(raw, out)
+    assert caught_up.appended_files == 1 and caught_up.rows == 1
+    aaa = pd.read_parquet(out, filters=[("ticker", "==", "AAA")]).sort_values("dt")
+    assert aaa["close"].tolist() == [10.5, 11.0, 12.5]
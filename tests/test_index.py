@@ -0,0 +1,105 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pandas as pd
+
+import xfin.data_engine.io.index as index_mod
+import xfin.data_engine.io.reader as reader
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.io.index import INDEX_NAME, DatasetIndex
+
+
+def _build(tmp_path: Path) -> Path:
+    """AAA trades in January, BBB in March 2024."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for ticker, start in [("AAA", "2024-01-01"), ("BBB", "2024-03-01")]:
+        days = pd.bdate_range(start, periods=20)
+        (raw / f"{ticker}.mst").write_text(
+            "".join(f"{ticker},{d:%Y%m%d},10,12,9,{10 + i % 3},100\n" for i, d in enumerate(days))
+        )
+    out = tmp_path / "out"
+    asyncio.run(BuildDatasetPipeline().write(out, folder=raw))
+    return out
+
+
+def test_build_writes_ticker_date_index(tmp_path: Path, monkeypatch):
+    """
+    Contract:
+    - xfin-data writes <out>/_index.json with partition path, dt range and rows per ticker
+    - rebuilding reads footers only of partitions whose fragments changed
+    """
+    out = _build(tmp_path)
+
+    raw = json.loads((out / INDEX_NAME).read_text())
+    assert raw["version"] == index_mod.INDEX_VERSION
+    aaa = raw["partitions"]["AAA"]
+    assert aaa["path"] == "ticker=AAA"
+    assert aaa["rows"] == 20
+    assert pd.Timestamp(aaa["min_dt"]) == pd.Timestamp("2024-01-01")
+    assert pd.Timestamp(aaa["max_dt"]) == pd.Timestamp("2024-01-26")
+
+    calls = []
+    original = index_mod._fragment_range
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(index_mod, "_fragment_range", counting)
+    assert DatasetIndex.build(out, DatasetIndex.load(out)) == DatasetIndex.load(out)
+    assert calls == []
+
+
+def test_reader_uses_index_to_list_and_prune(tmp_path: Path, monkeypatch):
+    """
+    Contract:
+    - tickers are listed from the index without scanning the dataset
+    - partitions whose dt range misses the date filter are never opened
+    - without an index the reader falls back to scanning
+    """
+    out = _build(tmp_path)
+
+    opened: list[list[str] | None] = []
+    original = reader.open_bars_dataset
+
+    def spy(root, tickers=None):
+        opened.append(None if tickers is None else list(tickers))
+        return original(root, tickers)
+
+    monkeypatch.setattr(reader, "open_bars_dataset", spy)
+
+    assert reader.discover_tickers(out) == ["AAA", "BBB"]
+    assert opened == []
+
+    df = reader.load_partitioned_bars_arrow(out, date_min="2024-02-15")
+    assert set(df["ticker"].astype(str)) == {"BBB"}
+    assert opened == [["BBB"]]
+
+    (out / INDEX_NAME).unlink()
+    opened.clear()
+    assert reader.discover_tickers(out) == ["AAA", "BBB"]
+    assert opened == [None]
+    df = reader.load_partitioned_bars_arrow(out, date_min="2024-02-15")
+    assert set(df["ticker"].astype(str)) == {"BBB"}
+
+
+def test_reader_keeps_requested_tickers_missing_from_index(tmp_path: Path, caplog):
+    """
+    Contract:
+    - a requested ticker the index does not know is looked up on disk, not
+      pruned away (e.g. an index older than its partition)
+    - requested tickers without any partition are reported
+    """
+    out = _build(tmp_path)
+    index = DatasetIndex.load(out)
+    del index.partitions["BBB"]
+    index.save(out)
+
+    with caplog.at_level("WARNING", logger=reader.__name__):
+        df = reader.load_partitioned_bars_arrow(
+            out, tickers=["BBB", "BBX"], date_min="2024-02-15"
+        )
+    assert len(df) == 20 and set(df["ticker"].astype(str)) == {"BBB"}
+    assert "BBX" in caplog.text and "'BBB'" not in caplog.text
@@ -0,0 +1,80 @@
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.features.builder import BarDatasetBuilder
+from xfin.data_engine.features.lazy import CACHE_DIR, FEATURES_NAME, LazyFeatures
+
+
+def _read(root: Path, columns: list[str]) -> pd.DataFrame:
+    """AAA bars from February on, lazy features attached like a reader does."""
+    lazy = LazyFeatures.load(root)
+    stored, wanted = lazy.split(columns) if lazy else (columns, [])
+    df = pd.read_parquet(
+        root,
+        columns=["ticker", *stored],
+        filters=[("ticker", "=", "AAA"), ("dt", ">=", pd.Timestamp("2024-02-01"))],
+    )
+    df["ticker"] = df["ticker"].astype(str)
+    df = lazy.attach(df, wanted) if wanted else df
+    return df[columns].sort_values("dt").reset_index(drop=True)
+
+
+def _write_raw(raw: Path) -> None:
+    raw.mkdir()
+    for k, ticker in enumerate(["AAA", "BBB"]):
+        days = pd.bdate_range("2024-01-01", periods=30)
+        (raw / f"{ticker}.mst").write_text(
+            "".join(
+                f"{ticker},{d:%Y%m%d},10,{12 + i % 3},9,{10 + k + (i * 7) % 5},{100 + i}\n"
+                for i, d in enumerate(days)
+            )
+        )
+
+
+def test_lazy_features_match_stored_ones(tmp_path: Path):
+    """
+    Contract:
+    - lazy mode stores only core columns and declares features in _features.json
+    - requested features are computed on read over the full partition history
+      (equal to build-time features even under a date filter)
+    - results are cached per partition and recomputed after a rewrite
+    """
+    raw = tmp_path / "raw"
+    _write_raw(raw)
+    eager, lazy = tmp_path / "eager", tmp_path / "lazy"
+
+    asyncio.run(BuildDatasetPipeline().write(eager, folder=raw))
+    asyncio.run(
+        BuildDatasetPipeline(builder=BarDatasetBuilder(lazy=True)).write(lazy, folder=raw)
+    )
+
+    assert (lazy / FEATURES_NAME).is_file()
+    assert not (eager / FEATURES_NAME).exists()
+    assert "volatility_20" not in pd.read_parquet(lazy).columns
+
+    cols = ["dt", "close", "volatility_20", "ret_1d"]
+    got = _read(lazy, cols)
+    assert got["volatility_20"].notna().any()
+    pd.testing.assert_frame_equal(got, _read(eager, cols))
+
+    cache = lazy / CACHE_DIR / "ticker=AAA.arrow"
+    assert cache.is_file()
+    assert not (lazy / CACHE_DIR / "ticker=BBB.arrow").exists()
+    assert len(pd.read_parquet(lazy)) == 60  # cache is not part of the dataset
+
+    stamp = cache.stat().st_mtime_ns
+    _read(lazy, cols)
+    assert cache.stat().st_mtime_ns == stamp
+
+    with open(raw / "AAA.mst", "a") as f:
+        f.write("AAA,20240301,10,12,9,11,500\n")
+    asyncio.run(
+        BuildDatasetPipeline(builder=BarDatasetBuilder(lazy=True)).write(lazy, folder=raw)
+    )
+    df = LazyFeatures.load(lazy).attach(
+        pd.read_parquet(lazy, filters=[("ticker", "=", "AAA")]), ["ret_1d"]
+    )
+    assert df.sort_values("dt")["ret_1d"].iloc[-1] == 11 / df.sort_values("dt")["close"].iloc[-2] - 1
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from pathlib import Path
+
+from xfin.config import AppConfig, DataEngineConfig
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.domain.metrics import ParseStats
+from xfin.data_engine.io.parsers import MstBarParser
+
+RAW = (
+    "<TICKER>,<DTYYYYMMDD>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>\n"
+    "AAA,20240102,10,11,9,10.5,100\n"
+    "\n"
+    "AAA,20240103,1,2\n"
+    "AAA,20240104,1,2,3,x,5\n"
+    "AAA,20240105,10.5,12,10,11,150\n"
+)
+
+
+def test_parser_stats_agree_between_row_and_columnar():
+    rows, cols = ParseStats(), ParseStats()
+    parser = MstBarParser(has_header=True)
+
+    list(parser.parse_lines(RAW.splitlines(), stats=rows))
+    parser.parse_columnar(RAW, stats=cols)
+
+    assert rows == cols == ParseStats(rows=2, skipped_empty=1, skipped_badcols=1, skipped_other=1)
+
+
+def test_pipeline_reports_metrics(tmp_path: Path):
+    """
+    Contract:
+    - run() fills pipeline.metrics with one FileMetrics per raw file
+    - parser skip counters, bytes and stage timings are recorded
+    - write() returns the same kind of metrics on its summary; it dumps as JSON
+    """
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "AAA.mst").write_text(RAW)
+    (raw / "BBB.mst").write_text("BBB,20240102,20,21,19,20.5,200\n")
+
+    for columnar in (False, True):
+        pipeline = BuildDatasetPipeline(
+            cfg=AppConfig(data_engine=DataEngineConfig(columnar=columnar))
+        )
+        asyncio.run(pipeline.run(folder=raw))
+        m = pipeline.metrics
+
+        assert sorted(Path(f.locator).name for f in m.files) == ["AAA.mst", "BBB.mst"]
+        assert m.rows == 3
+        assert m.bytes == len(RAW) + 31
+        assert m.skipped() == ParseStats(
+            rows=3, skipped_empty=1, skipped_badcols=1, skipped_other=1
+        )
+        assert {"discover", "load", "dataframe"} <= set(m.stages)
+        assert 1 <= m.queue_depth_max <= 2
+
+    summary = asyncio.run(BuildDatasetPipeline().write(tmp_path / "bars", folder=raw))
+    assert summary.metrics.rows == summary.rows == 3
+    assert "write" in summary.metrics.stages
+
+    out = tmp_path / "metrics.json"
+    summary.metrics.dump_json(out)
+    payload = json.loads(out.read_text())
+    assert payload["skipped"]["skipped_badcols"] == 1
+    assert len(payload["files"]) == 2
+
+
+def test_text_source_reports_bytes_of_the_file(tmp_path: Path):
+    """
+    Contract:
+    - files read through a plain read_text() source are counted in bytes
+      (from the file size), not in decoded characters
+    """
+    from xfin.data_engine.domain.metrics import PipelineMetrics
+    from xfin.data_engine.io.repository import MstRepository
+    from xfin.data_engine.io.sources import LocalFileSource
+
+    class TextOnlySource:
+        async def read_text(self, locator, encoding="utf-8", *, offset=0, end=None):
+            return await LocalFileSource().read_text(locator, encoding, offset=offset, end=end)
+
+    path = tmp_path / "ZAB.mst"
+    path.write_text("ŻAB,20240102,10,11,9,10.5,100\n", encoding="utf-8")
+    metrics = PipelineMetrics()
+    repo = MstRepository(
+        locators=[str(path)], source=TextOnlySource(), parser=MstBarParser(), metrics=metrics
+    )
+
+    async def consume():
+        return [b async for b in repo.iter_columnar()]
+
+    (batch,) = asyncio.run(consume())
+    assert len(batch) == 1
+    assert metrics.bytes == path.stat().st_size == len(path.read_text(encoding="utf-8")) + 1
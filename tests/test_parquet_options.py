@@ -0,0 +1,107 @@
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.io.writer import ParquetOptions, write_partitioned_frame
+
+
+def _write_raw(raw: Path) -> None:
+    """30 AAA bars, written newest first."""
+    raw.mkdir()
+    days = list(enumerate(pd.bdate_range("2024-01-01", periods=30)))
+    (raw / "AAA.mst").write_text(
+        "".join(f"AAA,{d:%Y%m%d},10,12,9,{10 + i % 3},{100 + i}\n" for i, d in reversed(days))
+    )
+
+
+def _row_group_ranges(path: Path) -> list[tuple[pd.Timestamp, pd.Timestamp, int]]:
+    meta = pq.ParquetFile(path).metadata
+    col = meta.schema.to_arrow_schema().get_field_index("dt")
+    out = []
+    for i in range(meta.num_row_groups):
+        rg = meta.row_group(i)
+        stats = rg.column(col).statistics
+        out.append((pd.Timestamp(stats.min), pd.Timestamp(stats.max), rg.num_rows))
+    return out
+
+
+def test_write_applies_parquet_options(tmp_path: Path):
+    """
+    Contract:
+    - codec, row group size and float32 downcast reach the written files
+    - row groups are dt-sorted with min/max statistics (disjoint date ranges)
+    - features keep float64
+    """
+    raw, out = tmp_path / "raw", tmp_path / "bars"
+    _write_raw(raw)
+    options = ParquetOptions(
+        compression="zstd", row_group_size=8, float32_columns=("vol", "openint")
+    )
+
+    asyncio.run(BuildDatasetPipeline(parquet=options).write(out, folder=raw))
+
+    (fragment,) = sorted(out.glob("ticker=AAA/*.parquet"))
+    schema = pq.read_schema(fragment)
+    assert schema.field("vol").type == pa.float32()
+    assert schema.field("close").type == pa.float64()
+    assert schema.field("ret_1d").type == pa.float64()
+    assert pq.ParquetFile(fragment).metadata.row_group(0).column(0).compression == "ZSTD"
+
+    groups = _row_group_ranges(fragment)
+    assert [n for _, _, n in groups] == [8, 8, 8, 6]
+    assert all(lo <= hi for lo, hi, _ in groups)
+    assert all(prev[1] < nxt[0] for prev, nxt in zip(groups, groups[1:]))
+
+
+def test_incremental_rewrites_on_layout_change(tmp_path: Path):
+    """
+    Contract:
+    - an incremental build with a different float32 layout rewrites the
+      partitions instead of mixing schemas
+    """
+    raw, out = tmp_path / "raw", tmp_path / "bars"
+    _write_raw(raw)
+
+    asyncio.run(BuildDatasetPipeline().write(out, folder=raw, incremental=True))
+    summary = asyncio.run(
+        BuildDatasetPipeline(parquet=ParquetOptions(float32_columns=("vol",))).write(
+            out, folder=raw, incremental=True
+        )
+    )
+
+    assert summary.skipped_files == 0
+    fragments = sorted(out.glob("ticker=AAA/*.parquet"))
+    assert {pq.read_schema(f).field("vol").type for f in fragments} == {pa.float32()}
+
+
+def test_write_partitioned_frame_sorts_and_validates(tmp_path: Path):
+    """
+    Contract:
+    - the pandas path writes rows in (ticker, dt) order
+    - unknown float32 columns and codecs are rejected, as is a level for a
+      codec without levels
+    """
+    df = pd.DataFrame(
+        {
+            "ticker": ["AAA", "AAA", "AAA"],
+            "dt": pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02"]),
+            "close": [3.0, 1.0, 2.0],
+        }
+    )
+    write_partitioned_frame(df, tmp_path / "bars", ParquetOptions(row_group_size=1))
+
+    (fragment,) = sorted((tmp_path / "bars").glob("ticker=AAA/*.parquet"))
+    assert pq.read_table(fragment).column("close").to_pylist() == [1.0, 2.0, 3.0]
+
+    with pytest.raises(ValueError, match="float32"):
+        write_partitioned_frame(df, tmp_path / "x", ParquetOptions(float32_columns=("vol",)))
+    with pytest.raises(ValueError, match="compression"):
+        ParquetOptions(compression="lzma")
+    with pytest.raises(ValueError, match="compression_level"):
+        ParquetOptions(compression="snappy", compression_level=3)
+    assert ParquetOptions(compression="zstd", compression_level=3).compression_level == 3
@@ -0,0 +1,81 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from xfin.config import AppConfig, DataEngineConfig
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.io.parsers import MstBarParser
+from xfin.data_engine.io.repository import MstRepository
+from xfin.data_engine.io.sources import LocalFileSource
+
+
+def _write_raw(folder: Path) -> list[str]:
+    paths = []
+    for i, ticker in enumerate(["AAA", "BBB", "CCC"]):
+        p = folder / f"{ticker}.mst"
+        p.write_text(
+            f"{ticker},20240102,{10 + i},11,9,10.5,100\n"
+            f"{ticker},20240103,10.5,12,10,11,150,{i}\n"
+        )
+        paths.append(str(p))
+    return paths
+
+
+def test_repository_executor_yields_every_file_once(tmp_path: Path):
+    """
+    With an executor, chunks of locators are read and parsed in worker
+    processes.
+
+    Contract:
+    - every locator comes back exactly once, paired with its batch
+    - rows match the in-process columnar parse
+    """
+    paths = _write_raw(tmp_path)
+    ctx = multiprocessing.get_context("spawn")
+
+    async def collect(repo: MstRepository) -> dict[str, pd.DataFrame]:
+        return {loc: b.to_dataframe() async for loc, b in repo.iter_columnar_by_file()}
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=ctx) as pool:
+        pooled = asyncio.run(
+            collect(
+                MstRepository(
+                    locators=paths,
+                    source=LocalFileSource(),
+                    parser=MstBarParser(),
+                    executor=pool,
+                    chunk_size=2,
+                )
+            )
+        )
+
+    local = asyncio.run(
+        collect(MstRepository(locators=paths, source=LocalFileSource(), parser=MstBarParser()))
+    )
+
+    assert sorted(pooled) == sorted(paths)
+    for loc in paths:
+        pd.testing.assert_frame_equal(pooled[loc], local[loc])
+
+
+def test_pipeline_parse_workers_matches_in_process(tmp_path: Path):
+    """
+    parse_workers > 0 only changes where parsing runs, not the result.
+    """
+    _write_raw(tmp_path)
+
+    expected = asyncio.run(BuildDatasetPipeline().run(folder=tmp_path))
+    pooled = asyncio.run(
+        BuildDatasetPipeline(
+            cfg=AppConfig(
+                data_engine=DataEngineConfig(
+                    columnar=True, parse_workers=2, parse_chunk_size=1
+                )
+            )
+        ).run(folder=tmp_path)
+    )
+
+    pd.testing.assert_frame_equal(pooled, expected)
@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from xfin.data_engine.io.publish import (
+    current_version,
+    list_versions,
+    rollback,
+    staged_version,
+    versions_dir,
+)
+
+
+def _write(folder: Path, name: str, text: str) -> None:
+    (folder / "ticker=AAA").mkdir(exist_ok=True)
+    (folder / "ticker=AAA" / name).write_text(text)
+
+
+def test_staged_version_publishes_atomically_and_keeps_previous(tmp_path: Path):
+    """
+    Contract:
+    - `out` becomes a symlink to the newest complete version
+    - a failing write is discarded and readers keep the current version
+    - incremental staging starts from hard links of the current version,
+      and changing the stage leaves the published version untouched
+    - rollback republishes the previous version; old versions are pruned
+    """
+    out = tmp_path / "bars"
+
+    with staged_version(out) as stage:
+        _write(stage, "part-0.parquet", "v1")
+    v1 = current_version(out)
+    assert out.is_symlink() and (out / "ticker=AAA" / "part-0.parquet").read_text() == "v1"
+
+    with pytest.raises(RuntimeError):
+        with staged_version(out, base=True) as stage:
+            _write(stage, "part-1.parquet", "half")
+            raise RuntimeError("crash")
+    assert current_version(out) == v1
+    assert [p.name for p in versions_dir(out).iterdir()] == [v1.name]
+
+    with staged_version(out, base=True) as stage:
+        part0 = stage / "ticker=AAA" / "part-0.parquet"
+        assert os.stat(part0).st_ino == os.stat(v1 / "ticker=AAA" / "part-0.parquet").st_ino
+        part0.unlink()
+        _write(stage, "part-0.parquet", "v2")
+    v2 = current_version(out)
+    assert (out / "ticker=AAA" / "part-0.parquet").read_text() == "v2"
+    assert (v1 / "ticker=AAA" / "part-0.parquet").read_text() == "v1"
+
+    assert rollback(out) == v1
+    assert (out / "ticker=AAA" / "part-0.parquet").read_text() == "v1"
+    with pytest.raises(ValueError):
+        rollback(out)
+
+    with staged_version(out, keep=2) as stage:
+        _write(stage, "part-0.parquet", "v3")
+    # v1 was current before this publish, so it survives as the rollback target
+    assert list_versions(out) == [v1, v2, current_version(out)]
+    with staged_version(out, keep=2) as stage:
+        _write(stage, "part-0.parquet", "v4")
+    assert len(list_versions(out)) == 2
+
+
+def test_first_publish_keeps_unversioned_dataset(tmp_path: Path):
+    """
+    Contract:
+    - a dataset written in place before versioning becomes the oldest version
+    """
+    out = tmp_path / "bars"
+    out.mkdir()
+    _write(out, "part-0.parquet", "legacy")
+
+    with staged_version(out, base=True) as stage:
+        assert (stage / "ticker=AAA" / "part-0.parquet").read_text() == "legacy"
+        _write(stage, "part-1.parquet", "new")
+
+    assert out.is_symlink()
+    assert rollback(out).name.endswith("legacy")
+    assert not (out / "ticker=AAA" / "part-1.parquet").exists()
@@ -0,0 +1,139 @@
+import asyncio
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from xfin.config import AppConfig, DataEngineConfig
+from xfin.data_engine.core.compaction import DatasetCompactor
+from xfin.data_engine.core.pipeline import BuildDatasetPipeline
+from xfin.data_engine.core.reconcile import file_ranks, reconcile
+from xfin.data_engine.domain.batch import BarBatch
+from xfin.data_engine.io.parsers import MstBarParser
+
+
+def _batch(text: str) -> BarBatch:
+    return MstBarParser(has_header=False).parse_columnar(text)
+
+
+def test_dedupe_order_keeps_highest_priority_then_latest_row():
+    """
+    Contract:
+    - result is sorted by (ticker, dt) with one row per key
+    - higher priority wins; equal priority -> later row wins
+    """
+    batch = _batch(
+        "BBB,20240102,1,1,1,1.0,1\n"
+        "AAA,20240103,1,1,1,2.0,1\n"
+        "AAA,20240102,1,1,1,3.0,1\n"
+        "AAA,20240102,1,1,1,4.0,1\n"
+        "AAA,20240103,1,1,1,5.0,1\n"
+    )
+
+    latest = batch.take(batch.dedupe_order())
+    assert [latest.tickers[c] for c in latest.ticker_codes] == ["AAA", "AAA", "BBB"]
+    assert latest.close.tolist() == [4.0, 5.0, 1.0]
+
+    prio = np.array([0, 1, 0, 0, 0])
+    assert batch.take(batch.dedupe_order(prio)).close.tolist() == [4.0, 2.0, 1.0]
+
+    with pytest.raises(ValueError):
+        batch.dedupe_order(np.zeros(2))
+
+
+def test_file_ranks_and_reconcile(tmp_path: Path):
+    """
+    Contract:
+    - files rank by explicit priority pattern first, then by mtime
+    - reconcile reports how many rows were replaced
+    """
+    old, new, fix = (tmp_path / n for n in ("old.mst", "new.mst", "fix.txt"))
+    for i, p in enumerate([fix, old, new]):
+        p.write_text("")
+        os.utime(p, ns=(10**18 + i, 10**18 + i))
+
+    assert file_ranks([str(new), str(old)]) == {str(old): 0, str(new): 1}
+    ranks = file_ranks([str(new), str(old), str(fix)], patterns=["*.mst", "fix*"])
+    assert max(ranks, key=ranks.get) == str(fix)
+
+    # directory-qualified patterns match the folder of an absolute locator
+    (tmp_path / "corrections").mkdir()
+    corrected = tmp_path / "corrections" / "A.mst"
+    corrected.write_text("")
+    os.utime(corrected, ns=(10**18 - 1, 10**18 - 1))  # older than new.mst
+    ranks = file_ranks([str(new), str(corrected)], patterns=["corrections/*.mst"])
+    assert max(ranks, key=ranks.get) == str(corrected)
+
+    files = [
+        (str(new), _batch("AAA,20240102,1,1,1,2.0,1\nAAA,20240103,1,1,1,2.0,1\n")),
+        (str(old), _batch("AAA,20240102,1,1,1,1.0,1\n")),
+    ]
+    merged, replaced = reconcile(files, file_ranks([loc for loc, _ in files]))
+    assert replaced == 1
+    assert merged.close.tolist() == [2.0, 2.0]
+
+
+def test_pipeline_reconciles_redelivered_bars(tmp_path: Path):
+    """
+    Contract:
+    - run() keeps one bar per (ticker, dt), from the most recently written
+      file, in both parse modes; features see the corrected history
+    - the replaced count ends up in the run metrics
+    - dedupe=False keeps the duplicates
+    """
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "a.mst").write_text("AAA,20240102,10,11,9,10,100\nAAA,20240103,10,11,9,11,100\n")
+    (raw / "b.mst").write_text("AAA,20240103,10,11,9,12,100\n")
+    os.utime(raw / "a.mst", ns=(10**18, 10**18))
+
+    for columnar in (False, True):
+        pipeline = BuildDatasetPipeline(
+            cfg=AppConfig(data_engine=DataEngineConfig(columnar=columnar))
+        )
+        df = asyncio.run(pipeline.run(folder=raw))
+        assert df["close"].tolist() == [10.0, 12.0]
+        assert df["ret_1d"].iloc[1] == pytest.approx(0.2)
+        assert pipeline.metrics.replaced_rows == 1
+
+    keep_all = BuildDatasetPipeline(cfg=AppConfig(data_engine=DataEngineConfig(dedupe=False)))
+    df = asyncio.run(keep_all.run(folder=raw))
+    assert len(df) == 3
+    assert df.duplicated(["ticker", "dt"]).sum() == 1
+
+
+def test_write_reconciles_bars_across_files(tmp_path: Path):
+    """
+    Contract:
+    - write() resolves a ticker's duplicates across raw files like run():
+      same rows, same winning closes, same features
+    - compacting the dataset afterwards changes nothing
+    """
+    days = pd.bdate_range("2024-01-01", periods=15)
+    raw, out = tmp_path / "raw", tmp_path / "bars"
+    raw.mkdir()
+    (raw / "old.mst").write_text(
+        "".join(f"AAA,{d:%Y%m%d},10,12,9,{10 + i % 3},100\n" for i, d in enumerate(days[:10]))
+    )
+    (raw / "new.mst").write_text(
+        "".join(f"AAA,{d:%Y%m%d},50,52,49,{50 + i % 3},100\n" for i, d in enumerate(days[5:]))
+    )
+    os.utime(raw / "old.mst", ns=(10**18, 10**18))
+
+    expected = asyncio.run(BuildDatasetPipeline().run(folder=raw))
+    pipeline = BuildDatasetPipeline()
+    asyncio.run(pipeline.write(out, folder=raw))
+    assert pipeline.metrics.replaced_rows == 5
+
+    def stored() -> pd.DataFrame:
+        df = pd.read_parquet(out).sort_values("dt").reset_index(drop=True)
+        df["ticker"] = df["ticker"].astype(str)
+        return df[expected.columns]
+
+    assert len(stored()) == 15
+    pd.testing.assert_frame_equal(stored(), expected, check_dtype=False)
+
+    DatasetCompactor(out).run()
+    pd.testing.assert_frame_equal(stored(), expected, check_dtype=False)
@@ -0,0 +1,63 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from xfin.data_engine.io.parsers import MstBarParser
+from xfin.data_engine.io.repository import MstRepository
+
+
+@dataclass
+class _FakeSource:
+    """In-memory source that records how many reads were started."""
+
+    delays: dict[str, float]
+    started: list[str] = field(default_factory=list)
+
+    async def read_text(
+        self, locator: str, encoding: str = "utf-8", *, offset: int = 0, end: int | None = None
+    ) -> str:
+        self.started.append(locator)
+        await asyncio.sleep(self.delays[locator])
+        return f"{locator},20240102,10,11,9,10.5,100\n"
+
+
+def test_iter_columnar_applies_backpressure():
+    """
+    Contract:
+    - no more than max_in_flight files are loading or waiting for the
+      consumer at any time, however slow the consumer is
+    - every file is still yielded exactly once
+    """
+    locators = [f"T{i:02d}" for i in range(10)]
+    source = _FakeSource(delays={loc: 0 for loc in locators})
+    repo = MstRepository(
+        locators=locators, source=source, parser=MstBarParser(), max_in_flight=2
+    )
+
+    async def consume() -> list[str]:
+        seen = []
+        async for batch in repo.iter_columnar():
+            await asyncio.sleep(0.01)  # slow consumer
+            assert len(source.started) <= len(seen) + 2
+            seen.append(batch.row(0).ticker)
+        return seen
+
+    seen = asyncio.run(consume())
+    assert sorted(seen) == locators
+
+
+def test_iter_columnar_ordered_output():
+    """
+    Contract:
+    - ordered=True yields files in sorted locator order even when later
+      files finish loading first
+    """
+    locators = ["C", "A", "B"]
+    source = _FakeSource(delays={"A": 0.05, "B": 0.0, "C": 0.0})
+    repo = MstRepository(
+        locators=locators, source=source, parser=MstBarParser(), ordered=True
+    )
+
+    async def collect() -> list[str]:
+        return [loc async for loc, _ in repo.iter_columnar_by_file()]
+
+    assert asyncio.run(collect()) == ["A", "B", "C"]
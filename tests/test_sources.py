@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pandas as pd
+
+from xfin.data_engine.io.parsers import MstBarParser
+from xfin.data_engine.io.sources import LocalFileSource
+
+
+def test_open_bytes_maps_file_from_offset(tmp_path: Path):
+    """
+    Contract:
+    - open_bytes() exposes the raw file bytes (no decoding), from `offset` on
+    - empty files yield an empty view instead of failing to map
+    """
+    p = tmp_path / "a.mst"
+    p.write_bytes(b"AAA,20240101,1,2,0.5,1.5,10\nBBB,20240101,1,2,0.5,1.5,10\n")
+    empty = tmp_path / "empty.mst"
+    empty.write_bytes(b"")
+
+    src = LocalFileSource()
+    with src.open_bytes(str(p), offset=28) as buf:
+        assert bytes(buf) == b"BBB,20240101,1,2,0.5,1.5,10\n"
+    with src.open_bytes(str(empty)) as buf:
+        assert len(buf) == 0
+
+
+def test_columnar_parse_from_bytes_replaces_invalid_utf8(tmp_path: Path):
+    """
+    Parsing mapped bytes handles encoding errors like errors="replace" on
+    read_text(): the bad byte becomes U+FFFD and the row is kept.
+    """
+    p = tmp_path / "a.mst"
+    p.write_bytes(b"A\xffA,20240101,1,2,0.5,1.5,10\r\nBBB,20240102,1,2,0.5,1.5,10")
+
+    src = LocalFileSource()
+    parser = MstBarParser()
+    with src.open_bytes(str(p)) as buf:
+        from_bytes = parser.parse_columnar(buf)
+    from_text = parser.parse_columnar(src.read_text_sync(str(p)))
+
+    pd.testing.assert_frame_equal(from_bytes.to_dataframe(), from_text.to_dataframe())
+    assert from_bytes.unique_tickers() == ["A�A", "BBB"]
+
+
+def test_iter_lines_streams_like_splitlines(tmp_path: Path):
+    """
+    iter_lines() feeds parse_lines() the same rows as read_text().splitlines().
+    """
+    p = tmp_path / "a.mst"
+    p.write_bytes(b"AAA,20240101,1,2,0.5,1.5,10\r\n\r\nAAA,20240102,1,2,0.5,1.5,10\n")
+
+    src = LocalFileSource()
+    parser = MstBarParser()
+    streamed = list(parser.parse_lines(src.iter_lines(str(p))))
+    split = list(parser.parse_lines(src.read_text_sync(str(p)).splitlines()))
+
+    assert [(b.ticker, b.dt, b.close) for b in streamed] == [
+        (b.ticker, b.dt, b.close) for b in split
+    ]
+    assert len(streamed) == 2
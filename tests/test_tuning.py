@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("optuna")
+
+from xfin.forecaster.backtest import BacktestConfig  # noqa: E402
+from xfin.forecaster.runner import RunConfig  # noqa: E402
+from xfin.forecaster.tuning import TuneConfig, finished_trials, tune  # noqa: E402
+
+
+def test_tune_resumes_study_from_storage(tmp_path: Path, make_panel):
+    """
+    Contract:
+    - every trial reports its running metric per fold and records the
+      full model params
+    - fixed params win over the search space and are not searched
+    - rerunning with the same study/storage resumes: finished trials are
+      kept and only the missing ones run, also across worker processes
+    - a study is tied to its model and backtest split; untunable models
+      are rejected
+    """
+    df = make_panel(periods=60)
+    run = RunConfig(model="ewm_drift", mode="per_ticker")
+    bt = BacktestConfig(n_folds=3, min_train_size=10)
+    cfg = TuneConfig(study="s", storage=str(tmp_path / "optuna" / "s.journal"), n_trials=3)
+
+    study = tune(df, run, bt, cfg)
+    assert finished_trials(study) == 3
+    first = study.trials[0]
+    assert set(first.intermediate_values) == {0, 1, 2}
+    assert set(first.user_attrs["params"]) == {"alpha"}
+    assert first.value == pytest.approx(first.intermediate_values[2])
+
+    study = tune(df, run, bt, TuneConfig(study="s", storage=cfg.storage, n_trials=5, n_jobs=2))
+    assert finished_trials(study) >= 5
+    assert study.trials[0].params == first.params
+
+    fixed = tune(
+        df,
+        RunConfig(model="ewm_drift", mode="per_ticker", params={"alpha": 0.5}),
+        bt,
+        TuneConfig(study="f", storage=cfg.storage, n_trials=2),
+    )
+    for t in fixed.trials:
+        assert t.params == {}  # nothing left to search
+        assert t.user_attrs["params"] == {"alpha": 0.5}
+
+    with pytest.raises(ValueError, match="created for"):
+        tune(df, RunConfig(model="lightgbm"), bt, cfg)
+    with pytest.raises(ValueError, match="created for"):
+        tune(df, run, BacktestConfig(n_folds=4, min_train_size=10), cfg)
+    with pytest.raises(ValueError, match="search space"):
+        tune(df, RunConfig(model="naive_last_close"), bt, cfg)